@@ -2,14 +2,55 @@ import streamlit as st
 from langchain_community.utilities import SQLDatabase
 from langchain.chains import create_sql_query_chain
 from langchain_openai import OpenAI
+import asyncio
 import pandas as pd
+from sqlalchemy import text
 from utils.logging.log_util import get_logger
 from utils.db.db_pool import DatabasePool
+from utils.db.async_db_util import get_async_session
 from ai.base_agent import BaseAgent
 import os
 
 logger = get_logger(__name__)
 
+TOP_PREDICTIONS_QUERY = """
+SELECT title, company, predicted_move, event, reason, published_date
+FROM news
+WHERE published_date >= NOW() - make_interval(days => :days)
+AND predicted_move IS NOT NULL
+ORDER BY ABS(predicted_move) DESC
+LIMIT :limit
+"""
+
+PREDICTIONS_BY_TOPIC_QUERY = """
+SELECT 
+    event,
+    COUNT(*) as count,
+    AVG(predicted_move) as avg_move,
+    MIN(predicted_move) as min_move,
+    MAX(predicted_move) as max_move
+FROM news
+WHERE published_date >= NOW() - make_interval(days => :days)
+AND predicted_move IS NOT NULL
+GROUP BY event
+ORDER BY count DESC
+"""
+
+HIGHEST_PREDICTIONS_QUERY = """
+SELECT 
+    title,
+    company,
+    predicted_move as "Expected Move (%)",
+    event,
+    reason,
+    published_date
+FROM news
+WHERE published_date >= NOW() - INTERVAL '7 days'  -- This week
+AND predicted_move IS NOT NULL
+ORDER BY ABS(predicted_move) DESC
+LIMIT 10
+"""
+
 class DBAgent(BaseAgent):
     def _initialize(self):
         """Initialize DB Agent specific components."""
@@ -62,21 +103,18 @@ class DBAgent(BaseAgent):
             
         return formatted_df
 
+    def format_topics_df(self, df):
+        """Format the numeric columns of the predictions by topic"""
+        for col in ['avg_move', 'min_move', 'max_move']:
+            df[col] = df[col].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else '')
+        return df
+
     def get_top_predictions(self, limit=5, days=1):
         """Get top predicted moves"""
-        query = """
-        SELECT title, company, predicted_move, event, reason, published_date
-        FROM news
-        WHERE published_date >= NOW() - INTERVAL :days DAY
-        AND predicted_move IS NOT NULL
-        ORDER BY ABS(predicted_move) DESC
-        LIMIT :limit
-        """
-        
         try:
             with self.db_pool.get_session() as session:
                 result = session.execute(
-                    query, 
+                    text(TOP_PREDICTIONS_QUERY), 
                     {'limit': limit, 'days': days}
                 )
                 df = pd.DataFrame(result.fetchall(), columns=result.keys())
@@ -85,32 +123,35 @@ class DBAgent(BaseAgent):
             logger.error(f"Error getting top predictions: {str(e)}")
             raise
 
+    async def aget_top_predictions(self, limit=5, days=1):
+        """Get top predicted moves without blocking the event loop"""
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(text(TOP_PREDICTIONS_QUERY), {'limit': limit, 'days': days})
+                df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+                return self.format_predictions_df(df)
+        except Exception as e:
+            logger.error(f"Error getting top predictions: {str(e)}")
+            raise
+
     def get_predictions_by_topic(self, days=3):
         """Get predictions grouped by topic/event"""
-        query = """
-        SELECT 
-            event,
-            COUNT(*) as count,
-            AVG(predicted_move) as avg_move,
-            MIN(predicted_move) as min_move,
-            MAX(predicted_move) as max_move
-        FROM news
-        WHERE published_date >= NOW() - INTERVAL :days DAY
-        AND predicted_move IS NOT NULL
-        GROUP BY event
-        ORDER BY count DESC
-        """
-        
         try:
             with self.db_pool.get_session() as session:
-                result = session.execute(query, {'days': days})
+                result = session.execute(text(PREDICTIONS_BY_TOPIC_QUERY), {'days': days})
                 df = pd.DataFrame(result.fetchall(), columns=result.keys())
-                
-                # Format numeric columns
-                for col in ['avg_move', 'min_move', 'max_move']:
-                    df[col] = df[col].apply(lambda x: f"{x:.2f}%" if pd.notnull(x) else '')
-                    
-                return df
+                return self.format_topics_df(df)
+        except Exception as e:
+            logger.error(f"Error getting predictions by topic: {str(e)}")
+            raise
+
+    async def aget_predictions_by_topic(self, days=3):
+        """Get predictions grouped by topic/event without blocking the event loop"""
+        try:
+            async with get_async_session() as session:
+                result = await session.execute(text(PREDICTIONS_BY_TOPIC_QUERY), {'days': days})
+                df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+                return self.format_topics_df(df)
         except Exception as e:
             logger.error(f"Error getting predictions by topic: {str(e)}")
             raise
@@ -130,7 +171,7 @@ class DBAgent(BaseAgent):
         try:
             with self.db_pool.get_session() as session:
                 logger.info(f"Executing query: {query}")
-                result = session.execute(query)
+                result = session.execute(text(query))
                 df = pd.DataFrame(result.fetchall(), columns=result.keys())
                 logger.info(f"Successfully executed query, returned {len(df)} rows")
                 if len(df) == 0:
@@ -140,6 +181,21 @@ class DBAgent(BaseAgent):
             logger.error(f"Error executing query: {str(e)}")
             raise
 
+    async def aexecute_query(self, query):
+        """Execute SQL query on the async engine and return results as DataFrame."""
+        try:
+            async with get_async_session() as session:
+                logger.info(f"Executing query: {query}")
+                result = await session.execute(text(query))
+                df = pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+                logger.info(f"Successfully executed query, returned {len(df)} rows")
+                if len(df) == 0:
+                    logger.warning("Query returned no results")
+                return df
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
     def get_prediction_queries(self, question: str) -> str:
         """Generate appropriate SQL query based on prediction-related questions"""
         
@@ -209,47 +265,59 @@ class DBAgent(BaseAgent):
         LIMIT 10
         """
 
+    def get_canned_query(self, question):
+        """Get the fixed query of a prediction question, None if the SQL has to be generated"""
+        if "highest" in question.lower() and "predicted" in question.lower():
+            logger.info(f"Using highest predictions query: {HIGHEST_PREDICTIONS_QUERY}")
+            return HIGHEST_PREDICTIONS_QUERY
+        
+        # Check if it's a prediction-related question
+        if any(word in question.lower() for word in ['prediction', 'merger', 'acquisition', 'move']):
+            query = self.get_prediction_queries(question)
+            logger.info(f"Generated prediction query: {query}")
+            return query
+        return None
+
     def process_question(self, question):
         """Process natural language question and return results."""
         try:
             logger.info(f"Processing question: {question}")
             
             # Handle specific prediction queries
-            if "highest" in question.lower() and "predicted" in question.lower():
-                query = """
-                SELECT 
-                    title,
-                    company,
-                    predicted_move as "Expected Move (%)",
-                    event,
-                    reason,
-                    published_date
-                FROM news
-                WHERE published_date >= NOW() - INTERVAL '7 days'  -- This week
-                AND predicted_move IS NOT NULL
-                ORDER BY ABS(predicted_move) DESC
-                LIMIT 10
-                """
-                logger.info(f"Using highest predictions query: {query}")
+            query = self.get_canned_query(question)
+            if query is not None:
                 results = self.execute_query(query)
                 logger.info(f"Query returned {len(results)} rows")
                 return query, self.format_predictions_df(results)
             
-            # Check if it's a prediction-related question
-            elif any(word in question.lower() for word in ['prediction', 'merger', 'acquisition', 'move']):
-                query = self.get_prediction_queries(question)
-                logger.info(f"Generated prediction query: {query}")
-                results = self.execute_query(query)
+            # Generate SQL for other queries
+            query = self.generate_query(question)
+            logger.info(f"Generated general query: {query}")
+            results = self.execute_query(query)
+            logger.info(f"Query returned {len(results)} rows")
+            return query, results
+            
+        except Exception as e:
+            logger.error(f"Error processing question: {str(e)}")
+            raise
+
+    async def aprocess_question(self, question):
+        """Process natural language question on the async engine and return results."""
+        try:
+            logger.info(f"Processing question: {question}")
+            
+            query = self.get_canned_query(question)
+            if query is not None:
+                results = await self.aexecute_query(query)
                 logger.info(f"Query returned {len(results)} rows")
                 return query, self.format_predictions_df(results)
             
-            # Generate SQL for other queries
-            else:
-                query = self.generate_query(question)
-                logger.info(f"Generated general query: {query}")
-                results = self.execute_query(query)
-                logger.info(f"Query returned {len(results)} rows")
-                return query, results
+            # The SQL chain is blocking, so it runs in a worker thread
+            query = await asyncio.to_thread(self.generate_query, question)
+            logger.info(f"Generated general query: {query}")
+            results = await self.aexecute_query(query)
+            logger.info(f"Query returned {len(results)} rows")
+            return query, results
             
         except Exception as e:
             logger.error(f"Error processing question: {str(e)}")
@@ -9,6 +9,7 @@ from typing import List, Dict, Union, Optional
 import requests
 import logging
 from .base_agent import BaseAgent
+from utils.bar_store_util import get_period_bars
 import os
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
@@ -146,8 +147,7 @@ class MarketAgent(BaseAgent):
                     return ticker_info
                 symbol = ticker_info["symbol"]
 
-            stock = yf.Ticker(symbol)
-            df = stock.history(period=period)
+            df = get_period_bars(symbol, period)
             
             if df.empty:
                 return {"error": f"No data available for {symbol}"}
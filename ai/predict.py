@@ -104,9 +104,14 @@ def main():
     logger.info("Starting predictions")
     pred_df = predict(news_df)
     
-    # Update the news table with predictions
+    # Update the news table with predictions, retrying the rows of failed chunks once
     logger.info("Updating news table with predictions")
-    news_db_util.update_news_predictions(pred_df)
+    updated_count, failed_ids = news_db_util.update_news_predictions(pred_df)
+    if failed_ids:
+        logger.warning(f"Retrying the predictions of {len(failed_ids)} news items")
+        _, failed_ids = news_db_util.update_news_predictions(pred_df[pred_df['news_id'].isin(failed_ids)])
+        if failed_ids:
+            logger.error(f"Predictions of {len(failed_ids)} news items could not be stored: {failed_ids}")
     
     logger.info("Predictions completed and news table updated.")
 
@@ -1,5 +1,6 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import json
+import asyncio
 from utils.logging.log_util import get_logger
 from .market_agent import MarketAgent
 from .db_agent import DBAgent
@@ -33,19 +34,7 @@ class RoutingAgent:
                 stripped_query = query[5:].strip()
                 logger.info(f"Stripped query for DB agent: {stripped_query}")
                 query, results = self.db_agent.process_question(stripped_query)
-                
-                if results is not None and not results.empty:
-                    logger.info(f"DB query returned {len(results)} rows")
-                    return {
-                        "response": f"Here are the results:\n\n{results.to_markdown()}",
-                        "success": True
-                    }
-                else:
-                    logger.warning("DB query returned no results")
-                    return {
-                        "response": "No results found for your query.",
-                        "success": True
-                    }
+                return self.format_db_response(results)
             else:
                 # Default to market agent if no prefix
                 logger.info("No prefix found, defaulting to market agent")
@@ -59,6 +48,52 @@ class RoutingAgent:
                 "success": False
             }
 
+    def format_db_response(self, results) -> Dict[str, Any]:
+        if results is not None and not results.empty:
+            logger.info(f"DB query returned {len(results)} rows")
+            return {
+                "response": f"Here are the results:\n\n{results.to_markdown()}",
+                "success": True
+            }
+        logger.warning("DB query returned no results")
+        return {
+            "response": "No results found for your query.",
+            "success": True
+        }
+
+    async def aroute_query(self, query: str) -> Dict[str, Any]:
+        """
+        Route the query like route_query without blocking the event loop.
+
+        DB lookups run on the async engine and market-data fetches in a worker thread,
+        so several routed queries can be awaited at the same time.
+        """
+        try:
+            query = query.strip()
+            logger.info(f"Routing query: {query}")
+
+            if query.lower().startswith("news:"):
+                logger.info("Routing to DB agent")
+                query, results = await self.db_agent.aprocess_question(query[5:].strip())
+                return self.format_db_response(results)
+
+            if query.lower().startswith("market:"):
+                query = query[7:].strip()
+            logger.info("Routing to market agent")
+            response = await asyncio.to_thread(self.market_agent.process_financial_query, query)
+            return json.loads(response)
+
+        except Exception as e:
+            logger.error(f"Error routing query: {str(e)}")
+            return {
+                "response": f"Error processing query: {str(e)}",
+                "success": False
+            }
+
+    async def aroute_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """Route several queries concurrently, e.g. a news lookup and a market-data fetch"""
+        return await asyncio.gather(*(self.aroute_query(query) for query in queries))
+
     def set_model(self, model_name: str):
         """Update model for market agent"""
         self.market_agent.set_model(model_name)
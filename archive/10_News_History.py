@@ -1,6 +1,6 @@
 import streamlit as st
 from utils.display.display_util import make_clickable
-from utils.db.news_db_util import get_news_df
+from utils.db.news_db_util import get_news_df, NEWS_SUMMARY_COLUMNS
 import pandas as pd
 from st_aggrid import AgGrid, GridOptionsBuilder
 from st_aggrid.shared import GridUpdateMode
@@ -65,7 +65,7 @@ if st.button("Refresh Data"):
     st.rerun()
 
 # Get the dataframe
-df = get_news_df()
+df = get_news_df(columns=NEWS_SUMMARY_COLUMNS)
 
 # Sort the dataframe by published_date in descending order (most recent first)
 df = df.sort_values('published_date', ascending=False)
@@ -1,27 +1,25 @@
 import pandas as pd
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
 import joblib
 import time
-from utils.db.model_db_util import save_results
+from utils.db.model_db_util import save_results, get_training_manifest, save_training_manifest
 import numpy as np
 import os
+import argparse
 from utils.db.price_move_db_util import get_news_price_moves
+from utils.ai.train_util import train_events, get_event_fingerprints, select_changed_events, TRAIN_MAX_WORKERS, TRAIN_MIN_CHANGE, TRAIN_MIN_SAMPLES
+from utils.ai.feature_store import get_tfidf_features
+from utils.ai.preprocess_util import get_text_to_process, preprocess_texts
 from utils.logging.log_util import get_logger
 
 logger = get_logger(__name__)
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
+MODEL_TYPE = 'classifier_binary'
+TARGET_COLUMN = 'actual_side'
 
-def preprocess(text):
-    doc = nlp(text)
-    return " ".join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct])
-
-def train_and_save_model_for_event(event, df):
+def train_and_save_model_for_event(event, df, features, tfidf, n_jobs=None):
     try:
         event_df = df[df['event'] == event].copy()
         logger.info(f"Processing event: {event}, Number of samples: {len(event_df)}")
@@ -31,14 +29,10 @@ def train_and_save_model_for_event(event, df):
         
         logger.info(f"Value counts of actual_side after filtering: {event_df['actual_side'].value_counts().to_dict()}")
         
-        if len(event_df) < 10:  # Arbitrary minimum number of samples
+        if len(event_df) < TRAIN_MIN_SAMPLES:
             logger.warning(f"Not enough data for event {event} after filtering. Skipping.")
             return None
 
-        # Check if 'content' is null or empty, use 'title' if so
-        event_df['text_to_process'] = event_df.apply(lambda row: row['title'] if pd.isnull(row['content']) or row['content'] == '' else row['content'], axis=1)
-        event_df['processed_content'] = event_df['text_to_process'].apply(preprocess)
-        
         # Use actual_side as the target variable
         y = event_df['actual_side'].map({'UP': 1, 'DOWN': 0})
         
@@ -46,15 +40,14 @@ def train_and_save_model_for_event(event, df):
             logger.warning(f"Only one class present in the target variable for event {event}. Skipping.")
             return None
 
-        tfidf = TfidfVectorizer(max_features=1000)
-        X = tfidf.fit_transform(event_df['processed_content'])
+        X = features[event_df['feature_row'].to_numpy()]
 
         logger.info(f"Shape of X: {X.shape}, Shape of y: {y.shape}")
         logger.info(f"Value counts of y: {y.value_counts().to_dict()}")
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        model = RandomForestClassifier()
+        model = RandomForestClassifier(n_jobs=n_jobs)
         model.fit(X_train, y_train)
 
         # Create a directory for models if it doesn't exist
@@ -98,7 +91,7 @@ def train_and_save_model_for_event(event, df):
         logger.exception("Detailed traceback:")
         return None
 
-def train_and_save_all_events_model(df):
+def train_and_save_all_events_model(df, features, tfidf):
     try:
         logger.info(f"Processing all events model, Number of samples: {len(df)}")
         
@@ -111,22 +104,17 @@ def train_and_save_all_events_model(df):
             logger.warning(f"Not enough data for all events model after filtering. Skipping.")
             return None
 
-        # Check if 'content' is null or empty, use 'title' if so
-        df['text_to_process'] = df.apply(lambda row: row['title'] if pd.isnull(row['content']) or row['content'] == '' else row['content'], axis=1)
-        df['processed_content'] = df['text_to_process'].apply(preprocess)
-        
         # Use actual_side as the target variable
         y = df['actual_side'].map({'UP': 1, 'DOWN': 0})
         
-        tfidf = TfidfVectorizer(max_features=1000)
-        X = tfidf.fit_transform(df['processed_content'])
+        X = features[df['feature_row'].to_numpy()]
 
         logger.info(f"Shape of X: {X.shape}, Shape of y: {y.shape}")
         logger.info(f"Value counts of y: {y.value_counts().to_dict()}")
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        model = RandomForestClassifier()
+        model = RandomForestClassifier(n_jobs=-1)
         model.fit(X_train, y_train)
 
         # Create a directory for models if it doesn't exist
@@ -170,16 +158,9 @@ def train_and_save_all_events_model(df):
         logger.exception("Detailed traceback:")
         return None
 
-def train_models_per_event(df):
-    results = []
-    for event in df['event'].unique():
-        try:
-            result = train_and_save_model_for_event(event, df)
-            if result is not None:
-                results.append(result)
-        except Exception as e:
-            logger.error(f"Error training/saving model for event '{event}': {e}")
-    return results
+def train_models_per_event(df, features, tfidf, events=None, max_workers=TRAIN_MAX_WORKERS):
+    events = df['event'].unique() if events is None else events
+    return train_events(train_and_save_model_for_event, df, events, max_workers, shared=(features, tfidf))
 
 def process_results(results, df):
     try:
@@ -222,7 +203,7 @@ def process_results(results, df):
         logger.error(f"Error processing/saving results: {e}")
         logger.exception("Detailed traceback:")
 
-def main():
+def main(full=False, min_change=TRAIN_MIN_CHANGE):
     logger.info("Starting main function")
     
     # Get all news and price moves
@@ -236,6 +217,11 @@ def main():
         logger.error("No data retrieved from the database. Please check the SQL query and database connection.")
         return
     
+    # Lemmatize and vectorize the whole corpus once, every model slices its rows out of the matrix
+    merged_df['processed_content'] = preprocess_texts(get_text_to_process(merged_df))
+    features, tfidf = get_tfidf_features(merged_df)
+    merged_df['feature_row'] = np.arange(len(merged_df))
+    
     logger.info(f"Value counts of actual_side: {merged_df['actual_side'].value_counts(dropna=False).to_dict()}")
     logger.info(f"Number of non-null actual_side values: {merged_df['actual_side'].notnull().sum()}")
     logger.info(f"Number of null actual_side values: {merged_df['actual_side'].isnull().sum()}")
@@ -270,13 +256,27 @@ def main():
         logger.error("No valid 'UP' or 'DOWN' values in actual_side column. Cannot train models.")
         return
     
+    # Only refit events whose labeled data changed since their last fit, the UP and DOWN rows
+    # being the ones trained on so that the row counts match the minimum sample check
+    labeled_df = merged_df[merged_df['actual_side'].isin(['UP', 'DOWN'])]
+    fingerprints = get_event_fingerprints(labeled_df, ['processed_content', TARGET_COLUMN])
+    if full:
+        events = fingerprints['event'].tolist()
+    else:
+        events = select_changed_events(fingerprints, get_training_manifest(MODEL_TYPE), min_change)
+    logger.info(f"Retraining {len(events)} of {len(fingerprints)} events")
+    
+    if not events:
+        logger.info("No event has new labeled data. Nothing to retrain.")
+        return
+    
     logger.info("Starting to train models for each event")
     # Train models for each event and save them
-    results = train_models_per_event(merged_df)
+    results = train_models_per_event(merged_df, features, tfidf, events)
     logger.info(f"Number of events processed: {len(results)}")
 
     logger.info("Training all events model")
-    all_events_result = train_and_save_all_events_model(merged_df)
+    all_events_result = train_and_save_all_events_model(merged_df, features, tfidf)
     if all_events_result:
         results.append(all_events_result)
         logger.info("All events model added to results")
@@ -290,8 +290,18 @@ def main():
     logger.info("Processing and saving results")
     # Process the results and save to a file and database
     process_results(results, merged_df)
+    
+    # Record the data each event was fitted on for the next incremental run
+    trained_events = [result['event'] for result in results]
+    save_training_manifest(MODEL_TYPE, fingerprints[fingerprints['event'].isin(trained_events)])
 
     logger.info("Main function completed")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Train the per-event models.")
+    parser.add_argument("--full", action="store_true", help="Retrain every event, not only those with new labeled data")
+    parser.add_argument("--min-change", type=float, default=TRAIN_MIN_CHANGE,
+                        help="Relative change in an event's training rows needed to refit it. Default is 0, any change")
+    args = parser.parse_args()
+
+    main(args.full, args.min_change)
@@ -14,7 +14,7 @@ time_filter = st.radio(
 )
 
 # Get data and prepare filters
-df = get_news_df()
+df = get_news_df(columns=['news_id', 'published_date', 'publisher', 'event'])
 
 # Publisher filter
 publishers = ['All Publishers'] + sorted(df['publisher'].unique().tolist())
@@ -2,7 +2,7 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import pytz
-from utils.back_test_util import run_backtest
+from utils.back_test_util import run_backtest, run_backtest_sweep
 from utils.db.news_db_util import get_news_df_date_range
 import os
 import plotly.graph_objects as go
@@ -166,3 +166,99 @@ if st.button("Run Backtest"):
                 os.makedirs("data", exist_ok=True)
                 trades_df.to_csv(csv_path, index=False)
                 st.success(f"Trade history saved to {csv_path}")
+
+# Parameter sweep
+st.header("Parameter Sweep")
+
+def parse_levels(text):
+    return [float(value.strip()) for value in text.split(",") if value.strip()]
+
+col7, col8, col9 = st.columns(3)
+with col7:
+    sweep_take_profits = st.text_input("Take Profit levels (%)", value="0.5, 1.0, 1.5, 2.0")
+with col8:
+    sweep_stop_losses = st.text_input("Stop Loss levels (%)", value="0.25, 0.5, 0.75, 1.0")
+with col9:
+    sweep_position_sizes = st.text_input("Position Sizes (%)", value="10, 20")
+
+sweep_events_separately = st.checkbox(
+    "Sweep each selected event separately",
+    help="Adds one result row per selected event next to the combined selection"
+)
+
+if st.button("Run Sweep"):
+    if start_datetime > end_datetime:
+        st.error("Start date must be before end date")
+    else:
+        try:
+            take_profits = [value/100 for value in parse_levels(sweep_take_profits)]
+            stop_losses = [value/100 for value in parse_levels(sweep_stop_losses)]
+            position_sizes = [value/100 for value in parse_levels(sweep_position_sizes)]
+        except ValueError:
+            st.error("Sweep levels must be comma separated numbers")
+            st.stop()
+
+        with st.spinner("Running parameter sweep..."):
+            news_df = get_news_df_date_range(
+                publishers=[selected_publisher],
+                start_date=start_datetime,
+                end_date=end_datetime
+            )
+            
+            if selected_event_names:
+                news_df = news_df[news_df['event'].isin(selected_event_names)]
+            
+            # None sweeps the combined selection, each single event list sweeps that event alone
+            event_filters = [None]
+            if sweep_events_separately:
+                event_filters += [[event] for event in selected_event_names]
+            
+            results = run_backtest_sweep(
+                news_df=news_df,
+                initial_capital=initial_capital,
+                take_profits=take_profits,
+                stop_losses=stop_losses,
+                position_sizes=position_sizes,
+                event_filters=event_filters
+            )
+            
+            # Keep an empty frame rather than None so the page reports that nothing was traded
+            st.session_state.sweep_results = results if results is not None else pd.DataFrame()
+
+sweep_results = st.session_state.get("sweep_results")
+if sweep_results is not None and not sweep_results.empty:
+    heatmap_size = st.selectbox(
+        "Position Size for heatmap (%)",
+        options=sorted(sweep_results['position_size'].unique()),
+        format_func=lambda value: f"{value*100:g}"
+    )
+    heatmap_events = st.selectbox(
+        "Events for heatmap",
+        options=sweep_results['events'].unique().tolist(),
+        format_func=lambda value: "All selected events" if value == 'all' else value
+    )
+    heatmap_df = sweep_results[
+        (sweep_results['position_size'] == heatmap_size) & (sweep_results['events'] == heatmap_events)
+    ].pivot_table(
+        index='stop_loss', columns='take_profit', values='total_return'
+    )
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=heatmap_df.values,
+        x=[f"{value*100:g}%" for value in heatmap_df.columns],
+        y=[f"{value*100:g}%" for value in heatmap_df.index],
+        colorscale="RdYlGn",
+        zmid=0,
+        colorbar=dict(title="Total Return (%)")
+    ))
+    fig.update_layout(
+        title='Total Return by Take Profit and Stop Loss',
+        xaxis_title='Take Profit',
+        yaxis_title='Stop Loss'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    st.subheader("Sweep Results")
+    st.dataframe(sweep_results.sort_values('total_return', ascending=False))
+elif sweep_results is not None:
+    st.error("No trades were generated during the sweep period")
@@ -1,5 +1,5 @@
 import streamlit as st
-import yfinance as yf
+from utils.bar_store_util import get_bars
 from datetime import datetime, timedelta
 from langchain_experimental.agents.agent_toolkits import create_pandas_dataframe_agent
 from langchain.chat_models import ChatOpenAI
@@ -56,7 +56,7 @@ if get_data and ticker != st.session_state.current_ticker:
     try:
         start_date, end_date = date_range
         # Download data
-        df = yf.download(ticker, interval=interval, start=start_date, end=end_date)
+        df = get_bars(ticker, start_date, end_date, interval=interval)
         
         if not df.empty:
             # Update session state
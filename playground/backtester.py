@@ -4,7 +4,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from datetime import datetime, timedelta
 import pytz
-from utils.back_test_util import run_backtest
+from utils.back_test_util import run_backtest, run_backtest_sweep
 from utils.db.news_db_util import get_news_df_date_range
 import pandas as pd
 from utils.backtest_price_util import create_price_moves  # Update this import
@@ -27,6 +27,11 @@ POSITION_SIZE = 0.20    # 8% of capital per trade
 TAKE_PROFIT = 0.01     # 1% take profit
 STOP_LOSS = 0.005      # 0.5% stop loss
 
+# Parameter grid for sweep mode (python playground/backtester.py --sweep)
+SWEEP_TAKE_PROFITS = [0.005, 0.01, 0.015, 0.02]
+SWEEP_STOP_LOSSES = [0.0025, 0.005, 0.0075, 0.01]
+SWEEP_POSITION_SIZES = [0.10, 0.20]
+
 # Publisher Selection
 PUBLISHERS = [
    # "globenewswire_country_fi",
@@ -117,5 +122,48 @@ def run_backtest_from_parameters():
     trades_df.to_csv(csv_path, index=False)
     print(f"\nTrade history saved to {csv_path}")
 
+def run_sweep_from_parameters():
+    start_date = datetime.strptime(START_DATE, '%Y-%m-%d').replace(tzinfo=pytz.UTC)
+    end_date = datetime.strptime(END_DATE, '%Y-%m-%d').replace(tzinfo=pytz.UTC)
+
+    print(f"Running parameter sweep from {start_date} to {end_date}")
+    print(f"Take profits: {SWEEP_TAKE_PROFITS}")
+    print(f"Stop losses: {SWEEP_STOP_LOSSES}")
+    print(f"Position sizes: {SWEEP_POSITION_SIZES}")
+
+    news_df = get_news_df_date_range(
+        publishers=PUBLISHERS,
+        start_date=start_date,
+        end_date=end_date
+    )
+
+    if SELECTED_EVENTS:
+        news_df = news_df[news_df['event'].isin(SELECTED_EVENTS)]
+
+    results_df = run_backtest_sweep(
+        news_df=news_df,
+        initial_capital=INITIAL_CAPITAL,
+        take_profits=SWEEP_TAKE_PROFITS,
+        stop_losses=SWEEP_STOP_LOSSES,
+        position_sizes=SWEEP_POSITION_SIZES
+    )
+
+    if results_df is None:
+        print("No trades were generated during the sweep period")
+        return
+
+    results_df = results_df.sort_values('total_return', ascending=False)
+    print("\nTop parameter combinations:")
+    print(results_df.head(10).to_string(index=False))
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_path = f"data/sweep_{timestamp}.csv"
+    os.makedirs("data", exist_ok=True)
+    results_df.to_csv(csv_path, index=False)
+    print(f"\nSweep results saved to {csv_path}")
+
 if __name__ == '__main__':
-    run_backtest_from_parameters() 
\ No newline at end of file
+    if '--sweep' in sys.argv:
+        run_sweep_from_parameters()
+    else:
+        run_backtest_from_parameters() 
\ No newline at end of file
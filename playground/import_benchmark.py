@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import ast
+import glob
+import argparse
+import subprocess
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds the imports of one page may take in a fresh interpreter
+IMPORT_TIME_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', 3.0))
+
+# Written to stderr between interpreter startup and the page imports
+MARKER = '-- page imports --'
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$')
+
+def get_pages(app_dir=APP_DIR):
+    """Get Home.py and the Streamlit pages, relative to the app directory"""
+    pages = sorted(glob.glob(os.path.join(app_dir, 'pages', '*.py')))
+    return ['Home.py'] + [os.path.relpath(page, app_dir) for page in pages]
+
+def get_page_imports(path):
+    """Get the module-level import statements of a page without running it"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    return [ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+
+def measure_import_time(statements, app_dir=APP_DIR):
+    """
+    Run import statements in a fresh interpreter with -X importtime.
+
+    Args:
+        statements: import statements, as found in a page
+        app_dir: directory the interpreter runs in
+
+    Returns:
+        tuple: (total seconds, list of (seconds, module) for the top-level imports, slowest first)
+
+    Raises:
+        ImportError: if one of the imports fails
+    """
+    code = '\n'.join([f'import sys; sys.stderr.write({MARKER!r} + "\\n")'] + statements)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=app_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        raise ImportError(lines[-1] if lines else f"Exit code {result.returncode}")
+
+    modules = []
+    lines = result.stderr.splitlines()
+    for line in lines[lines.index(MARKER) + 1:]:
+        match = IMPORT_TIME_LINE.match(line)
+        # Nested imports are indented by two more spaces per level
+        if match and len(match.group(3)) == 1:
+            modules.append((int(match.group(2)) / 1e6, match.group(4)))
+    modules.sort(reverse=True)
+    return sum(seconds for seconds, _ in modules), modules
+
+def measure_page(page, app_dir=APP_DIR):
+    return measure_import_time(get_page_imports(os.path.join(app_dir, page)), app_dir)
+
+def main(top=5, budget=IMPORT_TIME_BUDGET):
+    over_budget = []
+    for page in get_pages():
+        try:
+            total, modules = measure_page(page)
+        except ImportError as e:
+            print(f"\n{page}: failed to import ({e})")
+            continue
+
+        status = 'OVER BUDGET' if total > budget else 'ok'
+        print(f"\n{page}: {total:.2f}s ({status})")
+        for seconds, module in modules[:top]:
+            print(f"  {seconds:8.3f}s  {module}")
+        if total > budget:
+            over_budget.append(page)
+
+    print(f"\n{len(over_budget)} pages over the {budget:.1f}s budget")
+    return over_budget
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the import time of Home.py and each Streamlit page.")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest imports shown per page")
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET, help="Import time budget per page in seconds")
+    args = parser.parse_args()
+
+    main(args.top, args.budget)
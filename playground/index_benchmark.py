@@ -0,0 +1,134 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import datetime
+from sqlalchemy import text
+from utils.db.db_pool import DatabasePool
+from utils.db.migrate import apply_migrations, get_pending_migrations
+
+# Publisher used for the per-publisher queries
+PUBLISHER = 'globenewswire_biotech'
+
+# The hot-path query shapes of news_db_util, price_move_db_util and model_db_util
+QUERIES = {
+    'get_news_page': """
+        SELECT id, ticker, title, link, published_date, event, predicted_move FROM news
+        WHERE publisher = :publisher
+        ORDER BY published_date DESC NULLS LAST, id DESC
+        LIMIT 25 OFFSET 0
+    """,
+    'get_news_page count': """
+        SELECT count(*) FROM news WHERE publisher = :publisher
+    """,
+    'get_news_df_date_range': """
+        SELECT id, ticker, title, published_date, event FROM news
+        WHERE publisher IN (:publisher) AND published_date >= :start_date AND published_date <= :end_date
+        ORDER BY published_date DESC
+    """,
+    'add_news_records conflict check': """
+        SELECT id FROM news WHERE link = :link AND publisher = :publisher
+    """,
+    'get_news_without_tickers': """
+        SELECT id FROM news WHERE ticker IS NULL
+    """,
+    'get_news_without_company': """
+        SELECT id FROM news WHERE company IS NULL AND publisher = :publisher
+    """,
+    'remove_duplicate_news status': """
+        SELECT id FROM news WHERE status = 'raw'
+    """,
+    'get_top_events': """
+        SELECT event, count(id) FROM news WHERE event IS NOT NULL
+        GROUP BY event ORDER BY count(id) DESC LIMIT 20
+    """,
+    'store_price_moves conflict check': """
+        SELECT id FROM price_moves WHERE news_id = :news_id
+    """,
+    'latest_accuracy_query': """
+        SELECT event, accuracy FROM (
+            SELECT event, accuracy, row_number() OVER (PARTITION BY event ORDER BY timestamp DESC, id DESC) AS run_number
+            FROM eq_model_results_binary
+        ) AS runs WHERE run_number = 1
+    """
+}
+
+def get_parameters(connection):
+    """Pick real values from the tables so the plans reflect actual selectivity"""
+    link = connection.execute(text("SELECT link FROM news WHERE publisher = :publisher LIMIT 1"),
+                              {'publisher': PUBLISHER}).scalar()
+    news_id = connection.execute(text("SELECT news_id FROM price_moves LIMIT 1")).scalar()
+    return {
+        'publisher': PUBLISHER,
+        'link': link or '',
+        'news_id': news_id or 0,
+        'start_date': datetime(datetime.now().year, 1, 1),
+        'end_date': datetime.now()
+    }
+
+def explain_queries(analyze=True):
+    """
+    Run EXPLAIN for each hot-path query.
+
+    Returns:
+        dict: query name -> (plan text, execution time in ms or None)
+    """
+    options = '(ANALYZE, BUFFERS)' if analyze else ''
+    plans = {}
+    with DatabasePool().engine.connect() as connection:
+        parameters = get_parameters(connection)
+        for name, query in QUERIES.items():
+            rows = connection.execute(text(f"EXPLAIN {options} {query}"), parameters).fetchall()
+            lines = [row[0] for row in rows]
+            execution_time = None
+            for line in lines:
+                if line.startswith('Execution Time:'):
+                    execution_time = float(line.split(':')[1].strip().split()[0])
+            plans[name] = ('\n'.join(lines), execution_time)
+    return plans
+
+def print_plans(title, plans):
+    print(f"\n{'=' * 20} {title} {'=' * 20}")
+    for name, (plan, execution_time) in plans.items():
+        print(f"\n--- {name} ---")
+        print(plan)
+
+def print_summary(before, after):
+    print(f"\n{'Query':<36}{'Before (ms)':>14}{'After (ms)':>14}")
+    for name in QUERIES:
+        before_time = before[name][1]
+        after_time = after[name][1]
+        before_text = f"{before_time:.2f}" if before_time is not None else '-'
+        after_text = f"{after_time:.2f}" if after_time is not None else '-'
+        print(f"{name:<36}{before_text:>14}{after_text:>14}")
+
+def main(apply=False, analyze=True):
+    pending = get_pending_migrations()
+    print(f"Pending migrations: {', '.join(pending) if pending else 'none'}")
+
+    before = explain_queries(analyze)
+    print_plans('Current plans', before)
+
+    if not apply:
+        print("\nRun with --apply to apply the pending migrations and compare the plans")
+        return
+
+    apply_migrations()
+    with DatabasePool().engine.begin() as connection:
+        connection.execute(text("ANALYZE news"))
+        connection.execute(text("ANALYZE price_moves"))
+        connection.execute(text("ANALYZE eq_model_results_binary"))
+
+    after = explain_queries(analyze)
+    print_plans('Plans after migrations', after)
+    if analyze:
+        print_summary(before, after)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Show the hot-path query plans before and after the index migrations.")
+    parser.add_argument("--apply", action="store_true", help="Apply pending migrations and show the plans again")
+    parser.add_argument("--no-analyze", action="store_true", help="Use plain EXPLAIN without running the queries")
+    args = parser.parse_args()
+
+    main(args.apply, not args.no_analyze)
@@ -1,2 +1,6 @@
 CREATE UNIQUE INDEX idx_instrument_yf_ticker 
-ON instrument(yf_ticker);
\ No newline at end of file
+ON instrument(yf_ticker);
+
+-- The news hot-path indexes, including the uq_news_link_publisher and uq_price_moves_news_id
+-- ON CONFLICT targets, are managed as migrations in sql/migrations,
+-- applied with: python -m utils.db.migrate
@@ -56,4 +56,15 @@ CREATE TABLE eq_model_results_regression (
     test_sample INTEGER NOT NULL,
     training_sample INTEGER NOT NULL,
     total_sample INTEGER NOT NULL
-);
\ No newline at end of file
+);
+-- Create eq_model_training_manifest table
+CREATE TABLE eq_model_training_manifest (
+    id SERIAL PRIMARY KEY,
+    event VARCHAR(255) NOT NULL,
+    model_type VARCHAR(50) NOT NULL,
+    row_count INTEGER NOT NULL,
+    data_hash VARCHAR(64) NOT NULL,
+    trained_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX uq_model_training_manifest_event_type ON eq_model_training_manifest (event, model_type);
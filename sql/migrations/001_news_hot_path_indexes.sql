@@ -0,0 +1,45 @@
+-- Indexes for the query shapes in utils/db/news_db_util.py, price_move_db_util.py and model_db_util.py.
+-- Applied with: python -m utils.db.migrate
+--
+-- The indexes are built CONCURRENTLY so ingest and the pages keep writing and reading while they build.
+-- CONCURRENTLY cannot run in a transaction, so the statements run one by one in autocommit mode.
+-- A build that fails leaves an INVALID index that IF NOT EXISTS skips: drop it before rerunning.
+-- migrate: no-transaction
+
+-- get_news_page, get_news_df_date_range and iter_news_df for one publisher, newest first
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_publisher_published_date
+ON news (publisher, published_date DESC, id DESC);
+
+-- get_news_df and get_news_latest_df across all publishers
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_published_date
+ON news (published_date DESC);
+
+-- add_news_records ON CONFLICT (link, publisher) target.
+-- Fails if (link, publisher) duplicates remain, run remove_duplicate_news first.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_news_link_publisher
+ON news (link, publisher);
+
+-- get_news_by_event, get_top_events and the latest accuracy join in get_news_page
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_event
+ON news (event);
+
+-- get_news_without_tickers
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_ticker_null
+ON news (id) WHERE ticker IS NULL;
+
+-- get_news_without_company
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_company_null_publisher
+ON news (publisher) WHERE company IS NULL;
+
+-- remove_duplicate_news status update
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_status_raw
+ON news (id) WHERE status = 'raw';
+
+-- store_price_moves ON CONFLICT (news_id) target and the news join in get_news_price_moves.
+-- Fails if several price moves remain for one news_id, keep the latest of each before applying.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_price_moves_news_id
+ON price_moves (news_id);
+
+-- latest_accuracy_query: row_number() OVER (PARTITION BY event ORDER BY timestamp DESC, id DESC)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_model_results_binary_event_timestamp
+ON eq_model_results_binary (event, timestamp DESC, id DESC);
@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from utils import back_test_util
+from utils.back_test_util import build_close_matrix, find_exits, check_exit, run_backtest, run_backtest_sweep
+
+METRIC_KEYS = ['total_trades', 'winning_trades', 'win_rate', 'total_pnl', 'total_return', 'annualized_return']
+
+def make_price_moves():
+    """Price moves of four trades on two events, published out of order"""
+    rows = []
+    for i, (event, side, closes) in enumerate([
+        ('earnings', 'UP', [100.0, 100.6, 101.2, 102.5]),
+        ('dividend', 'DOWN', [100.0, 100.3, 100.8, 99.0]),
+        ('earnings', 'DOWN', [100.0, 99.4, 98.7, 98.0]),
+        ('dividend', 'UP', [100.0, 99.6, 99.2, 100.9])
+    ]):
+        day = pd.Timestamp('2024-01-02', tz='UTC') + pd.Timedelta(days=3 - i)
+        index = pd.date_range(day + pd.Timedelta(hours=14, minutes=30), periods=len(closes), freq='1min')
+        rows.append({
+            'published_date': day,
+            'market': 'regular_market',
+            'entry_time': index[0],
+            'exit_time': index[-1] + pd.Timedelta(hours=6),
+            'ticker': f'T{i}',
+            'event': event,
+            'link': f'https://example.com/{i}',
+            'predicted_side': side,
+            'begin_price': closes[0],
+            'end_price': closes[-1],
+            'intraday_prices': pd.DataFrame({'Close': closes}, index=index)
+        })
+    return pd.DataFrame(rows)
+
+def reference_exit(closes, target_price, stop_price, is_long):
+    """Bar by bar exit scan the vectorized engine has to match"""
+    for i, price in enumerate(closes):
+        if is_long:
+            if price >= target_price:
+                return i, True, False
+            elif price <= stop_price:
+                return i, False, True
+        else:
+            if price <= target_price:
+                return i, True, False
+            elif price >= stop_price:
+                return i, False, True
+    return -1, False, False
+
+class TestBackTestUtil(unittest.TestCase):
+
+    def test_find_exits_matches_bar_by_bar_scan(self):
+        rng = np.random.default_rng(42)
+        frames, targets, stops, longs = [], [], [], []
+        for _ in range(200):
+            n_bars = int(rng.integers(0, 60))
+            closes = 100 * np.cumprod(1 + rng.normal(0, 0.002, n_bars))
+            frames.append(pd.DataFrame({'Close': closes}))
+            is_long = bool(rng.integers(0, 2))
+            longs.append(is_long)
+            targets.append(101 if is_long else 99)
+            stops.append(99.5 if is_long else 100.5)
+
+        exit_index, hit_target, hit_stop = find_exits(build_close_matrix(frames), targets, stops, longs)
+
+        for i, frame in enumerate(frames):
+            expected = reference_exit(frame['Close'].tolist(), targets[i], stops[i], longs[i])
+            self.assertEqual((exit_index[i], hit_target[i], hit_stop[i]), expected)
+
+    def test_check_exit(self):
+        index = pd.date_range('2024-01-02 09:30', periods=4, freq='1min', tz='America/New_York')
+        intraday_data = pd.DataFrame({'Close': [100.0, 100.4, 101.2, 99.0]}, index=index)
+
+        result = check_exit(intraday_data, 100.0, 101.0, 99.5, True, 'close', 99.0)
+        self.assertEqual(result, (101.0, index[2], True, False))
+
+        result = check_exit(intraday_data, 100.0, 95.0, 100.3, False, 'close', 99.0)
+        self.assertEqual(result, (100.3, index[1], False, True))
+
+        result = check_exit(intraday_data.iloc[:0], 100.0, 101.0, 99.5, True, 'close', 99.0)
+        self.assertEqual(result, (99.0, 'close', False, False))
+
+class TestBacktestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.news_df = pd.DataFrame({'ticker': ['T0'], 'timezone': ['UTC']})
+        self.patcher = patch.object(back_test_util, 'create_price_moves', side_effect=lambda _: make_price_moves())
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_prepare_backtest_sorts_and_builds_close_matrix(self):
+        price_moves_df, close_matrix = back_test_util.prepare_backtest(self.news_df)
+        self.assertEqual(price_moves_df['ticker'].tolist(), ['T3', 'T2', 'T1', 'T0'])
+        self.assertEqual(close_matrix.shape, (4, 4))
+        np.testing.assert_array_equal(close_matrix[0], [100.0, 99.6, 99.2, 100.9])
+
+    def test_simulate_trades_exits_and_compounds(self):
+        price_moves_df, close_matrix = back_test_util.prepare_backtest(self.news_df)
+        trades_df, metrics = back_test_util.simulate_trades(price_moves_df, close_matrix, 10000, 0.5, 0.01, 0.005)
+        self.assertEqual(trades_df['hit_target'].tolist(), [False, True, False, True])
+        self.assertEqual(trades_df['hit_stop'].tolist(), [True, False, True, False])
+        np.testing.assert_allclose(trades_df['exit_price'], [99.5, 99.0, 100.5, 101.0])
+        # Each position is half of the capital left after the previous trades
+        self.assertEqual(trades_df['shares'].tolist(), [50, 49, 50, 49])
+        self.assertAlmostEqual(trades_df['capital_after'].iloc[-1], 10000 + metrics['total_pnl'])
+        self.assertEqual(metrics['total_trades'], 4)
+
+    def test_sweep_returns_one_row_per_combination(self):
+        take_profits, stop_losses, position_sizes = [0.005, 0.01, 0.03], [0.005, 0.02], [0.1, 0.5]
+        sweep_df = run_backtest_sweep(self.news_df, 10000, take_profits, stop_losses, position_sizes, max_workers=1)
+
+        self.assertEqual(len(sweep_df), 12)
+        self.assertEqual(len(sweep_df.drop_duplicates(['take_profit', 'stop_loss', 'position_size'])), 12)
+        self.assertEqual(set(sweep_df['events']), {'all'})
+        # create_price_moves runs once for the whole grid
+        self.assertEqual(back_test_util.create_price_moves.call_count, 1)
+
+        for row in sweep_df.itertuples():
+            with self.subTest(take_profit=row.take_profit, stop_loss=row.stop_loss, position_size=row.position_size):
+                _, metrics = run_backtest(self.news_df, 10000, row.position_size, row.take_profit, row.stop_loss)
+                for key in METRIC_KEYS:
+                    self.assertAlmostEqual(getattr(row, key), metrics[key])
+
+    def test_sweep_combination_filters_events(self):
+        price_moves_df, close_matrix = back_test_util.prepare_backtest(self.news_df)
+        back_test_util._init_sweep_worker(price_moves_df, close_matrix)
+
+        result = back_test_util._run_sweep_combination((0.01, 0.005, 0.5, ['earnings'], 10000))
+        earnings_df = make_price_moves().query("event == 'earnings'")
+        with patch.object(back_test_util, 'create_price_moves', return_value=earnings_df):
+            _, metrics = run_backtest(self.news_df, 10000, 0.5, 0.01, 0.005)
+        self.assertEqual(result['events'], 'earnings')
+        self.assertEqual(result['total_trades'], 2)
+        for key in METRIC_KEYS:
+            self.assertAlmostEqual(result[key], metrics[key])
+
+        result = back_test_util._run_sweep_combination((0.01, 0.005, 0.5, ['bond_fixing'], 10000))
+        self.assertEqual((result['events'], result['total_trades'], result['total_return']), ('bond_fixing', 0, 0))
+
+    def test_sweep_event_filters_add_rows(self):
+        sweep_df = run_backtest_sweep(self.news_df, 10000, [0.01], [0.005], [0.5],
+                                      event_filters=[None, ['earnings'], ['dividend']], max_workers=1)
+        self.assertEqual(sweep_df['events'].tolist(), ['all', 'earnings', 'dividend'])
+        self.assertEqual(sweep_df['total_trades'].tolist(), [4, 2, 2])
+
+    def test_sweep_without_price_moves_returns_none(self):
+        with patch.object(back_test_util, 'create_price_moves', return_value=pd.DataFrame()):
+            self.assertIsNone(run_backtest_sweep(self.news_df, 10000, [0.01], [0.005], [0.1], max_workers=1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+import multiprocessing
+from unittest.mock import patch
+from utils.ai.completion_cache import CompletionCache, make_key
+
+def write_entry(path, key, response):
+    CompletionCache(path).set(key, 'tag_news', response)
+
+class TestCompletionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'completions.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_counts_hits_and_misses(self):
+        cache = CompletionCache(self.path)
+        key = make_key('tag_news', 'gpt-4o', [{'role': 'user', 'content': 'news'}])
+
+        self.assertIsNone(cache.get(key))
+        cache.set(key, 'tag_news', 'earnings')
+        self.assertEqual(cache.get(key), 'earnings')
+
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['hits'], stats['misses']), (1, 1, 1))
+
+    def test_responses_expire_per_prompt_type(self):
+        cache = CompletionCache(self.path, ttls={'extract_ticker': 60})
+        cache.set('ticker', 'extract_ticker', 'AAPL')
+        cache.set('tag', 'tag_news', 'earnings')
+
+        with patch('utils.ai.completion_cache.time.time', return_value=1e12):
+            self.assertIsNone(cache.get('ticker'))
+            self.assertEqual(cache.get('tag'), 'earnings')
+            self.assertEqual(cache.evict(), 1)
+
+    def test_evict_drops_least_recently_used(self):
+        cache = CompletionCache(self.path, max_bytes=300)
+        for i in range(3):
+            cache.set(f'key{i}', 'tag_news', 'x' * 100)
+        cache.get('key0')
+
+        cache.evict()
+        self.assertEqual(cache.get('key0'), 'x' * 100)
+        self.assertIsNone(cache.get('key1'))
+        self.assertLessEqual(cache.stats()['bytes'], 300)
+
+    def test_shared_between_processes(self):
+        cache = CompletionCache(self.path)
+        process = multiprocessing.get_context('spawn').Process(target=write_entry, args=(self.path, 'key', 'earnings'))
+        process.start()
+        process.join()
+
+        self.assertEqual(cache.get('key'), 'earnings')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+from sqlalchemy import create_engine, exc, text
+from utils.db.db_pool import DatabasePool, MetricsQueuePool
+
+class TestDbPool(unittest.TestCase):
+
+    def test_metrics_count_checkouts_and_timeouts(self):
+        engine = create_engine('sqlite://', poolclass=MetricsQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1)
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+            self.assertEqual(engine.pool.metrics()['checked_out'], 1)
+            # The only connection is taken, so the next checkout times out
+            with self.assertRaises(exc.TimeoutError):
+                engine.connect()
+
+        metrics = engine.pool.metrics()
+        self.assertEqual((metrics['checkouts'], metrics['timeouts'], metrics['checked_out']), (1, 1, 0))
+        self.assertGreaterEqual(metrics['wait_seconds_max'], 0)
+        engine.dispose()
+
+    def test_read_session_uses_primary_without_replica(self):
+        db_pool = DatabasePool()
+        if db_pool._replica_url:
+            self.skipTest("DATABASE_REPLICA_URL is set")
+        self.assertIs(db_pool.read_engine, db_pool.engine)
+        with db_pool.get_read_session() as session:
+            self.assertEqual(session.execute(text('SELECT 1')).scalar(), 1)
+        self.assertIn('primary', db_pool.pool_metrics())
+
+if __name__ == '__main__':
+    unittest.main()
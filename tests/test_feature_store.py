@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import pandas as pd
+from utils.ai import feature_store
+
+class TestFeatureStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patcher = patch('utils.ai.feature_store.FEATURE_STORE_DIR', self.tmp_dir.name)
+        self.patcher.start()
+        self.df = pd.DataFrame({
+            'id': [1, 2, 3],
+            'processed_content': ['profit rise', 'dividend cut', 'profit warning']
+        })
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_tfidf_features_reuses_stored_matrix(self):
+        matrix, vectorizer = feature_store.get_tfidf_features(self.df)
+        self.assertEqual(matrix.shape[0], 3)
+        self.assertIn('profit', vectorizer.vocabulary_)
+
+        with patch('utils.ai.feature_store.TfidfVectorizer') as mock_vectorizer:
+            stored_matrix, _ = feature_store.get_tfidf_features(self.df)
+            mock_vectorizer.assert_not_called()
+        self.assertEqual((stored_matrix != matrix).nnz, 0)
+
+    def test_get_tfidf_features_refits_changed_corpus(self):
+        feature_store.get_tfidf_features(self.df)
+        changed_df = self.df.copy()
+        changed_df.loc[2, 'processed_content'] = 'merger agreement'
+
+        matrix, vectorizer = feature_store.get_tfidf_features(changed_df)
+        self.assertIn('merger', vectorizer.vocabulary_)
+        self.assertEqual(matrix.shape[0], 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import sys
+import unittest
+import subprocess
+from playground.import_benchmark import APP_DIR, IMPORT_TIME_BUDGET, get_pages, measure_page
+
+class TestImportTime(unittest.TestCase):
+
+    def test_pages_within_budget(self):
+        for page in get_pages():
+            with self.subTest(page=page):
+                try:
+                    total, modules = measure_page(page)
+                except ImportError as e:
+                    if 'No module named' not in str(e):
+                        raise
+                    self.skipTest(f"{page} dependencies are not installed: {e}")
+                slowest = ', '.join(f"{module} {seconds:.2f}s" for seconds, module in modules[:3])
+                self.assertLessEqual(total, IMPORT_TIME_BUDGET, f"{page} imports take {total:.2f}s: {slowest}")
+
+    def test_heavy_resources_are_not_created_on_import(self):
+        code = (
+            "import sys\n"
+            "import utils.ai.openai_util, utils.db.news_db_util, utils.db.price_move_db_util\n"
+            "from utils.db.db_pool import DatabasePool\n"
+            "assert 'openai' not in sys.modules, 'openai imported'\n"
+            "assert DatabasePool()._engine is None, 'engine created'\n"
+        )
+        result = subprocess.run([sys.executable, '-c', code], cwd=APP_DIR, capture_output=True, text=True)
+        if 'ModuleNotFoundError' in result.stderr:
+            self.skipTest(result.stderr.strip().splitlines()[-1])
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
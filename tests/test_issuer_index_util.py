@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch
+from utils.issuer_index_util import IssuerIndex
+from utils import issuer_index_util
+
+RECORDS = [
+    {'id': 1, 'issuer': 'Bilendi SA', 'ticker': 'ALBLD', 'yf_ticker': 'ALBLD.PA', 'url': 'u1'},
+    {'id': 2, 'issuer': 'Intapp, Inc.', 'ticker': 'INTA', 'yf_ticker': 'INTA', 'url': 'u2'},
+    {'id': 3, 'issuer': 'Intapp Holdings', 'ticker': 'INTH', 'yf_ticker': 'INTH', 'url': 'u3'},
+    {'id': 4, 'issuer': 'Nordic Semiconductor ASA', 'ticker': 'NOD', 'yf_ticker': 'NOD.OL', 'url': 'u4'}
+]
+
+class TestIssuerIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IssuerIndex(RECORDS)
+
+    def test_exact_match(self):
+        self.assertEqual(self.index.match('INTAPP INC')['id'], 2)
+        self.assertEqual(self.index.match('intapp holdings')['id'], 3)
+
+    def test_substring_match_prefers_lowest_id(self):
+        self.assertEqual(self.index.match('BILENDI')['id'], 1)
+        self.assertEqual(self.index.match('Intapp')['id'], 2)
+        self.assertEqual(self.index.match('Semiconductor')['id'], 4)
+
+    def test_no_match(self):
+        self.assertIsNone(self.index.match('Unknown Corp'))
+        self.assertIsNone(self.index.match(''))
+        self.assertIsNone(self.index.match(None))
+
+    def test_fuzzy_match(self):
+        self.assertIsNone(self.index.match('Nordic Semiconductors'))
+        self.assertEqual(self.index.match('Nordic Semiconductors', fuzzy=True)['id'], 4)
+
+    @patch('utils.issuer_index_util.instrument_db_util')
+    def test_get_issuer_index_reloads_on_version_change(self, mock_db_util):
+        mock_db_util.get_instrument_records.return_value = RECORDS
+        mock_db_util.get_instrument_version.return_value = 100
+        issuer_index_util._index = None
+
+        issuer_index_util.get_issuer_index()
+        issuer_index_util.get_issuer_index()
+        self.assertEqual(mock_db_util.get_instrument_records.call_count, 1)
+
+        mock_db_util.get_instrument_version.return_value = 101
+        issuer_index_util.get_issuer_index()
+        self.assertEqual(mock_db_util.get_instrument_records.call_count, 2)
+        issuer_index_util._index = None
+
+if __name__ == '__main__':
+    unittest.main()
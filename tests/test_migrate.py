@@ -0,0 +1,77 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+from sqlalchemy import create_engine, inspect, text
+from utils.db import migrate
+
+class TestMigrate(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.migrations_dir = os.path.join(self.temp_dir, 'migrations')
+        os.makedirs(self.migrations_dir)
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir, 'migrate.db')}")
+        with self.engine.begin() as connection:
+            connection.execute(text("CREATE TABLE news (id INTEGER PRIMARY KEY, publisher TEXT, event TEXT)"))
+        self.patcher = patch.object(migrate, 'DatabasePool', return_value=MagicMock(engine=self.engine))
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.engine.dispose()
+        shutil.rmtree(self.temp_dir)
+
+    def write_migration(self, name, sql):
+        with open(os.path.join(self.migrations_dir, name), 'w') as f:
+            f.write(sql)
+
+    def get_indexes(self):
+        return {index['name'] for index in inspect(self.engine).get_indexes('news')}
+
+    def test_hot_path_indexes_build_concurrently(self):
+        with open(os.path.join(migrate.MIGRATIONS_DIR, '001_news_hot_path_indexes.sql')) as f:
+            sql = f.read()
+
+        self.assertIn(migrate.NO_TRANSACTION_DIRECTIVE, sql)
+        statements = migrate.split_statements(sql)
+        self.assertEqual(len(statements), 9)
+        for statement in statements:
+            self.assertRegex(statement, r'^CREATE (UNIQUE )?INDEX CONCURRENTLY IF NOT EXISTS ')
+
+    def test_no_transaction_migration_runs_statement_by_statement(self):
+        self.write_migration('001_indexes.sql', (
+            "-- Index comment; with a semicolon\n"
+            f"{migrate.NO_TRANSACTION_DIRECTIVE}\n"
+            "CREATE INDEX IF NOT EXISTS idx_news_publisher ON news (publisher);\n"
+            "CREATE INDEX IF NOT EXISTS idx_news_event ON news (missing_column);\n"
+        ))
+
+        with self.assertRaises(Exception):
+            migrate.apply_migrations(self.migrations_dir)
+        # Autocommit keeps the statements before the failure, but the migration is not recorded
+        self.assertEqual(self.get_indexes(), {'idx_news_publisher'})
+        self.assertEqual(migrate.get_pending_migrations(self.migrations_dir), ['001_indexes.sql'])
+
+        self.write_migration('001_indexes.sql', (
+            f"{migrate.NO_TRANSACTION_DIRECTIVE}\n"
+            "CREATE INDEX IF NOT EXISTS idx_news_publisher ON news (publisher);\n"
+            "CREATE INDEX IF NOT EXISTS idx_news_event ON news (event);\n"
+        ))
+        self.assertEqual(migrate.apply_migrations(self.migrations_dir), ['001_indexes.sql'])
+        self.assertEqual(self.get_indexes(), {'idx_news_publisher', 'idx_news_event'})
+        self.assertEqual(migrate.get_pending_migrations(self.migrations_dir), [])
+
+    def test_transactional_migration_rolls_back(self):
+        self.write_migration('001_table.sql', "CREATE TABLE broken (id INTEGER PRIMARY KEY, id INTEGER)")
+        with self.assertRaises(Exception):
+            migrate.apply_migrations(self.migrations_dir)
+        self.assertEqual(migrate.get_pending_migrations(self.migrations_dir), ['001_table.sql'])
+
+        self.write_migration('001_table.sql', "CREATE INDEX idx_news_publisher ON news (publisher)")
+        self.assertEqual(migrate.apply_migrations(self.migrations_dir), ['001_table.sql'])
+        self.assertEqual(self.get_indexes(), {'idx_news_publisher'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import warnings
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from sqlalchemy import create_engine, exc
+from sqlalchemy.orm import sessionmaker
+from utils.db import model_db_util
+from utils.db.model_db_util import ModelResultsBinary
+
+class TestModelDbUtil(unittest.TestCase):
+
+    def setUp(self):
+        model_db_util.invalidate_accuracy_cache()
+        self.session = MagicMock()
+        self.session.execute.return_value = [('earnings', 0.6), ('dividend', 0.55)]
+        session_context = MagicMock()
+        session_context.__enter__.return_value = self.session
+        self.patcher = patch.object(model_db_util.db_pool, 'get_session', return_value=session_context)
+        self.patcher.start()
+        self.tables_patcher = patch.object(model_db_util.db_pool, 'ensure_tables')
+        self.tables_patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.tables_patcher.stop()
+        model_db_util.invalidate_accuracy_cache()
+
+    def test_get_latest_accuracies_is_cached(self):
+        self.assertEqual(model_db_util.get_latest_accuracies(), {'earnings': 0.6, 'dividend': 0.55})
+        model_db_util.get_latest_accuracies()
+        self.assertEqual(self.session.execute.call_count, 1)
+
+        # An expired entry is reloaded
+        model_db_util.get_latest_accuracies(ttl=0)
+        self.assertEqual(self.session.execute.call_count, 2)
+
+    def test_save_results_invalidates_accuracies(self):
+        model_db_util.get_latest_accuracies()
+        results_df = pd.DataFrame([{
+            'event': 'earnings', 'accuracy': 0.7, 'precision': 0.7, 'recall': 0.7, 'f1_score': 0.7,
+            'auc_roc': 0.7, 'test_sample': 10, 'training_sample': 40, 'total_sample': 50
+        }])
+
+        self.assertTrue(model_db_util.save_results(results_df))
+        model_db_util.get_latest_accuracies()
+        self.assertEqual(self.session.execute.call_count, 2)
+
+class TestLatestAccuracyQuery(unittest.TestCase):
+
+    def test_latest_run_of_each_event(self):
+        engine = create_engine('sqlite://')
+        ModelResultsBinary.__table__.create(engine)
+        run = {'test_sample': 10, 'training_sample': 40, 'total_sample': 50}
+        with engine.begin() as connection:
+            connection.execute(ModelResultsBinary.__table__.insert(), [
+                {'id': 1, 'event': 'earnings', 'accuracy': 0.5, 'timestamp': datetime(2024, 1, 1), **run},
+                {'id': 2, 'event': 'earnings', 'accuracy': 0.6, 'timestamp': datetime(2024, 1, 2), **run},
+                # Same timestamp, the later id wins
+                {'id': 3, 'event': 'dividend', 'accuracy': 0.7, 'timestamp': datetime(2024, 1, 2), **run},
+                {'id': 4, 'event': 'dividend', 'accuracy': 0.8, 'timestamp': datetime(2024, 1, 2), **run},
+                {'id': 5, 'event': 'patents', 'accuracy': 0.9, 'timestamp': datetime(2024, 1, 1), **run}
+            ])
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', exc.SADeprecationWarning)
+            with engine.connect() as connection:
+                accuracies = dict(connection.execute(model_db_util.latest_accuracy_query()).all())
+        engine.dispose()
+
+        self.assertEqual(accuracies, {'earnings': 0.6, 'dividend': 0.8, 'patents': 0.9})
+
+class TestTrainingManifest(unittest.TestCase):
+
+    def test_get_training_manifest_on_empty_database(self):
+        engine = create_engine('sqlite://')
+        with patch.multiple(model_db_util.db_pool, _engine=engine, _SessionFactory=sessionmaker(bind=engine),
+                            _tables_ensured=False):
+            manifest_df = model_db_util.get_training_manifest('regression')
+        engine.dispose()
+
+        self.assertTrue(manifest_df.empty)
+        self.assertEqual(list(manifest_df.columns), model_db_util.TRAINING_MANIFEST_COLUMNS)
+
+if __name__ == '__main__':
+    unittest.main()
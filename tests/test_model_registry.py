@@ -0,0 +1,71 @@
+import unittest
+import os
+import tempfile
+import joblib
+from utils.ai.model_registry import ModelRegistry
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry()
+        self.registry.clear()
+        self.registry.max_bytes = 10 ** 9
+
+    def tearDown(self):
+        self.registry.clear()
+        self.tmp_dir.cleanup()
+
+    def _write_model(self, event, value):
+        model_filename = os.path.join(self.tmp_dir.name, f'{event}_regression.joblib')
+        vectorizer_filename = os.path.join(self.tmp_dir.name, f'{event}_tfidf_vectorizer_regression.joblib')
+        joblib.dump({'model': value}, model_filename)
+        joblib.dump({'vectorizer': value}, vectorizer_filename)
+        return model_filename, vectorizer_filename
+
+    def test_get_caches_until_file_changes(self):
+        files = self._write_model('earnings', 1)
+
+        model, _ = self.registry.get('earnings', 'regression', *files)
+        cached_model, _ = self.registry.get('earnings', 'regression', *files)
+        self.assertIs(model, cached_model)
+        self.assertEqual(self.registry.stats()['misses'], 1)
+
+        # A retrained model is picked up through its new mtime
+        self._write_model('earnings', 2)
+        os.utime(files[0], (0, os.path.getmtime(files[0]) + 10))
+        model, _ = self.registry.get('earnings', 'regression', *files)
+        self.assertEqual(model, {'model': 2})
+
+    def test_get_keys_on_the_files(self):
+        model_filename, vectorizer_filename = self._write_model('earnings', 1)
+        other_vectorizer_filename = os.path.join(self.tmp_dir.name, 'earnings_tfidf_vectorizer_binary.joblib')
+        joblib.dump({'vectorizer': 2}, other_vectorizer_filename)
+
+        _, vectorizer = self.registry.get('earnings', 'classifier_binary', model_filename, vectorizer_filename)
+        _, other_vectorizer = self.registry.get('earnings', 'classifier_binary', model_filename, other_vectorizer_filename)
+        self.assertEqual((vectorizer, other_vectorizer), ({'vectorizer': 1}, {'vectorizer': 2}))
+
+        # Both stay cached instead of evicting each other
+        self.registry.get('earnings', 'classifier_binary', model_filename, vectorizer_filename)
+        self.registry.get('earnings', 'classifier_binary', model_filename, other_vectorizer_filename)
+        self.assertEqual(self.registry.stats()['models'], 2)
+        self.assertEqual(self.registry.stats()['misses'], 2)
+
+    def test_get_evicts_least_recently_used(self):
+        first = self._write_model('earnings', 1)
+        second = self._write_model('dividend', 2)
+        self.registry.max_bytes = sum(os.path.getsize(f) for f in first) + 1
+
+        self.registry.get('earnings', 'regression', *first)
+        self.registry.get('dividend', 'regression', *second)
+
+        self.assertEqual(self.registry.stats()['models'], 1)
+        self.registry.get('dividend', 'regression', *second)
+        self.assertEqual(self.registry.stats()['misses'], 2)
+
+    def test_get_missing_files(self):
+        self.assertEqual(self.registry.get('missing', 'regression', 'nope.joblib', 'nope.joblib'), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
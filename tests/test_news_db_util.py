@@ -0,0 +1,304 @@
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+import pandas as pd
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from utils.db import news_db_util
+from utils.db.news_db_util import News
+from utils.db.model_db_util import ModelResultsBinary
+
+def compile_postgres(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+def make_record(i, **values):
+    record = dict(news_db_util.NEWS_COLUMN_DEFAULTS, link=f'https://example.com/{i}', publisher='p1',
+                  downloaded_at=datetime(2024, 1, 1))
+    record.update(values)
+    return record
+
+class MockSessions:
+    """Patch db_pool.get_session with a new mock session per call"""
+
+    def __init__(self, execute):
+        self.sessions = []
+        self.execute = execute
+
+    def __call__(self):
+        session = MagicMock()
+        session.execute.side_effect = self.execute
+        self.sessions.append(session)
+        context = MagicMock()
+        context.__enter__.return_value = session
+        return context
+
+class SQLiteNewsTestCase(unittest.TestCase):
+    """Runs the news_db_util sessions against an in-memory SQLite news table"""
+
+    rows = []
+
+    def setUp(self):
+        self.engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+        News.__table__.create(self.engine)
+        if self.rows:
+            with self.engine.begin() as connection:
+                connection.execute(News.__table__.insert(), self.rows)
+
+        factory = sessionmaker(bind=self.engine)
+        self.session_count = 0
+
+        @contextmanager
+        def get_session():
+            self.session_count += 1
+            session = factory()
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+
+        self.patchers = [patch.object(news_db_util.db_pool, name, side_effect=get_session)
+                         for name in ('get_session', 'get_read_session')]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        self.engine.dispose()
+
+    def fetch(self, *columns):
+        with self.engine.connect() as connection:
+            return connection.execute(select(*columns).order_by(News.id)).all()
+
+class TestAddNewsRecords(unittest.TestCase):
+
+    def setUp(self):
+        self.statements = []
+        # Ids RETURNING gives for each statement, rows left out already existed and None fails the statement
+        self.returned_ids = []
+        def execute(stmt):
+            self.statements.append(stmt)
+            news_ids = self.returned_ids[len(self.statements) - 1]
+            if news_ids is None:
+                raise RuntimeError('statement failed')
+            result = MagicMock()
+            result.fetchall.return_value = [(news_id,) for news_id in news_ids]
+            return result
+        self.sessions = MockSessions(execute)
+        self.patcher = patch.object(news_db_util.db_pool, 'get_session', side_effect=self.sessions)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_batches_insert_on_conflict_do_nothing(self):
+        self.returned_ids = [[1, 2], [3, 4], [5]]
+        records = [make_record(i) for i in range(5)]
+        added, duplicates = news_db_util.add_news_records(records, batch_size=2)
+
+        self.assertEqual((added, duplicates), (5, 0))
+        self.assertEqual(len(self.statements), 3)
+        sql = compile_postgres(self.statements[0])
+        self.assertIn('INSERT INTO news', sql)
+        self.assertIn('ON CONFLICT (link, publisher) DO NOTHING', sql)
+        self.assertIn('RETURNING news.id', sql)
+        self.assertEqual(self.statements[2].compile().params['link_m0'], 'https://example.com/4')
+
+    def test_counts_duplicates(self):
+        self.returned_ids = [[1, 2], [3]]
+        records = [make_record(i) for i in range(7)]
+        self.assertEqual(news_db_util.add_news_records(records, batch_size=4), (3, 4))
+
+    def test_each_batch_commits_in_its_own_session(self):
+        self.returned_ids = [[1, 2], [3, 4], [5]]
+        news_db_util.add_news_records([make_record(i) for i in range(5)], batch_size=2)
+        self.assertEqual(len(self.sessions.sessions), 3)
+        for session in self.sessions.sessions:
+            self.assertEqual(session.execute.call_count, 1)
+
+    def test_failing_batch_raises(self):
+        self.returned_ids = [[1], None, [3]]
+        with self.assertRaises(RuntimeError):
+            news_db_util.add_news_records([make_record(i) for i in range(3)], batch_size=1)
+        # The first batch was committed in its own session before the second one failed
+        self.assertEqual(len(self.sessions.sessions), 2)
+
+class TestAddNewsItems(unittest.TestCase):
+
+    def make_items(self):
+        return [News(title=f't{i}', link=f'https://example.com/{i}', publisher='p1', status='raw') for i in range(3)]
+
+    @patch.object(news_db_util, 'add_news_records', return_value=(2, 1))
+    def test_unique_items_go_through_the_upsert(self, mock_add_news_records):
+        self.assertEqual(news_db_util.add_news_items(self.make_items()), (2, 1))
+
+        records = mock_add_news_records.call_args[0][0]
+        self.assertEqual([record['link'] for record in records], [f'https://example.com/{i}' for i in range(3)])
+        self.assertEqual(set(records[0]), set(news_db_util.NEWS_COLUMN_DEFAULTS) | {'downloaded_at'})
+        # downloaded_at is filled in when the item has none
+        self.assertIsInstance(records[0]['downloaded_at'], datetime)
+
+    @patch.object(news_db_util, 'add_news_records')
+    def test_unchecked_items_are_added_directly(self, mock_add_news_records):
+        session = MagicMock()
+        context = MagicMock()
+        context.__enter__.return_value = session
+        items = self.make_items()
+        with patch.object(news_db_util.db_pool, 'get_session', return_value=context):
+            self.assertEqual(news_db_util.add_news_items(items, check_uniqueness=False), (3, 0))
+
+        session.add_all.assert_called_once_with(items)
+        mock_add_news_records.assert_not_called()
+
+class TestBulkUpdateNews(SQLiteNewsTestCase):
+
+    rows = [
+        {'id': i, 'title': f't{i}', 'company': f'company {i}', 'ticker': 'OLD', 'predicted_side': 'UP', 'predicted_move': 1.0}
+        for i in range(1, 6)
+    ]
+
+    def test_none_keeps_existing_values(self):
+        rows = [
+            {'news_id': 1, 'ticker': 'AAA', 'company': None},
+            {'news_id': 2, 'ticker': None, 'company': 'Beta'},
+            {'news_id': 3, 'ticker': None, 'company': None}
+        ]
+        self.assertEqual(news_db_util.bulk_update_news(rows, ['ticker', 'company']), (3, []))
+        self.assertEqual(self.fetch(News.ticker, News.company)[:4], [
+            ('AAA', 'company 1'), ('OLD', 'Beta'), ('OLD', 'company 3'), ('OLD', 'company 4')
+        ])
+
+    def test_updates_in_chunks(self):
+        rows = [{'news_id': i, 'ticker': f'T{i}'} for i in range(1, 6)]
+        self.assertEqual(news_db_util.bulk_update_news(rows, ['ticker'], chunk_size=2), (5, []))
+        self.assertEqual(self.session_count, 3)
+        self.assertEqual([row.ticker for row in self.fetch(News.ticker)], ['T1', 'T2', 'T3', 'T4', 'T5'])
+
+    def test_failed_chunk_ids_are_returned(self):
+        rows = [{'news_id': i, 'ticker': f'T{i}'} for i in range(1, 6)]
+        # A value the driver cannot bind fails the second chunk only
+        rows[2] = {'news_id': 3, 'ticker': 'T3', 'company': object()}
+        updated_count, failed_ids = news_db_util.bulk_update_news(rows, ['ticker', 'company'], chunk_size=2)
+        self.assertEqual((updated_count, failed_ids), (3, [3, 4]))
+        self.assertEqual([row.ticker for row in self.fetch(News.ticker)], ['T1', 'T2', 'OLD', 'OLD', 'T5'])
+
+    def test_update_news_predictions_keeps_missing_predictions(self):
+        df = pd.DataFrame({'news_id': [1, 2], 'predicted_side': ['DOWN', None], 'predicted_move': [None, -2.5]})
+        self.assertEqual(news_db_util.update_news_predictions(df), (2, []))
+        self.assertEqual(self.fetch(News.predicted_side, News.predicted_move)[:2], [('DOWN', 1.0), ('UP', -2.5)])
+
+    def test_wrappers_return_failed_ids(self):
+        df = pd.DataFrame({'id': [1, 2, 3], 'company': ['Alpha', object(), 'Gamma']})
+        self.assertEqual(news_db_util.update_companies(df, chunk_size=1), (2, [2]))
+        self.assertEqual(news_db_util.update_companies(df[['id']]), (0, []))
+
+    def test_update_news_tickers_and_records(self):
+        self.assertEqual(news_db_util.update_news_tickers([(1, 'AAA', 'AAA.HE', 7, ''), (2, '', '', None, '')]), (1, []))
+        self.assertEqual(news_db_util.update_records(pd.DataFrame({'news_id': [3, 4], 'company': ['Gamma', None]})), (1, []))
+        self.assertEqual(self.fetch(News.ticker, News.instrument_id, News.ticker_url, News.company)[:4], [
+            ('AAA', 7, None, 'company 1'), ('OLD', None, None, 'company 2'),
+            ('OLD', None, None, 'Gamma'), ('OLD', None, None, 'company 4')
+        ])
+
+STREAM_ROWS = [
+    {'id': i, 'title': f't{i}', 'content': 'body', 'publisher': 'p1' if i % 3 else 'p2',
+     'event': ['earnings', 'dividend', None][i % 3], 'predicted_move': i / 10,
+     'published_date': datetime(2024, 1, i)}
+    for i in range(1, 8)
+]
+
+class TestNewsStreaming(SQLiteNewsTestCase):
+
+    rows = STREAM_ROWS
+
+    def test_iter_news_df_streams_projected_chunks(self):
+        chunks = list(news_db_util.iter_news_df(['news_id', 'title'], publishers=['p1'], chunk_size=2, compact=False))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(list(chunks[0].columns), ['news_id', 'title'])
+        self.assertEqual(pd.concat(chunks)['news_id'].tolist(), [1, 2, 4, 5, 7])
+
+    def test_default_projection_leaves_out_content(self):
+        df = news_db_util.read_news_df()
+        self.assertEqual(list(df.columns), news_db_util.NEWS_SUMMARY_COLUMNS)
+        self.assertNotIn('content', df.columns)
+        self.assertEqual(list(news_db_util.get_news_df(columns=['news_id', 'content']).columns), ['news_id', 'content'])
+
+    def test_read_news_df_filters_and_orders(self):
+        df = news_db_util.read_news_df(['news_id', 'published_date'], start_date=datetime(2024, 1, 3),
+                                       end_date=datetime(2024, 1, 6), ascending=False, chunk_size=3)
+        self.assertEqual(df['news_id'].tolist(), [6, 5, 4, 3])
+
+        empty_df = news_db_util.read_news_df(['news_id', 'event'], publishers=['p3'])
+        self.assertTrue(empty_df.empty)
+        self.assertEqual(list(empty_df.columns), ['news_id', 'event'])
+
+    def test_compact_categories_cover_all_chunks(self):
+        df = news_db_util.read_news_df(['news_id', 'publisher', 'event', 'predicted_move'], compact=True, chunk_size=2)
+
+        self.assertEqual(len(df), 7)
+        self.assertIsInstance(df['publisher'].dtype, pd.CategoricalDtype)
+        self.assertEqual(set(df['publisher'].cat.categories), {'p1', 'p2'})
+        self.assertEqual(set(df['event'].cat.categories), {'earnings', 'dividend'})
+        self.assertEqual(df['predicted_move'].dtype, 'float32')
+        self.assertEqual(df['event'].isna().sum(), 2)
+
+class TestNewsPage(SQLiteNewsTestCase):
+
+    rows = [
+        {'id': 1, 'title': 'a', 'publisher': 'p1', 'ticker': 'NOKIA', 'event': 'earnings', 'published_date': datetime(2024, 1, 1)},
+        {'id': 2, 'title': 'b', 'publisher': 'p1', 'ticker': 'NOK_B', 'event': 'dividend', 'published_date': datetime(2024, 1, 2)},
+        {'id': 3, 'title': 'c', 'publisher': 'p1', 'ticker': 'NOK%A', 'event': 'patents', 'published_date': datetime(2024, 1, 3)},
+        {'id': 4, 'title': 'd', 'publisher': 'p1', 'ticker': 'SAMPO', 'event': None, 'published_date': datetime(2024, 1, 4)},
+        {'id': 5, 'title': 'e', 'publisher': 'p1', 'ticker': 'NOKXB', 'event': 'earnings', 'published_date': datetime(2024, 1, 5)},
+        {'id': 6, 'title': 'f', 'publisher': 'p2', 'ticker': 'NOKIA', 'event': 'earnings', 'published_date': datetime(2024, 1, 6)}
+    ]
+
+    def setUp(self):
+        super().setUp()
+        ModelResultsBinary.__table__.create(self.engine)
+        run = {'test_sample': 10, 'training_sample': 40, 'total_sample': 50}
+        with self.engine.begin() as connection:
+            connection.execute(ModelResultsBinary.__table__.insert(), [
+                {'event': 'earnings', 'accuracy': 0.9, 'timestamp': datetime(2024, 1, 1), **run},
+                {'event': 'earnings', 'accuracy': 0.6, 'timestamp': datetime(2024, 1, 2), **run},
+                {'event': 'dividend', 'accuracy': 0.7, 'timestamp': datetime(2024, 1, 1), **run}
+            ])
+
+    def get_ids(self, **kwargs):
+        df, total_count = news_db_util.get_news_page('p1', columns=['news_id', 'ticker'], **kwargs)
+        return df['news_id'].tolist(), total_count
+
+    def test_pages_and_total_count(self):
+        self.assertEqual(self.get_ids(page=1, items_per_page=2), ([5, 4], 5))
+        self.assertEqual(self.get_ids(page=3, items_per_page=2), ([1], 5))
+        self.assertEqual(self.get_ids(page=4, items_per_page=2), ([], 5))
+        # Pages before the first one return the first page
+        self.assertEqual(self.get_ids(page=0, items_per_page=2), ([5, 4], 5))
+
+    def test_sort_keys(self):
+        self.assertEqual(self.get_ids(sort_by='ticker', ascending=True)[0], [3, 1, 5, 2, 4])
+        self.assertEqual(self.get_ids(sort_by='published_date', ascending=True)[0], [1, 2, 3, 4, 5])
+        # Latest accuracy per event, news without a model run last in both directions
+        self.assertEqual(self.get_ids(sort_by='accuracy')[0], [2, 5, 1, 4, 3])
+        self.assertEqual(self.get_ids(sort_by='accuracy', ascending=True)[0], [1, 5, 2, 3, 4])
+
+    def test_event_and_date_filters(self):
+        self.assertEqual(self.get_ids(event_filter='earnings'), ([5, 1], 2))
+        self.assertEqual(self.get_ids(event_filter='Unclassified'), ([4], 1))
+        self.assertEqual(self.get_ids(start_date=datetime(2024, 1, 2), end_date=datetime(2024, 1, 4)), ([4, 3, 2], 3))
+
+    def test_ticker_filter_is_literal_and_case_insensitive(self):
+        self.assertEqual(self.get_ids(ticker_filter='nok'), ([5, 3, 2, 1], 4))
+        self.assertEqual(self.get_ids(ticker_filter='_'), ([2], 1))
+        self.assertEqual(self.get_ids(ticker_filter='k%a'), ([3], 1))
+
+if __name__ == '__main__':
+    unittest.main()
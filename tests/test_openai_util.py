@@ -0,0 +1,140 @@
+import os
+import re
+import json
+import shutil
+import tempfile
+import unittest
+import threading
+from functools import partial
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from unittest.mock import patch
+
+os.environ.setdefault('OPENAI_API_KEY', 'test-key')
+
+try:
+    from openai import OpenAI, AsyncOpenAI
+    from utils.ai import openai_util
+except ImportError:
+    openai_util = None
+
+from utils.ai.completion_cache import CompletionCache
+
+def tag_for(news):
+    return 'earnings' if 'earnings' in news else 'other'
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible chat completions endpoint"""
+    requests_seen = []
+    broken_batches = False
+    # Tag answered in the batch reply for news containing 'plant'
+    plant_batch_tag = None
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeOpenAIHandler.requests_seen.append(body)
+        prompt = body['messages'][-1]['content']
+
+        if 'response_format' in body:
+            articles = re.findall(r'^\d+\. "(.*)"$', prompt, re.MULTILINE)
+            tags = [tag_for(news) for news in articles]
+            if FakeOpenAIHandler.plant_batch_tag is not None:
+                tags = [FakeOpenAIHandler.plant_batch_tag if 'Plant' in news else tag for news, tag in zip(articles, tags)]
+            if FakeOpenAIHandler.broken_batches:
+                tags = tags[:-1]
+            content = json.dumps({'tags': tags})
+        elif prompt.startswith('Extract the company or issuer ticker'):
+            company = re.search(r'Company name: "(.*)"', prompt).group(1)
+            content = ' n/a ' if company == 'Unknown' else f' {company[:4].lower()} '
+        else:
+            content = tag_for(re.search(r'describes the news "(.*)" from the list', prompt).group(1))
+
+        response = json.dumps({
+            'id': 'chatcmpl-test', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        pass
+
+@unittest.skipIf(openai_util is None, "openai is not installed")
+class TestOpenAIUtil(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), FakeOpenAIHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}/v1'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FakeOpenAIHandler.requests_seen = []
+        FakeOpenAIHandler.broken_batches = False
+        FakeOpenAIHandler.plant_batch_tag = None
+        self.temp_dir = tempfile.mkdtemp()
+        completion_cache = CompletionCache(os.path.join(self.temp_dir, 'completions.sqlite'))
+        patches = [
+            patch.object(openai_util, 'get_completion_cache', return_value=completion_cache),
+            patch.object(openai_util, '_client', OpenAI(base_url=self.base_url, api_key='test-key')),
+            patch.object(openai_util, 'create_async_client',
+                         partial(AsyncOpenAI, base_url=self.base_url, api_key='test-key'))
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tag_news_batch_packs_articles_and_caches_results(self):
+        news = ['Q3 earnings beat', 'New CEO appointed', 'Record earnings', 'Plant opening']
+
+        tags = openai_util.tag_news_batch(news, ['earnings', 'other'], batch_size=3)
+        self.assertEqual(tags, ['earnings', 'other', 'earnings', 'other'])
+        self.assertEqual(len(FakeOpenAIHandler.requests_seen), 2)
+
+        # Re-running the batch and the single-article function costs no requests
+        self.assertEqual(openai_util.tag_news_batch(news, ['earnings', 'other']), tags)
+        self.assertEqual(openai_util.tag_news('Record earnings', ['earnings', 'other']), 'earnings')
+        self.assertEqual(len(FakeOpenAIHandler.requests_seen), 2)
+
+    def test_tag_news_batch_falls_back_to_single_requests(self):
+        FakeOpenAIHandler.broken_batches = True
+
+        tags = openai_util.tag_news_batch(['Q3 earnings beat', 'Plant opening'], ['earnings', 'other'])
+        self.assertEqual(tags, ['earnings', 'other'])
+        # One batch request with a wrong number of tags, then one request per article
+        self.assertEqual(len(FakeOpenAIHandler.requests_seen), 3)
+
+    def test_tag_news_batch_retries_tags_outside_the_list(self):
+        for batch_tag in ('expansion', ['other']):
+            with self.subTest(batch_tag=batch_tag):
+                FakeOpenAIHandler.requests_seen = []
+                FakeOpenAIHandler.plant_batch_tag = batch_tag
+                news = ['Q3 earnings beat', f'Plant opening {batch_tag}']
+
+                tags = openai_util.tag_news_batch(news, 'earnings, other')
+                self.assertEqual(tags, ['earnings', 'other'])
+                # One batch request, then a single request for the news with the invalid tag
+                self.assertEqual(len(FakeOpenAIHandler.requests_seen), 2)
+
+                # The invalid batch answer was not cached, the single-news answer was
+                self.assertEqual(openai_util.tag_news(news[1], 'earnings, other'), 'other')
+                self.assertEqual(len(FakeOpenAIHandler.requests_seen), 2)
+
+    def test_extract_ticker_batch(self):
+        tickers = openai_util.extract_ticker_batch(['Apple Inc', 'Unknown', 'Apple Inc'])
+        self.assertEqual(tickers, ['APPL', None, 'APPL'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from collections import Counter
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from utils.ai import predict
+
+class StubVectorizer:
+    def transform(self, texts):
+        return list(texts)
+
+class StubRegression:
+    def predict(self, texts):
+        # The row number in the text makes every prediction traceable to its row
+        return np.array([float(text.split()[-1]) for text in texts])
+
+class StubClassifier:
+    def predict(self, texts):
+        return np.array([1 if 'rise' in text else 0 for text in texts])
+
+class StubRegistry:
+    """Model registry serving stub models, without models for 'patents'"""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def get(self, event, model_type, model_filename, vectorizer_filename):
+        self.calls[(event, model_type)] += 1
+        if event == 'patents':
+            return None, None
+        model = StubRegression() if model_type == 'regression' else StubClassifier()
+        return model, StubVectorizer()
+
+class TestPredict(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = StubRegistry()
+        self.patcher = patch.object(predict, 'model_registry', self.registry)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def make_news_df(self):
+        events = ['Earnings', 'dividend', 'earnings', 'patents', None, 'dividend', 'earnings']
+        contents = [f"{'rise' if i % 2 else 'fall'} {i}" for i in range(len(events))]
+        contents[5] = None
+        return pd.DataFrame({
+            'event': events,
+            'content': contents,
+            'title': [f'title {i}' for i in range(len(events))]
+        }, index=[70, 60, 50, 40, 30, 20, 10])
+
+    def test_each_event_model_is_loaded_once(self):
+        predict.predict(self.make_news_df())
+        self.assertEqual(self.registry.calls, Counter({
+            ('earnings', 'regression'): 1, ('dividend', 'regression'): 1, ('patents', 'regression'): 1,
+            ('earnings', 'classifier_binary'): 1, ('dividend', 'classifier_binary'): 1,
+            ('patents', 'classifier_binary'): 1
+        }))
+
+    def test_predictions_map_back_to_their_rows(self):
+        df = predict.predict(self.make_news_df())
+
+        self.assertEqual(list(df.index), [70, 60, 50, 40, 30, 20, 10])
+        # Row 5 has no content and is predicted from its title
+        expected_moves = [0.0, 1.0, 2.0, np.nan, np.nan, 5.0, 6.0]
+        np.testing.assert_array_equal(df['predicted_move'].to_numpy(dtype=float), expected_moves)
+        self.assertEqual(df['predicted_side'].tolist(), ['DOWN', 'UP', 'DOWN', None, None, 'DOWN', 'DOWN'])
+
+    def test_existing_predictions_are_kept(self):
+        df = self.make_news_df()
+        df['predicted_move'] = [9.0, None, None, None, None, None, None]
+        df['predicted_side'] = ['UP', None, None, None, None, None, None]
+
+        df = predict.predict(df)
+        self.assertEqual(df.loc[70, 'predicted_move'], 9.0)
+        self.assertEqual(df.loc[70, 'predicted_side'], 'UP')
+        self.assertEqual(df.loc[10, 'predicted_move'], 6.0)
+
+    def test_main_retries_failed_prediction_updates(self):
+        news_df = self.make_news_df().reset_index(drop=True)
+        news_df['news_id'] = range(1, len(news_df) + 1)
+        with patch.object(predict.news_db_util, 'get_news_df', return_value=news_df), \
+                patch.object(predict.news_db_util, 'update_news_predictions',
+                             side_effect=[(5, [2, 3]), (2, [])]) as mock_update, \
+                patch.object(predict, 'preload_models'):
+            predict.main()
+
+        self.assertEqual(mock_update.call_count, 2)
+        self.assertEqual(mock_update.call_args_list[1][0][0]['news_id'].tolist(), [2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
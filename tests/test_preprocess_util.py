@@ -0,0 +1,52 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import tempfile
+import pandas as pd
+from utils.ai import preprocess_util
+
+class FakeToken:
+    def __init__(self, text):
+        self.lemma_ = text.lower()
+        self.is_stop = text.lower() in ('the', 'a')
+        self.is_punct = text in ('.', ',')
+
+class TestPreprocessUtil(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp_dir.name, 'cache.sqlite')
+        self.lemmatized = []
+        self.nlp = MagicMock()
+        self.nlp.pipe.side_effect = self._pipe
+
+    def _pipe(self, texts, **kwargs):
+        texts = list(texts)
+        self.lemmatized.extend(texts)
+        return [[FakeToken(t) for t in text.split()] for text in texts]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_get_text_to_process(self):
+        df = pd.DataFrame({'content': ['body', '', None], 'title': ['t1', 't2', 't3']})
+        self.assertEqual(preprocess_util.get_text_to_process(df).tolist(), ['body', 't2', 't3'])
+
+    def test_preprocess_texts_uses_cache(self):
+        texts = pd.Series(['The Profit rose .', 'A Dividend', 'The Profit rose .'], index=[10, 11, 12])
+
+        with patch('utils.ai.preprocess_util.get_nlp', return_value=self.nlp):
+            result = preprocess_util.preprocess_texts(texts, cache_path=self.cache_path, n_process=1)
+            self.assertEqual(result.tolist(), ['profit rose', 'dividend', 'profit rose'])
+            self.assertEqual(result.index.tolist(), [10, 11, 12])
+            # Duplicates are lemmatized once
+            self.assertEqual(self.lemmatized, ['The Profit rose .', 'A Dividend'])
+
+            result = preprocess_util.preprocess_texts(pd.Series(['A Dividend', 'New text']),
+                                                      cache_path=self.cache_path, n_process=1)
+            self.assertEqual(result.tolist(), ['dividend', 'new text'])
+            # Only the new text is lemmatized on the second run
+            self.assertEqual(self.lemmatized[2:], ['New text'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,11 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from datetime import datetime
-from utils.db.price_move_db_util import PriceMove, store_price_move
+import numpy as np
+import pandas as pd
+from sqlalchemy.dialects import postgresql
+import utils.db.price_move_db_util as price_move_db_util
+from utils.db.price_move_db_util import PriceMove, store_price_move, store_price_moves, PRICE_MOVE_COLUMNS
 
 class TestPriceMoveDbUtil(unittest.TestCase):
 
@@ -78,5 +82,104 @@ class TestPriceMoveDbUtil(unittest.TestCase):
         mock_verify_session.query.return_value.filter_by.assert_called_once_with(news_id='1')
         mock_verify_session.close.assert_called_once()
 
+def make_price_moves_df(n):
+    return pd.DataFrame({
+        'news_id': range(1, n + 1),
+        'ticker': 'AAPL',
+        'published_date': datetime(2023, 1, 3, 10, 0),
+        'begin_price': 100.0,
+        'end_price': [101.0] * (n - 1) + [np.nan],
+        'index_begin_price': 1000.0,
+        'index_end_price': 1010.0,
+        'volume': [1000000.0] * (n - 1) + [np.nan],
+        'market': 'market_open',
+        'price_change': 1.0,
+        'price_change_percentage': 0.01,
+        'index_price_change': 10.0,
+        'index_price_change_percentage': 0.01,
+        'daily_alpha': 0.0,
+        'actual_side': 'UP'
+    })
+
+class TestStorePriceMoves(unittest.TestCase):
+
+    def setUp(self):
+        self.statements = []
+        # (xmax = 0) per returned row: True for inserted rows, False for updated ones
+        self.inserted = []
+
+        def get_session():
+            session = MagicMock()
+            def execute(stmt):
+                self.statements.append(stmt)
+                return [(flag,) for flag in self.inserted[len(self.statements) - 1]]
+            session.execute.side_effect = execute
+            context = MagicMock()
+            context.__enter__.return_value = session
+            return context
+
+        self.patchers = [
+            patch.object(price_move_db_util.db_pool, 'get_session', side_effect=get_session),
+            patch.object(price_move_db_util.db_pool, 'ensure_tables')
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_upsert_statement(self):
+        self.inserted = [[True, False]]
+        store_price_moves(make_price_moves_df(2))
+
+        sql = str(self.statements[0].compile(dialect=postgresql.dialect()))
+        self.assertIn('INSERT INTO price_moves', sql)
+        self.assertIn('ON CONFLICT (news_id) DO UPDATE SET', sql)
+        self.assertIn('ticker = excluded.ticker', sql)
+        self.assertIn('predicted_move = excluded.predicted_move', sql)
+        self.assertNotIn('news_id = excluded.news_id', sql)
+        self.assertIn('RETURNING (xmax = 0)', sql)
+
+    def test_records_convert_nan_and_volume(self):
+        self.inserted = [[True, True]]
+        store_price_moves(make_price_moves_df(2))
+
+        params = self.statements[0].compile().params
+        self.assertEqual((params['news_id_m0'], params['news_id_m1']), ('1', '2'))
+        self.assertEqual(params['volume_m0'], 1000000)
+        self.assertIs(type(params['volume_m0']), int)
+        self.assertIsNone(params['volume_m1'])
+        self.assertIsNone(params['end_price_m1'])
+        # Missing optional columns are stored as NULL
+        self.assertIsNone(params['predicted_side_m0'])
+        self.assertEqual({key.rsplit('_m', 1)[0] for key in params}, set(PRICE_MOVE_COLUMNS))
+
+    def test_chunks_and_counts(self):
+        self.inserted = [[True, True], [False, True], [False]]
+        self.assertEqual(store_price_moves(make_price_moves_df(5), chunk_size=2), (3, 2))
+
+        self.assertEqual(len(self.statements), 3)
+        self.assertEqual(self.statements[2].compile().params['news_id_m0'], '5')
+
+    def test_duplicated_news_ids_keep_the_last_move(self):
+        self.inserted = [[True, True], [True]]
+        df = make_price_moves_df(4)
+        df.loc[2, 'news_id'] = 1
+        df.loc[2, 'begin_price'] = 99.0
+        # Rows 0 and 2 would otherwise land in the same chunk
+        self.assertEqual(store_price_moves(df, chunk_size=2), (3, 0))
+
+        params = [stmt.compile().params for stmt in self.statements]
+        news_ids = [params[0]['news_id_m0'], params[0]['news_id_m1'], params[1]['news_id_m0']]
+        self.assertEqual(news_ids, ['2', '1', '4'])
+        self.assertEqual(params[0]['begin_price_m1'], 99.0)
+
+    def test_failing_chunk_raises(self):
+        self.inserted = [[True]]
+        with self.assertRaises(IndexError):
+            store_price_moves(make_price_moves_df(2), chunk_size=1)
+        self.assertEqual(len(self.statements), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,8 +1,9 @@
 import unittest
+import tempfile
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from datetime import datetime
-from utils.price_move_util import set_prices, create_price_moves, create_price_move
+from utils.price_move_util import set_prices, set_prices_batch, create_price_moves, create_price_move
 
 class TestPriceMoveUtil(unittest.TestCase):
 
@@ -35,11 +36,61 @@ class TestPriceMoveUtil(unittest.TestCase):
         self.assertAlmostEqual(result['price_change'], 1)
         self.assertAlmostEqual(result['price_change_percentage'], 1/101)
 
+    @patch('utils.bar_store_util.yf.download')
+    def test_set_prices_batch(self, mock_yf_download):
+        dates = pd.to_datetime(['2023-01-02', '2023-01-03', '2023-01-04', '2023-01-05'])
+
+        def bars(offset):
+            return pd.DataFrame({
+                'Open': [100.0 + offset, 101.0 + offset, 102.0 + offset, 103.0 + offset],
+                'Close': [100.5 + offset, 101.5 + offset, 102.5 + offset, 103.5 + offset],
+                'Volume': [1000, 2000, 3000, 4000]
+            }, index=dates)
+
+        def download(symbols, start=None, end=None, **kwargs):
+            return pd.concat({symbol: bars(1000 if symbol == 'SPY' else 0) for symbol in symbols}, axis=1)
+
+        mock_yf_download.side_effect = download
+
+        news_df = pd.DataFrame({
+            'news_id': [1, 2, 3, 4],
+            'yf_ticker': ['AAPL', 'AAPL', 'MSFT', None],
+            'published_date': [
+                pd.Timestamp('2023-01-04 08:00:00'),
+                pd.Timestamp('2023-01-04 10:00:00'),
+                pd.Timestamp('2023-01-04 17:00:00'),
+                pd.Timestamp('2023-01-04 10:00:00')
+            ]
+        })
+
+        with tempfile.TemporaryDirectory() as store_dir, patch('utils.bar_store_util.BAR_STORE_DIR', store_dir):
+            result = set_prices_batch(news_df)
+            # A second run is served from the bar store
+            set_prices_batch(news_df)
+
+        # One request for the distinct tickers and one for the index
+        self.assertEqual(mock_yf_download.call_count, 2)
+        # Pre-market: previous close to today's open
+        self.assertEqual(result.loc[0, 'begin_price'], 101.5)
+        self.assertEqual(result.loc[0, 'end_price'], 102.0)
+        self.assertEqual(result.loc[0, 'market'], 'pre_market')
+        # Regular market: today's open to today's close
+        self.assertEqual(result.loc[1, 'begin_price'], 102.0)
+        self.assertEqual(result.loc[1, 'end_price'], 102.5)
+        self.assertEqual(result.loc[1, 'index_begin_price'], 1102.0)
+        # After market: today's close to next day's open
+        self.assertEqual(result.loc[2, 'begin_price'], 102.5)
+        self.assertEqual(result.loc[2, 'end_price'], 103.0)
+        self.assertEqual(result.loc[2, 'actual_side'], 'UP')
+        self.assertEqual(result.loc[2, 'Volume'], 3000)
+        # Rows without a ticker are left unpriced
+        self.assertTrue(pd.isna(result.loc[3, 'begin_price']))
+
     @patch('utils.price_move_util.set_prices')
-    @patch('utils.price_move_util.store_price_move')
-    def test_create_price_moves(self, mock_store_price_move, mock_set_prices):
+    @patch('utils.price_move_util.store_price_moves')
+    def test_create_price_moves(self, mock_store_price_moves, mock_set_prices):
         # Mock set_prices function
-        mock_set_prices.return_value = pd.Series({
+        mock_set_prices.side_effect = lambda row: pd.concat([row, pd.Series({
             'begin_price': 100,
             'end_price': 101,
             'index_begin_price': 1000,
@@ -50,20 +101,24 @@ class TestPriceMoveUtil(unittest.TestCase):
             'index_price_change_percentage': 0.01,
             'Volume': 1000000,
             'market': 'market_open'
-        })
+        })])
+        mock_store_price_moves.return_value = (2, 0)
 
         # Test input
         news_df = pd.DataFrame({
             'news_id': ['1', '2'],  # Add this line
-            'ticker': ['AAPL', 'GOOGL'],
-            'published_date': [pd.Timestamp('2023-01-03 10:00:00'), pd.Timestamp('2023-01-04 10:00:00')],
-            'market': ['market_open', 'market_open']
+            'yf_ticker': ['AAPL', 'GOOGL'],
+            'published_date': [pd.Timestamp('2023-01-03 10:00:00'), pd.Timestamp('2023-01-04 10:00:00')]
         })
 
-        result = create_price_moves(news_df)
+        result = create_price_moves(news_df, batch=False)
 
         self.assertEqual(len(result), 2)
-        self.assertEqual(mock_store_price_move.call_count, 2)
+        # All price moves are stored with a single bulk call
+        mock_store_price_moves.assert_called_once()
+        stored_df = mock_store_price_moves.call_args[0][0]
+        self.assertEqual(stored_df['ticker'].tolist(), ['AAPL', 'GOOGL'])
+        self.assertEqual(stored_df['volume'].tolist(), [1000000, 1000000])
 
     def test_create_price_move(self):
         price_move = create_price_move(
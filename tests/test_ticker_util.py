@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from utils.issuer_index_util import IssuerIndex
+from utils import ticker_util
+
+RECORDS = [
+    {'id': 1, 'issuer': 'Bilendi SA', 'ticker': 'ALBLD', 'yf_ticker': 'ALBLD.PA', 'url': 'u1'},
+    {'id': 2, 'issuer': 'Intapp, Inc.', 'ticker': 'INTA', 'yf_ticker': 'INTA', 'url': None}
+]
+
+class TestTickerUtil(unittest.TestCase):
+
+    def setUp(self):
+        self.index = IssuerIndex(RECORDS)
+        self.patcher = patch('utils.ticker_util.get_issuer_index', return_value=self.index)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def test_get_ticker(self):
+        df = pd.DataFrame({
+            'company': ['BILENDI', 'Intapp', 'Unknown', None, 'BILENDI'],
+            'ticker': [None, 'N/A', 'UNK', None, 'KEEP'],
+            'yf_ticker': [np.nan, 'OLD', None, None, ''],
+            'instrument_id': [None, None, None, None, 7]
+        })
+
+        with patch.object(self.index, 'match', wraps=self.index.match) as mock_match:
+            result = ticker_util.get_ticker(df)
+            # Each distinct name is resolved once
+            self.assertEqual(mock_match.call_count, 3)
+
+        self.assertEqual(result['ticker'].tolist()[:3] + result['ticker'].tolist()[4:], ['ALBLD', 'INTA', 'UNK', 'KEEP'])
+        self.assertTrue(pd.isna(result['ticker'].iloc[3]))
+        self.assertEqual(result['yf_ticker'].tolist()[:2], ['ALBLD.PA', 'OLD'])
+        self.assertEqual(result['yf_ticker'].iloc[4], 'ALBLD.PA')
+        self.assertEqual(result['instrument_id'].tolist()[:2], [1, 2])
+        self.assertEqual(result['instrument_id'].iloc[4], 7)
+        self.assertEqual(result['ticker_url'].iloc[0], 'u1')
+        self.assertTrue(pd.isna(result['ticker_url'].iloc[1]))
+
+if __name__ == '__main__':
+    unittest.main()
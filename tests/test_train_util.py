@@ -0,0 +1,61 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from utils.ai.train_util import get_pool_sizes, train_events, get_event_fingerprints, select_changed_events
+
+def count_event_rows(event, df, n_jobs=None):
+    if event == 'skip':
+        return None
+    return {'event': event, 'rows': int((df['event'] == event).sum()), 'n_jobs': n_jobs}
+
+class TestTrainUtil(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame({'event': ['earnings', 'earnings', 'dividend', 'skip']})
+
+    @patch('utils.ai.train_util.os.cpu_count', return_value=8)
+    def test_get_pool_sizes(self, mock_cpu_count):
+        self.assertEqual(get_pool_sizes(50), (8, 1))
+        self.assertEqual(get_pool_sizes(2), (2, 4))
+        self.assertEqual(get_pool_sizes(50, max_workers=1), (1, 8))
+
+    def test_train_events(self):
+        for max_workers in (1, 2):
+            results = train_events(count_event_rows, self.df, ['earnings', 'dividend', 'skip'], max_workers)
+            self.assertEqual([(r['event'], r['rows']) for r in results], [('earnings', 2), ('dividend', 1)])
+
+    def test_select_changed_events(self):
+        df = pd.DataFrame({
+            'id': [1, 2, 3, 4],
+            'event': ['earnings', 'earnings', 'dividend', 'merger'],
+            'target': [1.0, 2.0, 3.0, 4.0]
+        })
+        manifest = get_event_fingerprints(df, ['target'])
+        manifest = manifest[manifest['event'] != 'merger']
+
+        changed_df = pd.concat([df, pd.DataFrame({'id': [5], 'event': ['earnings'], 'target': [5.0]})])
+        fingerprints = get_event_fingerprints(changed_df, ['target'])
+
+        self.assertEqual(select_changed_events(fingerprints, manifest, min_samples=1), ['earnings', 'merger'])
+        # One new row on two is a 50% change
+        self.assertEqual(select_changed_events(fingerprints, manifest, min_change=0.6, min_samples=1), ['merger'])
+        self.assertEqual(select_changed_events(fingerprints, manifest.iloc[0:0], min_samples=1),
+                         ['earnings', 'dividend', 'merger'])
+
+    def test_select_changed_events_leaves_out_small_events(self):
+        df = pd.DataFrame({
+            'id': range(15),
+            'event': ['earnings'] * 10 + ['dividend'] * 5,
+            'target': [float(i) for i in range(15)]
+        })
+        fingerprints = get_event_fingerprints(df, ['target'])
+        # Without a manifest entry, dividend would be picked on every run and skipped by training
+        self.assertEqual(select_changed_events(fingerprints, fingerprints.iloc[0:0]), ['earnings'])
+
+        # It is picked up once it has enough rows
+        manifest = fingerprints[fingerprints['event'] == 'earnings']
+        grown_df = pd.concat([df, pd.DataFrame({'id': range(15, 20), 'event': 'dividend', 'target': 1.0})])
+        self.assertEqual(select_changed_events(get_event_fingerprints(grown_df, ['target']), manifest), ['dividend'])
+
+if __name__ == '__main__':
+    unittest.main()
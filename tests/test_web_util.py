@@ -0,0 +1,67 @@
+import unittest
+import threading
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from utils.scrape.web_util import ContentFetcher, FAILED_CONTENT
+
+class ArticleHandler(BaseHTTPRequestHandler):
+    requests_seen = []
+    flaky_failures = 0
+
+    def do_GET(self):
+        ArticleHandler.requests_seen.append(self.path)
+        if self.path == '/missing':
+            self.send_response(404)
+            self.end_headers()
+            return
+        if self.path == '/flaky' and ArticleHandler.flaky_failures < 1:
+            ArticleHandler.flaky_failures += 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        body = f'<html><script>x()</script><p>Article</p><p>{self.path}</p></html>'.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestWebUtil(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = HTTPServer(('127.0.0.1', 0), ArticleHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ArticleHandler.requests_seen = []
+        ArticleHandler.flaky_failures = 0
+        self.fetcher = ContentFetcher(max_workers=4, per_host_limit=2, timeout=(2, 5), backoff_factor=0)
+
+    def test_fetch_many_downloads_each_url_once(self):
+        urls = [f'{self.base_url}/a', f'{self.base_url}/b', f'{self.base_url}/a']
+
+        contents = self.fetcher.fetch_many(urls)
+        self.assertEqual(contents[f'{self.base_url}/a'], 'Article /a')
+        self.assertEqual(len(contents), 2)
+
+        # Later stages are served from the cache
+        self.assertEqual(self.fetcher.fetch(f'{self.base_url}/b'), 'Article /b')
+        self.assertEqual(sorted(ArticleHandler.requests_seen), ['/a', '/b'])
+
+    def test_fetch_retries_and_failures(self):
+        self.assertEqual(self.fetcher.fetch(f'{self.base_url}/flaky'), 'Article /flaky')
+        self.assertEqual(ArticleHandler.requests_seen, ['/flaky', '/flaky'])
+        self.assertEqual(self.fetcher.fetch(f'{self.base_url}/missing'), FAILED_CONTENT)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+COMPLETION_CACHE_PATH = os.getenv('COMPLETION_CACHE_PATH', os.path.join('data', 'completion_cache.sqlite'))
+COMPLETION_CACHE_MAX_BYTES = int(os.getenv('COMPLETION_CACHE_MAX_BYTES', 256 * 1024 ** 2))
+
+DAY = 24 * 60 * 60
+
+# Seconds a response stays valid per prompt type, None to keep it until evicted
+COMPLETION_CACHE_TTLS = {
+    'tag_news': None,
+    'enrich_reason': 90 * DAY,
+    'extract_ticker': 30 * DAY,
+    'extract_issuer': None
+}
+
+# Writes between checks of the size limit
+EVICTION_INTERVAL = 100
+
+# Bump when the table layout changes, older cache files are then recreated
+SCHEMA_VERSION = 2
+
+def make_key(prompt_type, model, messages, options=None):
+    """Hash of the prompt type, model, rendered messages and request options"""
+    payload = json.dumps([prompt_type, model, messages, options or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class CompletionCache:
+    """
+    Persistent LLM completion results keyed by make_key.
+
+    The cache is a SQLite file in WAL mode, so enrichment workers and the Streamlit app
+    can read and write it from several processes at once. Responses expire per prompt
+    type and the least recently used ones are evicted once the file exceeds max_bytes.
+    """
+
+    def __init__(self, path=COMPLETION_CACHE_PATH, max_bytes=COMPLETION_CACHE_MAX_BYTES, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(COMPLETION_CACHE_TTLS, **(ttls or {}))
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_schema()
+
+    def _connection(self):
+        # SQLite connections cannot be shared between threads or inherited by forked workers
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _create_schema(self):
+        with self._connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS completions')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS completions ('
+                'key TEXT PRIMARY KEY, prompt_type TEXT NOT NULL, response TEXT NOT NULL, '
+                'size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL, expires_at REAL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_completions_accessed_at ON completions (accessed_at)')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def get(self, key):
+        """Get a cached response, None on a miss or when it has expired"""
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            'SELECT response FROM completions WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, now)
+        ).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        with conn:
+            conn.execute('UPDATE completions SET accessed_at = ? WHERE key = ?', (now, key))
+        return row[0]
+
+    def set(self, key, prompt_type, response):
+        if response is None:
+            return
+        now = time.time()
+        ttl = self.ttls.get(prompt_type)
+        expires_at = now + ttl if ttl is not None else None
+        size = len(key) + len(response.encode('utf-8'))
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO completions '
+                '(key, prompt_type, response, size, created_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, prompt_type, response, size, now, now, expires_at)
+            )
+        with self._lock:
+            self._writes += 1
+            check_size = self._writes % EVICTION_INTERVAL == 0
+        if check_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Drop expired responses, then the least recently used ones until the cache fits max_bytes.
+
+        Returns:
+            int: number of responses removed
+        """
+        with self._connection() as conn:
+            removed = conn.execute('DELETE FROM completions WHERE expires_at <= ?', (time.time(),)).rowcount
+            total_bytes = conn.execute('SELECT COALESCE(SUM(size), 0) FROM completions').fetchone()[0]
+            if total_bytes > self.max_bytes:
+                # Free a margin so the next writes do not evict again right away
+                excess = total_bytes - int(self.max_bytes * 0.9)
+                keys = []
+                rows = conn.execute('SELECT key, size FROM completions ORDER BY accessed_at')
+                for key, size in rows:
+                    keys.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                rows.close()
+                conn.executemany('DELETE FROM completions WHERE key = ?', keys)
+                removed += len(keys)
+        if removed:
+            logger.info(f"Evicted {removed} cached completions")
+        return removed
+
+    def clear(self):
+        """Drop all cached responses and reset the statistics"""
+        with self._connection() as conn:
+            conn.execute('DELETE FROM completions')
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Get cache statistics, hits and misses are counted per process"""
+        entries, total_bytes = self._connection().execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions').fetchone()
+        with self._lock:
+            return {
+                'entries': entries,
+                'bytes': total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_completion_cache():
+    """Get the process-wide completion cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CompletionCache()
+        return _cache
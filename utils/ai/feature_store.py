@@ -0,0 +1,86 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+import joblib
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+FEATURE_STORE_DIR = os.getenv('FEATURE_STORE_DIR', os.path.join('data', 'features'))
+
+TFIDF_MAX_FEATURES = 1000
+
+def _paths(name):
+    return {
+        'matrix': os.path.join(FEATURE_STORE_DIR, f'{name}_matrix.npz'),
+        'vectorizer': os.path.join(FEATURE_STORE_DIR, f'{name}_vectorizer.joblib'),
+        'manifest': os.path.join(FEATURE_STORE_DIR, f'{name}_manifest.json')
+    }
+
+def corpus_hash(df, max_features):
+    """Hash of the corpus ids, texts and vectorizer settings, in row order"""
+    row_hashes = pd.util.hash_pandas_object(df[['id', 'processed_content']], index=False)
+    digest = hashlib.sha256(row_hashes.values.tobytes())
+    digest.update(str(max_features).encode('utf-8'))
+    return digest.hexdigest()
+
+def load_features(name, expected_hash):
+    """Load a stored feature matrix and vectorizer if they were built from the same corpus"""
+    paths = _paths(name)
+    if not all(os.path.exists(path) for path in paths.values()):
+        return None
+
+    with open(paths['manifest']) as f:
+        manifest = json.load(f)
+    if manifest.get('corpus_hash') != expected_hash:
+        return None
+
+    logger.info(f"Loading {name} features built at {manifest.get('created_at')}")
+    return sparse.load_npz(paths['matrix']), joblib.load(paths['vectorizer'])
+
+def save_features(name, matrix, vectorizer, hash_value):
+    os.makedirs(FEATURE_STORE_DIR, exist_ok=True)
+    paths = _paths(name)
+    sparse.save_npz(paths['matrix'], matrix)
+    joblib.dump(vectorizer, paths['vectorizer'])
+    # The manifest is written last so a partial save is never picked up
+    with open(paths['manifest'], 'w') as f:
+        json.dump({
+            'corpus_hash': hash_value,
+            'rows': matrix.shape[0],
+            'features': matrix.shape[1],
+            'vocabulary': sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get),
+            'created_at': datetime.now().isoformat()
+        }, f)
+
+def get_tfidf_features(df, max_features=TFIDF_MAX_FEATURES, name='tfidf'):
+    """
+    Get the TF-IDF matrix of a corpus, fitting it only when the corpus changed.
+
+    Rows of the matrix follow the rows of df, so models for a subset of the corpus
+    slice it with the positions of their rows.
+
+    Args:
+        df: corpus with 'id' and 'processed_content' columns
+        max_features: vocabulary size of the vectorizer
+        name: file name prefix in FEATURE_STORE_DIR
+
+    Returns:
+        tuple: (sparse CSR matrix, fitted TfidfVectorizer)
+    """
+    hash_value = corpus_hash(df, max_features)
+    stored = load_features(name, hash_value)
+    if stored is not None:
+        return stored
+
+    logger.info(f"Fitting TF-IDF features for {len(df)} documents")
+    vectorizer = TfidfVectorizer(max_features=max_features)
+    matrix = vectorizer.fit_transform(df['processed_content']).tocsr()
+    # Only needed for introspection and large when pickled with every event's model
+    vectorizer.stop_words_ = None
+    save_features(name, matrix, vectorizer, hash_value)
+    return matrix, vectorizer
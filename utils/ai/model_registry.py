@@ -0,0 +1,137 @@
+import os
+import threading
+from collections import OrderedDict
+import joblib
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+# Memory budget for cached models and vectorizers, measured as their size on disk
+MODEL_REGISTRY_MAX_BYTES = int(os.getenv('MODEL_REGISTRY_MAX_BYTES', 2 * 1024 ** 3))
+
+# Optional joblib mmap_mode ('r', 'r+', 'c') for the numpy arrays inside the models
+MODEL_REGISTRY_MMAP_MODE = os.getenv('MODEL_REGISTRY_MMAP_MODE') or None
+
+# Number of most frequent events to load when a prediction process starts
+MODEL_PRELOAD_TOP_N = int(os.getenv('MODEL_PRELOAD_TOP_N', 20))
+
+class ModelRegistry:
+    """Process-wide LRU cache of event models and their vectorizers"""
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ModelRegistry, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        self.max_bytes = MODEL_REGISTRY_MAX_BYTES
+        self.mmap_mode = MODEL_REGISTRY_MMAP_MODE
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, event, model_type, model_filename, vectorizer_filename):
+        """
+        Get the model and vectorizer for an event, loading them only when the files changed.
+
+        Returns:
+            tuple: (model, vectorizer), or (None, None) if either file is missing
+        """
+        try:
+            version = (os.path.getmtime(model_filename), os.path.getmtime(vectorizer_filename))
+        except OSError:
+            return None, None
+
+        # Loaders may resolve different files for the same event and model type, so the paths are part of the key
+        key = (event, model_type, os.path.realpath(model_filename), os.path.realpath(vectorizer_filename))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['version'] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['model'], entry['vectorizer']
+            self.misses += 1
+
+        logger.info(f"Loading {model_type} model and vectorizer for event: {event}")
+        model = joblib.load(model_filename, mmap_mode=self.mmap_mode)
+        vectorizer = joblib.load(vectorizer_filename)
+        size = os.path.getsize(model_filename) + os.path.getsize(vectorizer_filename)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {'version': version, 'model': model, 'vectorizer': vectorizer, 'size': size}
+            self._total_bytes += size
+            # The entry just loaded is always kept, even if it alone exceeds the budget
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                evicted_key = next(iter(self._entries))
+                logger.info(f"Evicting {evicted_key[1]} model for event: {evicted_key[0]}")
+                self._remove(evicted_key)
+
+        return model, vectorizer
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry['size']
+
+    def clear(self):
+        """Drop all cached models and reset the statistics"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Get cache statistics"""
+        with self._lock:
+            return {
+                'models': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+model_registry = ModelRegistry()
+
+def preload_models(load_models, model_types, top_n=MODEL_PRELOAD_TOP_N):
+    """
+    Load the models of the most frequent events into the registry.
+
+    Args:
+        load_models: function (event, model_type) -> (model, vectorizer) that resolves the model files
+        model_types: model types to load for each event
+        top_n: number of events to preload
+
+    Returns:
+        int: number of models loaded
+    """
+    from utils.db import news_db_util
+
+    if top_n <= 0:
+        return 0
+
+    loaded = 0
+    try:
+        events = news_db_util.get_top_events(top_n)
+    except Exception as e:
+        logger.error(f"Error getting top events for model preload: {e}")
+        return 0
+
+    for event in events:
+        event = event.lower().replace(' ', '_')
+        for model_type in model_types:
+            try:
+                model, vectorizer = load_models(event, model_type)
+                if model is not None:
+                    loaded += 1
+            except Exception as e:
+                logger.error(f"Error preloading {model_type} model for event {event}: {e}")
+
+    logger.info(f"Preloaded {loaded} models for {len(events)} events")
+    return loaded
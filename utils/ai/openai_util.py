@@ -1,63 +1,251 @@
 import os
-from openai import OpenAI
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from gptcache import cache
 import logging
+from utils.ai.completion_cache import get_completion_cache, make_key
 
 load_dotenv()
 
-client = OpenAI()
-cache.init()
-cache.set_openai_key()
-
 # Load environment variables
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
 
 model_name = "gpt-4o"  # Updated model name
 
-def tag_news(news, tags):
+# Requests in flight at once in the batch functions
+LLM_CONCURRENCY = int(os.getenv('LLM_CONCURRENCY', 8))
+# Articles packed into one tagging request
+TAG_BATCH_SIZE = int(os.getenv('TAG_BATCH_SIZE', 10))
+
+REASON_SYSTEM_PROMPT = """You are a financial analyst providing concise market insights. Your responses should be clear and readable without using any special characters or explicit formatting such as new lines. Use standard punctuation and avoid line breaks within sentences. Separate ideas with periods and commas as needed."""
+
+_client = None
+
+def get_client():
+    """Get the blocking OpenAI client, created on first use so importing this module stays cheap"""
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI()
+    return _client
+
+def create_async_client():
+    """Create an async OpenAI client, bound to the event loop it is first used in"""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI()
+
+def _tag_messages(news, tags):
     prompt = f'Answering with one tag only, pick up the best tag which describes the news "{news}" from the list: {tags}'
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    tag = response.choices[0].message.content
-    return tag
+    return [{"role": "user", "content": prompt}]
 
-def enrich_reason(content, predicted_move):
-    system_prompt = """You are a financial analyst providing concise market insights. Your responses should be clear and readable without using any special characters or explicit formatting such as new lines. Use standard punctuation and avoid line breaks within sentences. Separate ideas with periods and commas as needed."""
+def _tag_options(tags):
+    """Tags accepted in a batch answer, from a list or a comma separated string"""
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return {tag.strip() for tag in tags}
+
+def _tag_batch_messages(news_items, tags):
+    articles = '\n'.join(f'{i + 1}. "{news}"' for i, news in enumerate(news_items))
+    prompt = (f'For each numbered news below, pick up the best tag which describes it from the list: {tags}\n'
+              f'Answer with a JSON object {{"tags": [...]}} holding exactly one tag per news, in the same order.\n\n'
+              f'{articles}')
+    return [{"role": "user", "content": prompt}]
 
+def _reason_messages(content, predicted_move):
     if predicted_move is not None:
         direction = "up" if predicted_move > 0 else "down"
         user_prompt = f"""Analyze: "{content}" Asset predicted to move {direction} by {predicted_move:+.2f}%. In less than 40 words: 1. Explain the likely cause of this {direction}ward movement. 2. Briefly discuss potential market implications. 3. Naturally include "predicted {direction}ward move of {predicted_move:+.2f}%". Be concise yet comprehensive. Ensure a complete response with no cut-off sentences."""
     else:
         user_prompt = f'In less than 40 words, summarize the potential market impact of this news. Ensure a complete response with no cut-off sentences: "{content}"'
-    
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        max_tokens=80  # Adjusted for up to 40 words
-    )
-    reason = response.choices[0].message.content.strip()
-    return reason
+    return [
+        {"role": "system", "content": REASON_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
 
-def extract_ticker(company):
+def _ticker_messages(company):
     prompt = f'Extract the company or issuer ticker symbol corresponding to the company name provided. Return only the ticker symbol in uppercase, without any additional text. If you cannot assign a ticker symbol, return "N/A". Company name: "{company}"'
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    ticker = response.choices[0].message.content.strip().upper()
-    return ticker if ticker != "N/A" else None
+    return [{"role": "user", "content": prompt}]
 
-def extract_issuer(news):
+def _issuer_messages(news):
     prompt = f'Extract the company or issuer name corresponding to the text provided. Return concise entity name only. If you cannot assign a ticker symbol, return "N/A". News: "{news}"'
-    response = client.chat.completions.create(
-        model=model_name,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    ticker = response.choices[0].message.content.strip().upper()
-    return ticker if ticker != "N/A" else None
\ No newline at end of file
+    return [{"role": "user", "content": prompt}]
+
+def _parse_symbol(content):
+    symbol = content.strip().upper()
+    return symbol if symbol != "N/A" else None
+
+def _parse_reason(content):
+    return content.strip()
+
+# Prompt type -> (messages builder, response parser, request options)
+PROMPTS = {
+    'tag_news': (_tag_messages, lambda content: content, {}),
+    'enrich_reason': (_reason_messages, _parse_reason, {'max_tokens': 80}),  # Adjusted for up to 40 words
+    'extract_ticker': (_ticker_messages, _parse_symbol, {}),
+    'extract_issuer': (_issuer_messages, _parse_symbol, {})
+}
+
+def _complete(prompt_type, *args):
+    """Run one prompt through the completion cache and the blocking client"""
+    build_messages, parse, options = PROMPTS[prompt_type]
+    messages = build_messages(*args)
+    completion_cache = get_completion_cache()
+    key = make_key(prompt_type, model_name, messages, options)
+    content = completion_cache.get(key)
+    if content is None:
+        response = get_client().chat.completions.create(model=model_name, messages=messages, **options)
+        content = response.choices[0].message.content
+        completion_cache.set(key, prompt_type, content)
+    return parse(content)
+
+def tag_news(news, tags):
+    return _complete('tag_news', news, tags)
+
+def enrich_reason(content, predicted_move):
+    return _complete('enrich_reason', content, predicted_move)
+
+def extract_ticker(company):
+    return _complete('extract_ticker', company)
+
+def extract_issuer(news):
+    return _complete('extract_issuer', news)
+
+class BatchRunner:
+    """
+    Async client and concurrency limit shared by the requests of one batch call.
+
+    Results go through the same completion cache as the blocking functions, so an
+    article answered once is never sent again by either path.
+    """
+
+    def __init__(self, concurrency=LLM_CONCURRENCY):
+        # Each run gets its own client since asyncio.run starts a new event loop
+        self.client = create_async_client()
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.completion_cache = get_completion_cache()
+
+    async def create(self, messages, **options):
+        async with self.semaphore:
+            response = await self.client.chat.completions.create(model=model_name, messages=messages, **options)
+        return response.choices[0].message.content
+
+    async def complete(self, prompt_type, *args):
+        build_messages, parse, options = PROMPTS[prompt_type]
+        messages = build_messages(*args)
+        key = make_key(prompt_type, model_name, messages, options)
+        content = self.completion_cache.get(key)
+        if content is None:
+            content = await self.create(messages, **options)
+            self.completion_cache.set(key, prompt_type, content)
+        return parse(content)
+
+    async def complete_many(self, prompt_type, args_list):
+        """Run one prompt per args tuple concurrently, None for the ones that fail"""
+        results = await asyncio.gather(*(self.complete(prompt_type, *args) for args in args_list),
+                                       return_exceptions=True)
+        for args, result in zip(args_list, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error in {prompt_type}: {str(result)}")
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    async def tag_batch(self, news_items, tags):
+        """
+        Tag several news in one structured request, falling back to one request per news.
+
+        Only tags from the list are cached under the single-news key, the others are asked again one by one.
+        """
+        try:
+            content = await self.create(_tag_batch_messages(news_items, tags),
+                                        response_format={"type": "json_object"})
+            batch_tags = json.loads(content)['tags']
+            if len(batch_tags) != len(news_items):
+                logger.warning(f"Batch tagging returned {len(batch_tags)} tags for {len(news_items)} news, tagging one by one")
+                return await self.complete_many('tag_news', [(news, tags) for news in news_items])
+        except Exception as e:
+            logger.warning(f"Batch tagging failed, tagging one by one: {str(e)}")
+            return await self.complete_many('tag_news', [(news, tags) for news in news_items])
+
+        allowed = _tag_options(tags)
+        results = [None] * len(news_items)
+        invalid = []
+        for i, (news, tag) in enumerate(zip(news_items, batch_tags)):
+            if isinstance(tag, str) and tag.strip() in allowed:
+                results[i] = tag.strip()
+                messages = _tag_messages(news, tags)
+                self.completion_cache.set(make_key('tag_news', model_name, messages, {}), 'tag_news', results[i])
+            else:
+                invalid.append(i)
+
+        if invalid:
+            logger.warning(f"Batch tagging returned {len(invalid)} tags outside the list, tagging them one by one")
+            retried = await self.complete_many('tag_news', [(news_items[i], tags) for i in invalid])
+            for i, tag in zip(invalid, retried):
+                results[i] = tag
+        return results
+
+    async def close(self):
+        await self.client.close()
+
+async def atag_news_batch(news_items, tags, batch_size=TAG_BATCH_SIZE, concurrency=LLM_CONCURRENCY):
+    """
+    Tag news concurrently, packing up to batch_size uncached news into each request.
+
+    Returns:
+        list: one tag per news, None where tagging failed
+    """
+    news_items = list(news_items)
+    runner = BatchRunner(concurrency)
+    try:
+        results = [None] * len(news_items)
+        pending = []
+        for i, news in enumerate(news_items):
+            cached = runner.completion_cache.get(make_key('tag_news', model_name, _tag_messages(news, tags), {}))
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        logger.info(f"Tagging {len(pending)} news, {len(news_items) - len(pending)} cached")
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        batch_results = await asyncio.gather(
+            *(runner.tag_batch([news_items[i] for i in batch], tags) for batch in batches))
+        for batch, batch_tags in zip(batches, batch_results):
+            for i, tag in zip(batch, batch_tags):
+                results[i] = tag
+        return results
+    finally:
+        await runner.close()
+
+async def _acomplete_many(prompt_type, args_list, concurrency=LLM_CONCURRENCY):
+    runner = BatchRunner(concurrency)
+    try:
+        return await runner.complete_many(prompt_type, list(args_list))
+    finally:
+        await runner.close()
+
+def run_async(coroutine):
+    """Run a coroutine to completion, also from code already running in an event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coroutine).result()
+
+def tag_news_batch(news_items, tags, batch_size=TAG_BATCH_SIZE, concurrency=LLM_CONCURRENCY):
+    """Tag several news, returning one tag per news and None where tagging failed"""
+    return run_async(atag_news_batch(news_items, tags, batch_size, concurrency))
+
+def enrich_reason_batch(contents, predicted_moves, concurrency=LLM_CONCURRENCY):
+    """Generate the reasons of several news concurrently, None where generation failed"""
+    return run_async(_acomplete_many('enrich_reason', zip(contents, predicted_moves), concurrency))
+
+def extract_ticker_batch(companies, concurrency=LLM_CONCURRENCY):
+    """Extract the tickers of several company names concurrently"""
+    return run_async(_acomplete_many('extract_ticker', [(company,) for company in companies], concurrency))
+
+def extract_issuer_batch(news_items, concurrency=LLM_CONCURRENCY):
+    """Extract the issuers of several news concurrently"""
+    return run_async(_acomplete_many('extract_issuer', [(news,) for news in news_items], concurrency))
@@ -1,6 +1,7 @@
 import pandas as pd
-import joblib
+import numpy as np
 from utils.db import news_db_util
+from utils.ai.model_registry import model_registry, preload_models
 import os
 import logging
 
@@ -8,6 +9,8 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+MODEL_TYPES = ['regression', 'classifier_binary']
+
 def load_models(event, model_type):
     if model_type == 'classifier_binary':
         model_filename = f'models/{event}_classifier_binary.joblib'
@@ -16,13 +19,8 @@ def load_models(event, model_type):
         model_filename = f'models/{event}_{model_type}.joblib'
         vectorizer_filename = f'models/{event}_tfidf_vectorizer_{model_type}.joblib'
     
-    logger.info(f"Looking for model file: {model_filename}")
-    logger.info(f"Looking for vectorizer file: {vectorizer_filename}")
-    
-    if os.path.exists(model_filename) and os.path.exists(vectorizer_filename):
-        logger.info(f"Loading model and vectorizer for event: {event}")
-        model = joblib.load(model_filename)
-        vectorizer = joblib.load(vectorizer_filename)
+    model, vectorizer = model_registry.get(event, model_type, model_filename, vectorizer_filename)
+    if model is not None:
         return model, vectorizer
     else:
         logger.warning(f"Model or vectorizer not found for event: {event}")
@@ -30,72 +28,71 @@ def load_models(event, model_type):
         logger.warning(f"Vectorizer file exists: {os.path.exists(vectorizer_filename)}")
         return None, None
 
-def predict(df):
-    move_models = {}
-    move_vectorizers = {}
-    side_models = {}
-    side_vectorizers = {}
+def get_prediction_text(df):
+    """Text used for prediction: content where available, title otherwise"""
+    texts = df['content'] if 'content' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    if 'title' in df.columns:
+        texts = texts.where(texts.notna(), df['title'])
+    return texts
 
-    for index, row in df.iterrows():
-        # Check if event is None or NaN
-        if pd.isna(row['event']):
-            logger.warning(f"Skipping prediction for row {index}: Event is None or NaN")
-            continue
-
-        event = row['event'].lower().replace(' ', '_')
+def predict_column(df, mask, events, texts, model_type, column):
+    """Predict one column for the masked rows, with one vectorizer and model call per event"""
+    masked_events = events[mask]
+    for event, event_index in masked_events.groupby(masked_events).groups.items():
+        model, vectorizer = load_models(event, model_type)
         
-        # Determine which column to use for prediction
-        if 'content' in row and pd.notna(row['content']):
-            text_for_prediction = row['content']
-        elif 'title' in row and pd.notna(row['title']):
-            text_for_prediction = row['title']
-        else:
-            logger.warning(f"Skipping prediction for row {index}: No content or title available")
+        if model is None or vectorizer is None:
+            logger.warning(f"{model_type} model or vectorizer not available for event: {event}")
+            df.loc[event_index, column] = None
             continue
-
-        # Predict move
-        if 'predicted_move' not in df.columns or pd.isnull(row['predicted_move']):
-            if event not in move_models:
-                move_models[event], move_vectorizers[event] = load_models(event, 'regression')
-            
-            if move_models[event] and move_vectorizers[event]:
-                try:
-                    logger.info(f"Predicting move for row {index}, event: {event}")
-                    transformed_content = move_vectorizers[event].transform([text_for_prediction])
-                    prediction = move_models[event].predict(transformed_content)
-                    df.at[index, 'predicted_move'] = prediction[0]
-                    logger.info(f"Move prediction for row {index}: {prediction[0]}")
-                except Exception as e:
-                    logger.error(f"Error predicting move for row {index}: {e}", exc_info=True)
-                    df.at[index, 'predicted_move'] = None
-            else:
-                logger.warning(f"Move model or vectorizer not available for event: {event}")
-                df.at[index, 'predicted_move'] = None
         
-        # Predict side
-        if 'predicted_side' not in df.columns or pd.isnull(row['predicted_side']):
-            if event not in side_models:
-                side_models[event], side_vectorizers[event] = load_models(event, 'classifier_binary')
-            
-            if side_models[event] and side_vectorizers[event]:
-                try:
-                    logger.info(f"Predicting side for row {index}, event: {event}")
-                    transformed_content = side_vectorizers[event].transform([text_for_prediction])
-                    prediction = side_models[event].predict(transformed_content)
-                    df.at[index, 'predicted_side'] = 'UP' if prediction[0] == 1 else 'DOWN'
-                    logger.info(f"Side prediction for row {index}: {df.at[index, 'predicted_side']}")
-                except Exception as e:
-                    logger.error(f"Error predicting side for row {index}: {e}", exc_info=True)
-                    df.at[index, 'predicted_side'] = None
-            else:
-                logger.warning(f"Side model or vectorizer not available for event: {event}")
-                df.at[index, 'predicted_side'] = None
-        else:
-            logger.info(f"Skipping side prediction for row {index}: predicted_side is not null")
+        try:
+            logger.info(f"Predicting {column} for {len(event_index)} rows, event: {event}")
+            transformed_content = vectorizer.transform(texts.loc[event_index].tolist())
+            predictions = model.predict(transformed_content)
+            if column == 'predicted_side':
+                predictions = np.where(predictions == 1, 'UP', 'DOWN')
+            df.loc[event_index, column] = predictions
+        except Exception as e:
+            logger.error(f"Error predicting {column} for event {event}: {e}", exc_info=True)
+            df.loc[event_index, column] = None
+
+def predict(df):
+    events = df['event'].where(df['event'].notna()).str.lower().str.replace(' ', '_')
+    texts = get_prediction_text(df)
+
+    missing_event = events.isna()
+    if missing_event.any():
+        logger.warning(f"Skipping prediction for {missing_event.sum()} rows: Event is None or NaN")
+    missing_text = events.notna() & texts.isna()
+    if missing_text.any():
+        logger.warning(f"Skipping prediction for {missing_text.sum()} rows: No content or title available")
+    valid = events.notna() & texts.notna()
+
+    # Predict move
+    if 'predicted_move' not in df.columns:
+        df['predicted_move'] = np.nan
+        needs_move = valid
+    else:
+        needs_move = valid & df['predicted_move'].isna()
+    predict_column(df, needs_move, events, texts, 'regression', 'predicted_move')
+    
+    # Predict side
+    if 'predicted_side' not in df.columns:
+        df['predicted_side'] = None
+        needs_side = valid
+    else:
+        needs_side = valid & df['predicted_side'].isna()
+        logger.info(f"Skipping side prediction for {(valid & ~needs_side).sum()} rows: predicted_side is not null")
+    df['predicted_side'] = df['predicted_side'].astype(object)
+    predict_column(df, needs_side, events, texts, 'classifier_binary', 'predicted_side')
     
     return df
 
 def main():
+    # Warm the model registry with the most common events
+    preload_models(load_models, MODEL_TYPES)
+    
     # Get all news
     logger.info("Fetching all news data")
     news_df = news_db_util.get_news_df()
@@ -104,9 +101,14 @@ def main():
     logger.info("Starting predictions")
     pred_df = predict(news_df)
     
-    # Update the news table with predictions
+    # Update the news table with predictions, retrying the rows of failed chunks once
     logger.info("Updating news table with predictions")
-    news_db_util.update_news_predictions(pred_df)
+    updated_count, failed_ids = news_db_util.update_news_predictions(pred_df)
+    if failed_ids:
+        logger.warning(f"Retrying the predictions of {len(failed_ids)} news items")
+        _, failed_ids = news_db_util.update_news_predictions(pred_df[pred_df['news_id'].isin(failed_ids)])
+        if failed_ids:
+            logger.error(f"Predictions of {len(failed_ids)} news items could not be stored: {failed_ids}")
     
     logger.info("Predictions completed and news table updated.")
 
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import pandas as pd
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+SPACY_MODEL = os.getenv('SPACY_MODEL', 'en_core_web_sm')
+
+# Only tokenization, stop words and lemmas are used, so the parser and NER are not loaded
+SPACY_DISABLE = ['parser', 'ner']
+
+# Lemmatized text keyed by a hash of the raw text and the spaCy model
+PREPROCESS_CACHE_PATH = os.getenv('PREPROCESS_CACHE_PATH', os.path.join('data', 'preprocess_cache.sqlite'))
+
+PREPROCESS_N_PROCESS = int(os.getenv('PREPROCESS_N_PROCESS', os.cpu_count() or 1))
+PREPROCESS_BATCH_SIZE = int(os.getenv('PREPROCESS_BATCH_SIZE', 256))
+
+# SQLite limits the number of bound parameters per statement
+_LOOKUP_CHUNK_SIZE = 900
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def get_nlp():
+    """Load the spaCy pipeline on first use"""
+    global _nlp
+    with _nlp_lock:
+        if _nlp is None:
+            import spacy
+            logger.info(f"Loading spaCy model {SPACY_MODEL} without {SPACY_DISABLE}")
+            _nlp = spacy.load(SPACY_MODEL, disable=SPACY_DISABLE)
+    return _nlp
+
+def get_text_to_process(df):
+    """Content of each row, falling back to the title when the content is null or empty"""
+    content = df['content']
+    return content.where(content.notna() & (content != ''), df['title']).fillna('').astype(str)
+
+def lemmatize_doc(doc):
+    return " ".join([token.lemma_ for token in doc if not token.is_stop and not token.is_punct])
+
+def preprocess(text):
+    """Lemmatize a single text without stop words and punctuation"""
+    return lemmatize_doc(get_nlp()(text))
+
+def text_hash(text):
+    return hashlib.sha256(f'{SPACY_MODEL}\0{text}'.encode('utf-8')).hexdigest()
+
+def _connect(cache_path):
+    directory = os.path.dirname(cache_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute('CREATE TABLE IF NOT EXISTS lemmas (hash TEXT PRIMARY KEY, text TEXT NOT NULL)')
+    return conn
+
+def _read_cache(conn, hashes):
+    cached = {}
+    for i in range(0, len(hashes), _LOOKUP_CHUNK_SIZE):
+        chunk = hashes[i:i + _LOOKUP_CHUNK_SIZE]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(f'SELECT hash, text FROM lemmas WHERE hash IN ({placeholders})', chunk)
+        cached.update(rows.fetchall())
+    return cached
+
+def preprocess_texts(texts, cache_path=PREPROCESS_CACHE_PATH, n_process=PREPROCESS_N_PROCESS,
+                     batch_size=PREPROCESS_BATCH_SIZE):
+    """
+    Lemmatize a series of texts, reusing cached results for texts seen before.
+
+    Texts missing from the cache are lemmatized with nlp.pipe over n_process workers
+    and written back to the cache.
+
+    Args:
+        texts: Series of raw texts
+        cache_path: SQLite file holding the lemmatized texts
+        n_process: number of spaCy worker processes
+        batch_size: number of texts per spaCy batch
+
+    Returns:
+        Series: lemmatized texts with the same index as texts
+    """
+    texts = texts.fillna('').astype(str)
+    hashes = texts.map(text_hash)
+    unique = dict(zip(hashes, texts))
+
+    conn = _connect(cache_path)
+    try:
+        lemmas = _read_cache(conn, list(unique))
+        missing = [h for h in unique if h not in lemmas]
+        logger.info(f"Preprocessing {len(texts)} texts: {len(lemmas)} cached, {len(missing)} to lemmatize")
+
+        if missing:
+            nlp = get_nlp()
+            n_process = max(1, min(n_process, len(missing) // batch_size + 1))
+            docs = nlp.pipe((unique[h] for h in missing), n_process=n_process, batch_size=batch_size)
+            new_lemmas = [(h, lemmatize_doc(doc)) for h, doc in zip(missing, docs)]
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO lemmas (hash, text) VALUES (?, ?)', new_lemmas)
+            lemmas.update(new_lemmas)
+    finally:
+        conn.close()
+
+    return hashes.map(lemmas)
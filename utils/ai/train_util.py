@@ -0,0 +1,130 @@
+import os
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bound on training processes, defaults to one per core
+TRAIN_MAX_WORKERS = int(os.getenv('TRAIN_MAX_WORKERS', 0)) or None
+
+# Relative change in an event's training rows needed before it is refitted
+TRAIN_MIN_CHANGE = float(os.getenv('TRAIN_MIN_CHANGE', 0.0))
+
+# Events with fewer training rows are skipped by the training scripts
+TRAIN_MIN_SAMPLES = 10
+
+def get_pool_sizes(n_tasks, max_workers=None):
+    """
+    Split the cores between training processes and the trees of each forest.
+
+    Returns:
+        tuple: (number of worker processes, n_jobs for each model)
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(max_workers or cpu_count, cpu_count, n_tasks))
+    return workers, max(1, cpu_count // workers)
+
+# Arguments shared by every task, set once per worker process
+_shared_args = ()
+
+def _init_worker(*shared):
+    global _shared_args
+    _shared_args = shared
+
+def _train_event(train_fn, event, df, n_jobs):
+    return train_fn(event, df, *_shared_args, n_jobs=n_jobs)
+
+def train_events(train_fn, df, events, max_workers=TRAIN_MAX_WORKERS, shared=()):
+    """
+    Train one model per event, fanning the events out over a process pool.
+
+    Args:
+        train_fn: module level function (event, df, *shared, n_jobs) -> result dict or None
+        df: training data with an 'event' column
+        events: events to train
+        max_workers: number of worker processes, 1 trains in the current process
+        shared: extra arguments for every call, sent to each worker once rather than per event
+
+    Returns:
+        list: result dicts of the events that trained successfully, in event order
+    """
+    events = list(events)
+    if not events:
+        return []
+
+    workers, n_jobs = get_pool_sizes(len(events), max_workers)
+    logger.info(f"Training {len(events)} events with {workers} workers and n_jobs={n_jobs}")
+
+    results = []
+    if workers == 1:
+        for event in events:
+            try:
+                results.append(train_fn(event, df, *shared, n_jobs=n_jobs))
+            except Exception as e:
+                logger.error(f"Error training/saving model for event '{event}': {e}")
+    else:
+        # Each task only receives its own event's rows
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=shared) as executor:
+            futures = {event: executor.submit(_train_event, train_fn, event, df[df['event'] == event], n_jobs)
+                       for event in events}
+            for event, future in futures.items():
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error training/saving model for event '{event}': {e}")
+
+    return [result for result in results if result is not None]
+
+def get_event_fingerprints(df, columns):
+    """
+    Row count and hash of the training data of each event.
+
+    Args:
+        df: training data with 'event', 'id' and the given columns
+        columns: columns the models learn from, such as the text and the target
+
+    Returns:
+        DataFrame: event, row_count and data_hash per event
+    """
+    fingerprints = []
+    for event, event_df in df.groupby('event', sort=False):
+        event_df = event_df.sort_values('id')
+        row_hashes = pd.util.hash_pandas_object(event_df[['id'] + list(columns)], index=False)
+        fingerprints.append({
+            'event': event,
+            'row_count': len(event_df),
+            'data_hash': hashlib.sha256(row_hashes.values.tobytes()).hexdigest()
+        })
+    return pd.DataFrame(fingerprints, columns=['event', 'row_count', 'data_hash'])
+
+def select_changed_events(fingerprints_df, manifest_df, min_change=TRAIN_MIN_CHANGE, min_samples=TRAIN_MIN_SAMPLES):
+    """
+    Events whose training data changed since their last fit.
+
+    An event is refitted when it has no manifest entry, or when its data hash changed and
+    its row count moved by at least min_change relative to the last fit. With min_change=0
+    any change, including relabelled rows, triggers a refit. Events with fewer than min_samples
+    rows are left out, as they would be skipped without a manifest entry on every run.
+
+    Returns:
+        list: events to train
+    """
+    too_small = fingerprints_df['row_count'] < min_samples
+    if too_small.any():
+        logger.info(f"Leaving out {too_small.sum()} events with fewer than {min_samples} rows")
+        fingerprints_df = fingerprints_df[~too_small]
+
+    previous = manifest_df.set_index('event')[['row_count', 'data_hash']] if not manifest_df.empty else None
+    events = []
+    for _, row in fingerprints_df.iterrows():
+        if previous is None or row['event'] not in previous.index:
+            events.append(row['event'])
+            continue
+        last = previous.loc[row['event']]
+        if last['data_hash'] == row['data_hash']:
+            continue
+        if abs(row['row_count'] - last['row_count']) / max(last['row_count'], 1) >= min_change:
+            events.append(row['event'])
+    return events
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import pytz
+import itertools
+from concurrent.futures import ProcessPoolExecutor
 from utils.backtest_price_util import create_price_moves, get_intraday_prices
 from utils.logging.log_util import get_logger
 
@@ -13,6 +15,69 @@ def calculate_position_size(capital, position_size_pct):
 def calculate_shares(position_size, entry_price):
     return int(position_size / entry_price)
 
+def get_close_prices(intraday_data):
+    """Get the close prices of intraday bars as a float array"""
+    if intraday_data is None or not isinstance(intraday_data, pd.DataFrame) or intraday_data.empty:
+        return np.array([], dtype=float)
+    close = intraday_data['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    return close.to_numpy(dtype=float)
+
+def build_close_matrix(intraday_frames):
+    """
+    Stack the intraday close prices of several trades into one matrix.
+
+    Args:
+        intraday_frames: Sequence of intraday DataFrames, one per trade
+
+    Returns:
+        np.ndarray: 2-D array with one row per trade, padded with NaN to the longest session
+    """
+    closes = [get_close_prices(frame) for frame in intraday_frames]
+    width = max((len(close) for close in closes), default=0)
+    matrix = np.full((len(closes), width), np.nan)
+    for i, close in enumerate(closes):
+        matrix[i, :len(close)] = close
+    return matrix
+
+def find_exits(close_matrix, target_prices, stop_prices, is_long):
+    """
+    Find the first bar where each trade hits its target or stop level.
+
+    A bar that crosses both levels counts as a target hit, and NaN padding never triggers an exit.
+
+    Args:
+        close_matrix: 2-D array of close prices, one row per trade
+        target_prices: Target exit price per trade
+        stop_prices: Stop loss price per trade
+        is_long: Boolean per trade indicating if the trade is long
+
+    Returns:
+        tuple: (exit_index, hit_target, hit_stop) arrays, exit_index is -1 when no level is hit
+    """
+    closes = np.atleast_2d(np.asarray(close_matrix, dtype=float))
+    n_trades = closes.shape[0]
+    if closes.shape[1] == 0:
+        no_exit = np.zeros(n_trades, dtype=bool)
+        return np.full(n_trades, -1), no_exit, no_exit.copy()
+
+    target = np.asarray(target_prices, dtype=float).reshape(-1, 1)
+    stop = np.asarray(stop_prices, dtype=float).reshape(-1, 1)
+    is_long = np.asarray(is_long, dtype=bool).reshape(-1, 1)
+
+    target_hit = np.where(is_long, closes >= target, closes <= target)
+    stop_hit = np.where(is_long, closes <= stop, closes >= stop)
+    any_hit = target_hit | stop_hit
+
+    has_exit = any_hit.any(axis=1)
+    first_hit = any_hit.argmax(axis=1)
+    hit_target = has_exit & target_hit[np.arange(n_trades), first_hit]
+    hit_stop = has_exit & ~hit_target
+    exit_index = np.where(has_exit, first_hit, -1)
+
+    return exit_index, hit_target, hit_stop
+
 def check_exit(intraday_data, entry_price, target_price, stop_price, is_long, default_exit_time, default_exit_price):
     """
     Check if stop loss or target price is hit, otherwise exit at market close
@@ -29,42 +94,24 @@ def check_exit(intraday_data, entry_price, target_price, stop_price, is_long, de
     Returns:
         tuple: (exit_price, exit_time, hit_target, hit_stop)
     """
-    exit_price = default_exit_price
-    exit_time = default_exit_time
-    hit_target = False
-    hit_stop = False
-    
-    for idx, price_data in intraday_data.iterrows():
-        current_price = float(price_data['Close'].iloc[0])
-        
-        if is_long:
-            if current_price >= target_price:
-                exit_price = target_price
-                exit_time = idx
-                hit_target = True
-                break
-            elif current_price <= stop_price:
-                exit_price = stop_price
-                exit_time = idx
-                hit_stop = True
-                break
-        else:  # short trade
-            if current_price <= target_price:
-                exit_price = target_price
-                exit_time = idx
-                hit_target = True
-                break
-            elif current_price >= stop_price:
-                exit_price = stop_price
-                exit_time = idx
-                hit_stop = True
-                break
-                
-    return exit_price, exit_time, hit_target, hit_stop
+    exit_index, hit_target, hit_stop = find_exits(
+        get_close_prices(intraday_data).reshape(1, -1), [target_price], [stop_price], [is_long]
+    )
 
-def run_backtest(news_df, initial_capital, position_size, take_profit, stop_loss, enable_advanced=False):
-    logger.info("Starting backtest")
-    
+    if hit_target[0]:
+        return target_price, intraday_data.index[exit_index[0]], True, False
+    if hit_stop[0]:
+        return stop_price, intraday_data.index[exit_index[0]], False, True
+    return default_exit_price, default_exit_time, False, False
+
+def prepare_backtest(news_df):
+    """
+    Create the price moves and intraday close matrix for a set of news once, so that
+    several parameter combinations can be simulated without downloading bars again.
+
+    Returns:
+        tuple: (price_moves_df, close_matrix) or None if there is nothing to trade
+    """
     if news_df.empty:
         logger.warning("No news data provided for backtest")
         return None
@@ -81,47 +128,58 @@ def run_backtest(news_df, initial_capital, position_size, take_profit, stop_loss
         logger.warning("No price moves generated")
         return None
     
-    # Initialize trade tracking
+    # Sort by published date
+    price_moves_df = price_moves_df.sort_values('published_date').reset_index(drop=True)
+
+    if 'intraday_prices' not in price_moves_df.columns:
+        price_moves_df['intraday_prices'] = None
+    close_matrix = build_close_matrix(price_moves_df['intraday_prices'].tolist())
+
+    return price_moves_df, close_matrix
+
+def simulate_trades(price_moves_df, close_matrix, initial_capital, position_size, take_profit, stop_loss):
+    """
+    Simulate trades for one parameter combination on prepared price moves.
+
+    Returns:
+        tuple: (trades_df, metrics) or None if no trades were generated
+    """
+    # Determine trade direction and exit levels for all trades at once
+    entry_prices = price_moves_df['begin_price'].to_numpy(dtype=float)
+    is_long = (price_moves_df['predicted_side'] == 'UP').to_numpy()
+    target_prices = np.where(is_long, entry_prices * (1 + take_profit), entry_prices * (1 - take_profit))
+    stop_prices = np.where(is_long, entry_prices * (1 - stop_loss), entry_prices * (1 + stop_loss))
+
+    # Check for exit conditions across the padded matrix of intraday closes
+    intraday_frames = price_moves_df['intraday_prices'].tolist()
+    exit_index, hit_target, hit_stop = find_exits(close_matrix, target_prices, stop_prices, is_long)
+
+    end_prices = price_moves_df['end_price'].to_numpy(dtype=float)
+    exit_prices = np.where(hit_target, target_prices, np.where(hit_stop, stop_prices, end_prices))
+    exit_times = [
+        intraday_frames[i].index[exit_index[i]] if exit_index[i] >= 0 else default_exit_time
+        for i, default_exit_time in enumerate(price_moves_df['exit_time'])
+    ]
+
+    # Position sizes depend on the running capital, so only the P&L bookkeeping is sequential
     trades = []
     current_capital = initial_capital
-    
-    # Sort by published date
-    price_moves_df = price_moves_df.sort_values('published_date')
-    
-    for _, row in price_moves_df.iterrows():
+    records = price_moves_df.to_dict('records')
+
+    for i, row in enumerate(records):
         try:
             # Calculate position size and entry details
             trade_position_size = calculate_position_size(current_capital, position_size)
-            entry_price = row['begin_price']
+            entry_price = entry_prices[i]
             shares = calculate_shares(trade_position_size, entry_price)
             
             if shares == 0:
                 continue
-                
-            # Determine trade direction and prices
-            is_long = row['predicted_side'] == 'UP'
-            target_price = entry_price * (1 + take_profit) if is_long else entry_price * (1 - take_profit)
-            stop_price = entry_price * (1 - stop_loss) if is_long else entry_price * (1 + stop_loss)
-            
-            # Check for exit conditions
-            if 'intraday_prices' in row:
-                exit_price, exit_time, hit_target, hit_stop = check_exit(
-                    intraday_data=row['intraday_prices'],
-                    entry_price=entry_price,
-                    target_price=target_price,
-                    stop_price=stop_price,
-                    is_long=is_long,
-                    default_exit_time=row['exit_time'],
-                    default_exit_price=row['end_price']
-                )
-            else:
-                exit_price = row['end_price']
-                exit_time = row['exit_time']
-                hit_target = False
-                hit_stop = False
+
+            exit_price = exit_prices[i]
             
             # Calculate P&L
-            pnl = shares * (exit_price - entry_price) if is_long else shares * (entry_price - exit_price)
+            pnl = shares * (exit_price - entry_price) if is_long[i] else shares * (entry_price - exit_price)
             pnl_pct = (pnl / trade_position_size) * 100
             
             # Update capital
@@ -132,16 +190,16 @@ def run_backtest(news_df, initial_capital, position_size, take_profit, stop_loss
                 'published_date': row['published_date'],
                 'market': row['market'],
                 'entry_time': row['entry_time'],
-                'exit_time': exit_time,
+                'exit_time': exit_times[i],
                 'ticker': row['ticker'],
-                'direction': 'LONG' if is_long else 'SHORT',
+                'direction': 'LONG' if is_long[i] else 'SHORT',
                 'shares': shares,
                 'entry_price': entry_price,
                 'exit_price': exit_price,
-                'target_price': target_price,
-                'stop_price': stop_price,
-                'hit_target': hit_target,
-                'hit_stop': hit_stop,
+                'target_price': target_prices[i],
+                'stop_price': stop_prices[i],
+                'hit_target': bool(hit_target[i]),
+                'hit_stop': bool(hit_stop[i]),
                 'pnl': pnl,
                 'pnl_pct': pnl_pct,
                 'capital_after': current_capital,
@@ -166,6 +224,96 @@ def run_backtest(news_df, initial_capital, position_size, take_profit, stop_loss
     
     return trades_df, metrics
 
+def run_backtest(news_df, initial_capital, position_size, take_profit, stop_loss, enable_advanced=False):
+    logger.info("Starting backtest")
+
+    prepared = prepare_backtest(news_df)
+    if prepared is None:
+        return None
+
+    price_moves_df, close_matrix = prepared
+    return simulate_trades(price_moves_df, close_matrix, initial_capital, position_size, take_profit, stop_loss)
+
+# Prepared backtest data shared with sweep worker processes
+_sweep_data = None
+
+def _init_sweep_worker(price_moves_df, close_matrix):
+    global _sweep_data
+    _sweep_data = (price_moves_df, close_matrix)
+
+def _run_sweep_combination(combination):
+    price_moves_df, close_matrix = _sweep_data
+    take_profit, stop_loss, position_size, events, initial_capital = combination
+
+    if events:
+        mask = price_moves_df['event'].isin(events).to_numpy()
+        price_moves_df = price_moves_df[mask].reset_index(drop=True)
+        close_matrix = close_matrix[mask]
+
+    result = {
+        'take_profit': take_profit,
+        'stop_loss': stop_loss,
+        'position_size': position_size,
+        'events': ', '.join(events) if events else 'all'
+    }
+
+    simulated = None
+    if not price_moves_df.empty:
+        simulated = simulate_trades(price_moves_df, close_matrix, initial_capital, position_size, take_profit, stop_loss)
+
+    if simulated is None:
+        result.update({
+            'total_trades': 0,
+            'winning_trades': 0,
+            'win_rate': 0,
+            'total_pnl': 0,
+            'total_return': 0,
+            'annualized_return': 0
+        })
+    else:
+        result.update(simulated[1])
+    return result
+
+def run_backtest_sweep(news_df, initial_capital, take_profits, stop_losses, position_sizes, event_filters=None, max_workers=None):
+    """
+    Run the backtest over a grid of parameters, building price moves and intraday bars only once.
+
+    Args:
+        news_df: News to trade
+        initial_capital: Starting capital for every combination
+        take_profits: Take profit levels to try (fractions, e.g. 0.01)
+        stop_losses: Stop loss levels to try (fractions)
+        position_sizes: Position sizes to try (fractions of capital)
+        event_filters: Optional list of event lists, None in the list means all events
+        max_workers: Number of worker processes, 1 runs in the current process
+
+    Returns:
+        pd.DataFrame: One row of metrics per parameter combination, or None if nothing could be traded
+    """
+    logger.info("Starting backtest sweep")
+
+    prepared = prepare_backtest(news_df)
+    if prepared is None:
+        return None
+
+    event_filters = event_filters or [None]
+    combinations = [
+        (take_profit, stop_loss, position_size, events, initial_capital)
+        for take_profit, stop_loss, position_size, events
+        in itertools.product(take_profits, stop_losses, position_sizes, event_filters)
+    ]
+    logger.info(f"Evaluating {len(combinations)} parameter combinations on {len(prepared[0])} price moves")
+
+    if max_workers == 1 or len(combinations) == 1:
+        _init_sweep_worker(*prepared)
+        results = [_run_sweep_combination(combination) for combination in combinations]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_sweep_worker, initargs=prepared) as executor:
+            results = list(executor.map(_run_sweep_combination, combinations, chunksize=max(1, len(combinations) // 64)))
+
+    logger.info("Backtest sweep completed")
+    return pd.DataFrame(results)
+
 def calculate_metrics(trades_df, initial_capital):
     """Calculate backtest performance metrics"""
     total_trades = len(trades_df)
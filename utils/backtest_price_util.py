@@ -1,10 +1,10 @@
 import pandas as pd
-import yfinance as yf
 import logging
 import os
 from datetime import datetime, time, timedelta
 import numpy as np
 from utils.date.date_adjuster import get_previous_trading_day, get_next_trading_day
+from utils.bar_store_util import get_bars
 import sys
 import pytz
 
@@ -78,7 +78,7 @@ def get_intraday_prices(symbol, date, interval='1m'):
     try:
         start_date = date.strftime('%Y-%m-%d')
         end_date = (date + timedelta(days=1)).strftime('%Y-%m-%d')
-        data = yf.download(symbol, start=start_date, end=end_date, interval=interval, progress=False)
+        data = get_bars(symbol, start_date, end_date, interval=interval)
         
         if data.empty:
             logger.warning(f"No intraday data available for {symbol} on {date}")
@@ -0,0 +1,234 @@
+import os
+import re
+import json
+import threading
+from datetime import date, datetime, timedelta
+import pandas as pd
+import yfinance as yf
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+# Root directory of the bar store, one Parquet file per symbol/interval/month
+BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', os.path.join('data', 'bars'))
+
+# yfinance only serves short windows of 1 minute bars per request
+MAX_REQUEST_DAYS = {'1m': 7}
+
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5)
+}
+
+_lock = threading.Lock()
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+def _symbol_dir(symbol, interval):
+    safe_symbol = re.sub(r'[^A-Za-z0-9._=-]', '_', symbol)
+    return os.path.join(BAR_STORE_DIR, interval, safe_symbol)
+
+def _coverage_path(symbol, interval):
+    return os.path.join(_symbol_dir(symbol, interval), 'coverage.json')
+
+def _month_path(symbol, interval, month):
+    return os.path.join(_symbol_dir(symbol, interval), f'{month}.parquet')
+
+def _bar_days(index):
+    """Trading day of each bar, in the bar's own timezone"""
+    return pd.to_datetime(pd.DatetimeIndex(index).strftime('%Y-%m-%d'))
+
+def load_coverage(symbol, interval):
+    """Get the set of days already fetched for a symbol and interval"""
+    path = _coverage_path(symbol, interval)
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f).get('days', []))
+
+def _save_coverage(symbol, interval, days):
+    path = _coverage_path(symbol, interval)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'days': sorted(days)}, f)
+    os.replace(tmp_path, path)
+
+def missing_ranges(start_date, end_date, covered, interval='1d'):
+    """
+    Get the date ranges in [start_date, end_date) that are not in the store yet.
+
+    Returns:
+        list: (start, end) tuples with an exclusive end date
+    """
+    ranges = []
+    max_days = MAX_REQUEST_DAYS.get(interval)
+    current = _to_date(start_date)
+    end_date = _to_date(end_date)
+    range_start = None
+
+    while current < end_date:
+        if current.strftime('%Y-%m-%d') in covered:
+            if range_start is not None:
+                ranges.append((range_start, current))
+                range_start = None
+        else:
+            if range_start is None:
+                range_start = current
+            elif max_days and (current - range_start).days >= max_days:
+                ranges.append((range_start, current))
+                range_start = current
+        current += timedelta(days=1)
+
+    if range_start is not None:
+        ranges.append((range_start, end_date))
+    return ranges
+
+def read_bars(symbol, start_date, end_date, interval='1d'):
+    """Read stored bars for the days in [start_date, end_date) without touching the network"""
+    start_date, end_date = _to_date(start_date), _to_date(end_date)
+    months = pd.period_range(start_date, end_date - timedelta(days=1), freq='M')
+
+    frames = []
+    for month in months:
+        path = _month_path(symbol, interval, month.strftime('%Y-%m'))
+        if os.path.exists(path):
+            frames.append(pd.read_parquet(path))
+
+    if not frames:
+        return pd.DataFrame()
+
+    data = pd.concat(frames).sort_index()
+    days = _bar_days(data.index)
+    return data[(days >= pd.Timestamp(start_date)) & (days < pd.Timestamp(end_date))]
+
+def write_bars(symbol, interval, data, fetched_ranges):
+    """Merge downloaded bars into the store and mark completed days as covered"""
+    with _lock:
+        os.makedirs(_symbol_dir(symbol, interval), exist_ok=True)
+
+        if not data.empty:
+            months = pd.DatetimeIndex(data.index).strftime('%Y-%m')
+            for month in months.unique():
+                path = _month_path(symbol, interval, month)
+                month_data = data[months == month]
+                if os.path.exists(path):
+                    month_data = pd.concat([pd.read_parquet(path), month_data])
+                month_data = month_data[~month_data.index.duplicated(keep='last')].sort_index()
+                tmp_path = f'{path}.{os.getpid()}.tmp'
+                month_data.to_parquet(tmp_path)
+                os.replace(tmp_path, path)
+
+        # Today's bars are still forming, so only past days count as covered
+        today = date.today()
+        covered = load_coverage(symbol, interval)
+        for range_start, range_end in fetched_ranges:
+            current = range_start
+            while current < min(range_end, today):
+                covered.add(current.strftime('%Y-%m-%d'))
+                current += timedelta(days=1)
+        _save_coverage(symbol, interval, covered)
+
+def download_bars(symbols, start_date, end_date, interval='1d'):
+    """
+    Download bars for several symbols with a single multi-ticker request.
+
+    Returns:
+        dict: symbol -> DataFrame with flat OHLCV columns
+    """
+    symbols = list(symbols)
+    data = yf.download(symbols, start=start_date, end=end_date, interval=interval,
+                       group_by='ticker', progress=False)
+    if data.empty:
+        return {}
+
+    bars = {}
+    for symbol in symbols:
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(0):
+                continue
+            symbol_data = data[symbol]
+        else:
+            symbol_data = data
+        symbol_data = symbol_data.dropna(how='all')
+        if not symbol_data.empty:
+            symbol_data.columns.name = None
+            bars[symbol] = symbol_data
+    return bars
+
+def get_bars_multi(symbols, start_date, end_date, interval='1d'):
+    """
+    Get bars for several symbols over [start_date, end_date), reading through the local store.
+
+    Only the ranges missing from the store are downloaded, with symbols that miss the same
+    ranges fetched together in one multi-ticker request.
+
+    Returns:
+        dict: symbol -> DataFrame of bars (symbols without data are left out)
+    """
+    symbols = list(dict.fromkeys(symbols))
+    pending = {}
+    for symbol in symbols:
+        ranges = missing_ranges(start_date, end_date, load_coverage(symbol, interval), interval)
+        if ranges:
+            pending.setdefault(tuple(ranges), []).append(symbol)
+
+    for ranges, range_symbols in pending.items():
+        logger.info(f"Fetching {interval} bars for {len(range_symbols)} symbols over {len(ranges)} missing ranges")
+        downloaded = {symbol: [] for symbol in range_symbols}
+        fetched = {symbol: [] for symbol in range_symbols}
+        for range_start, range_end in ranges:
+            try:
+                bars = download_bars(range_symbols, range_start.strftime('%Y-%m-%d'),
+                                     range_end.strftime('%Y-%m-%d'), interval)
+            except Exception as e:
+                logger.error(f"Error downloading {interval} bars for {range_symbols}: {e}")
+                continue
+            # Symbols that came back empty may have failed, so they are not marked as covered
+            for symbol, data in bars.items():
+                downloaded[symbol].append(data)
+                fetched[symbol].append((range_start, range_end))
+
+        for symbol in range_symbols:
+            if fetched[symbol]:
+                write_bars(symbol, interval, pd.concat(downloaded[symbol]), fetched[symbol])
+
+    results = {}
+    for symbol in symbols:
+        data = read_bars(symbol, start_date, end_date, interval)
+        if not data.empty:
+            results[symbol] = data
+    return results
+
+def get_bars(symbol, start_date, end_date, interval='1d'):
+    """Get bars for one symbol over [start_date, end_date), reading through the local store"""
+    return get_bars_multi([symbol], start_date, end_date, interval).get(symbol, pd.DataFrame())
+
+def get_period_bars(symbol, period='1y', interval='1d'):
+    """Get bars for a yfinance style period (1d, 5d, 1mo, ... max) ending today"""
+    end_date = date.today() + timedelta(days=1)
+
+    if period in ('1d', '5d'):
+        trading_days = int(period[:-1])
+        data = get_bars(symbol, end_date - timedelta(days=trading_days * 2 + 7), end_date, interval)
+        if data.empty:
+            return data
+        days = _bar_days(data.index)
+        return data[days >= days.unique()[-trading_days:].min()]
+
+    if period == 'max':
+        start_date = date(1970, 1, 1)
+    elif period in PERIOD_OFFSETS:
+        start_date = (pd.Timestamp(end_date) - PERIOD_OFFSETS[period]).date()
+    else:
+        raise ValueError(f"Unsupported period: {period}")
+
+    return get_bars(symbol, start_date, end_date, interval)
@@ -1,7 +1,7 @@
 import pandas as pd
 from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from utils.db.news_db_util import News, engine
+from utils.db.news_db_util import News, db_pool
 import pytz
 from datetime import datetime, timedelta
 import logging
@@ -38,7 +38,7 @@ def adjust_published_date(publisher: str, target_timezone: str):
     """
     logging.info(f"Adjusting published dates for {publisher} to {target_timezone}")
 
-    session = Session(engine)
+    session = Session(db_pool.engine)
     try:
         # Fetch all news items for the given publisher
         query = select(News).where(News.publisher == publisher)
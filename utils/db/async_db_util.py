@@ -0,0 +1,173 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+import pandas as pd
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from utils.db.db_pool import DatabasePool, get_pool_settings, get_statement_timeout_ms
+from utils.db import news_db_util, price_move_db_util, model_db_util
+from utils.db.news_db_util import NEWS_DF_COLUMNS, NEWS_SUMMARY_COLUMNS, NEWS_STREAM_CHUNK_SIZE, compact_news_df
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+# Async driver of each database backend
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite'
+}
+
+def to_async_url(database_url):
+    """Convert a DATABASE_URL to the async driver of its backend"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == 'postgres':
+        backend = 'postgresql'
+    url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+    if backend == 'postgresql' and 'sslmode' in url.query:
+        # asyncpg takes ssl instead of the libpq sslmode parameter
+        url = url.difference_update_query(['sslmode']).update_query_dict({'ssl': url.query['sslmode']})
+    return url
+
+# Engines are bound to the event loop they were created in, so each loop gets its own
+_session_factories = weakref.WeakKeyDictionary()
+
+def _create_session_factory(database_url):
+    url = to_async_url(database_url)
+    connect_args = {}
+    if get_statement_timeout_ms() and url.get_backend_name() == 'postgresql':
+        connect_args['server_settings'] = {'statement_timeout': str(get_statement_timeout_ms())}
+    settings = get_pool_settings() if url.get_backend_name() != 'sqlite' else {}
+    engine = create_async_engine(url, connect_args=connect_args, **settings)
+    logger.info(f"Async database engine initialized for {url.get_backend_name()}")
+    return async_sessionmaker(engine, expire_on_commit=False)
+
+def get_async_session_factory(replica=True):
+    """
+    Get the async session factory of the running event loop.
+
+    Args:
+        replica: use DATABASE_REPLICA_URL when it is set, the primary database otherwise
+    """
+    db_pool = DatabasePool()
+    database_url = db_pool.read_url if replica else db_pool.database_url
+    factories = _session_factories.setdefault(asyncio.get_running_loop(), {})
+    if database_url not in factories:
+        factories[database_url] = _create_session_factory(database_url)
+    return factories[database_url]
+
+@asynccontextmanager
+async def get_async_session(replica=True):
+    """Get an async session for read-only queries"""
+    async with get_async_session_factory(replica)() as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Async database session error: {str(e)}")
+            raise
+
+async def dispose_engines():
+    """Close the connections of the running event loop's engines"""
+    factories = _session_factories.pop(asyncio.get_running_loop(), {})
+    for factory in factories.values():
+        await factory.kw['bind'].dispose()
+
+async def fetch_df(query, columns, replica=True):
+    """Run a query and return its rows as a DataFrame with the given columns"""
+    async with get_async_session(replica) as session:
+        result = await session.execute(query)
+        return pd.DataFrame(result.fetchall(), columns=columns)
+
+async def aread_news_df(columns=None, compact=False, chunk_size=NEWS_STREAM_CHUNK_SIZE, **filters):
+    """Async read_news_df, streaming the rows in chunks of chunk_size"""
+    columns = list(columns or NEWS_SUMMARY_COLUMNS)
+    query = news_db_util.news_df_query(columns, **filters)
+    chunks = []
+    async with get_async_session() as session:
+        result = await session.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            chunks.append(pd.DataFrame(rows, columns=columns))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(chunks, ignore_index=True)
+    return compact_news_df(df) if compact else df
+
+async def aget_news_df(publisher=None, columns=None, compact=False):
+    """Async get_news_df, all columns including content by default"""
+    df = await aread_news_df(columns or list(NEWS_DF_COLUMNS), compact=compact,
+                             publishers=[publisher] if publisher else None)
+    logger.info(f"Retrieved {len(df)} news items")
+    return df
+
+async def aget_news_df_date_range(publishers, start_date, end_date, columns=None, compact=False):
+    """Async get_news_df_date_range, most recent first and without content by default"""
+    return await aread_news_df(columns, compact=compact, publishers=publishers, start_date=start_date,
+                               end_date=end_date, ascending=False)
+
+async def aget_news_page(publisher, page=1, items_per_page=25, start_date=None, end_date=None, ticker_filter=None,
+                         event_filter=None, sort_by='published_date', ascending=False, columns=None):
+    """
+    Async get_news_page.
+
+    Returns:
+        tuple: (DataFrame of the page, total number of matching rows)
+    """
+    columns = list(columns or NEWS_SUMMARY_COLUMNS)
+    query, count_query = news_db_util.news_page_query(publisher, page, items_per_page, start_date, end_date,
+                                                      ticker_filter, event_filter, sort_by, ascending, columns)
+    async with get_async_session() as session:
+        total_count = (await session.execute(count_query)).scalar()
+        rows = (await session.execute(query)).fetchall() if total_count else []
+    return pd.DataFrame(rows, columns=columns), total_count
+
+async def aget_top_events(limit=20):
+    """Async get_top_events"""
+    async with get_async_session() as session:
+        return [row.event for row in await session.execute(news_db_util.top_events_query(limit))]
+
+async def aget_news_price_moves():
+    """Async get_news_price_moves"""
+    try:
+        df = await fetch_df(price_move_db_util.news_price_moves_query(), price_move_db_util.NEWS_PRICE_MOVE_COLUMNS)
+        logger.info(f"Retrieved {len(df)} rows from news and price_moves tables")
+        return df
+    except Exception as e:
+        logger.error(f"Error retrieving news and price moves: {str(e)}")
+        return pd.DataFrame()
+
+async def aget_results(timestamp=None):
+    """Async get_results"""
+    return await fetch_df(model_db_util.results_query(timestamp), model_db_util.BINARY_RESULT_COLUMNS, replica=False)
+
+async def aget_latest_accuracies(ttl=model_db_util.ACCURACY_CACHE_TTL):
+    """Async get_latest_accuracies, sharing its in-process cache"""
+    accuracies = model_db_util.get_cached_accuracies(ttl)
+    if accuracies is not None:
+        return accuracies
+
+    try:
+        # Read from the primary, the cache is reloaded right after training writes new results
+        async with get_async_session(replica=False) as session:
+            result = await session.execute(model_db_util.latest_accuracy_query())
+            accuracies = {event: accuracy for event, accuracy in result}
+    except Exception as e:
+        logger.error(f"An error occurred while fetching latest accuracies: {str(e)}")
+        return {}
+
+    model_db_util.cache_accuracies(accuracies)
+    return accuracies
+
+async def aget_accuracy(event):
+    """Async get_accuracy"""
+    try:
+        async with get_async_session(replica=False) as session:
+            result = (await session.execute(model_db_util.accuracy_query(event))).first()
+            return result[0] if result else None
+    except Exception as e:
+        logger.error(f"An error occurred while fetching accuracy for event {event}: {str(e)}")
+        return None
+
+async def aget_training_manifest(model_type):
+    """Async get_training_manifest"""
+    return await fetch_df(model_db_util.training_manifest_query(model_type),
+                          model_db_util.TRAINING_MANIFEST_COLUMNS, replica=False)
@@ -1,14 +1,70 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exc
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from dotenv import load_dotenv
 import os
+import time
+import threading
 from contextlib import contextmanager
 from utils.logging.log_util import get_logger
 
 logger = get_logger(__name__)
 
+def get_pool_settings():
+    """Get the connection pool settings, tunable by env"""
+    return {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),  # Maximum number of connections in the pool
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),  # Maximum number of connections that can be created beyond pool_size
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),  # Timeout for getting a connection from the pool
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),  # Recycle connections after 30 minutes
+        'pool_pre_ping': True  # Enable connection health checks
+    }
+
+def get_statement_timeout_ms():
+    """Get the PostgreSQL statement timeout in milliseconds, 0 when disabled"""
+    return int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 0))
+
+class MetricsQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        wait_seconds = time.perf_counter() - start
+        with self._metrics_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+        return connection
+
+    def metrics(self):
+        """Get the pool size, connection counts and checkout wait times"""
+        with self._metrics_lock:
+            return {
+                'size': self.size(),
+                'checked_in': self.checkedin(),
+                'checked_out': self.checkedout(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_max': self.wait_seconds_max
+            }
+
 class DatabasePool:
     _instance = None
     _engine = None
@@ -22,41 +78,86 @@ class DatabasePool:
         return cls._instance
 
     def _initialize(self):
-        """Initialize database connection pool"""
+        """Read the database settings, the engines are created on first use"""
         load_dotenv()
-        database_url = os.getenv('DATABASE_URL')
+        self._database_url = os.getenv('DATABASE_URL')
         
-        if not database_url:
+        if not self._database_url:
             raise ValueError("DATABASE_URL environment variable not set")
 
-        # Configure connection pool
-        self._engine = create_engine(
-            database_url,
-            poolclass=QueuePool,
-            pool_size=5,  # Maximum number of connections in the pool
-            max_overflow=10,  # Maximum number of connections that can be created beyond pool_size
-            pool_timeout=30,  # Timeout for getting a connection from the pool
-            pool_recycle=1800,  # Recycle connections after 30 minutes
-            pool_pre_ping=True  # Enable connection health checks
-        )
-        
-        self._SessionFactory = sessionmaker(bind=self._engine)
-        logger.info("Database connection pool initialized")
+        # Optional read-only replica for the heavy Streamlit read paths
+        self._replica_url = os.getenv('DATABASE_REPLICA_URL')
+        self._read_engine = None
+        self._ReadSessionFactory = None
+
+        self._lock = threading.Lock()
+        self._tables_ensured = False
+
+    def _create_engine(self, database_url):
+        connect_args = {}
+        if get_statement_timeout_ms() and database_url.startswith('postgresql'):
+            # Enforced by the server, so runaway queries do not hold a pooled connection
+            connect_args['options'] = f'-c statement_timeout={get_statement_timeout_ms()}'
+
+        return create_engine(database_url, poolclass=MetricsQueuePool, connect_args=connect_args,
+                             **get_pool_settings())
+
+    def _ensure_engine(self):
+        if self._engine is None:
+            with self._lock:
+                if self._engine is None:
+                    engine = self._create_engine(self._database_url)
+                    self._SessionFactory = sessionmaker(bind=engine)
+                    # Set last, other threads only skip the lock once both are ready
+                    self._engine = engine
+                    logger.info("Database connection pool initialized")
+
+    def _ensure_read_engine(self):
+        if self._read_engine is None:
+            if not self._replica_url:
+                # Without a replica, reads share the primary pool
+                self._ensure_engine()
+                self._ReadSessionFactory = self._SessionFactory
+                self._read_engine = self._engine
+                return
+            with self._lock:
+                if self._read_engine is None:
+                    engine = self._create_engine(self._replica_url)
+                    self._ReadSessionFactory = sessionmaker(bind=engine)
+                    self._read_engine = engine
+                    logger.info("Replica connection pool initialized")
+
+    @property
+    def database_url(self):
+        return self._database_url
+
+    @property
+    def read_url(self):
+        """Get the URL of the read replica, the primary URL if DATABASE_REPLICA_URL is not set"""
+        return self._replica_url or self._database_url
 
     @property
     def engine(self):
-        """Get the SQLAlchemy engine"""
+        """Get the SQLAlchemy engine, creating it on first use"""
+        self._ensure_engine()
         return self._engine
 
+    @property
+    def read_engine(self):
+        """Get the engine of the read replica, the primary engine if DATABASE_REPLICA_URL is not set"""
+        self._ensure_read_engine()
+        return self._read_engine
+
     @property
     def SessionFactory(self):
         """Get the session factory"""
+        self._ensure_engine()
         return self._SessionFactory
 
     @contextmanager
     def get_session(self):
         """Get a database session from the pool with context management"""
-        session = self._SessionFactory()
+        session = self.SessionFactory()
         try:
             yield session
             session.commit()
@@ -67,12 +168,48 @@ class DatabasePool:
         finally:
             session.close()
 
+    @contextmanager
+    def get_read_session(self):
+        """
+        Get a session for read-only queries, served by the replica when one is configured.
+
+        Nothing is committed, so the session must not be used for writes.
+        """
+        self._ensure_read_engine()
+        session = self._ReadSessionFactory()
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Database read session error: {str(e)}")
+            raise
+        finally:
+            session.rollback()
+            session.close()
+
+    def pool_metrics(self):
+        """
+        Get the connection pool statistics.
+
+        Returns:
+            dict: 'primary' and, when a replica is configured, 'replica' pool statistics
+        """
+        metrics = {'primary': self.engine.pool.metrics()}
+        if self._replica_url:
+            metrics['replica'] = self.read_engine.pool.metrics()
+        return metrics
+
     def create_all_tables(self):
         """Create all tables defined in the models"""
-        self.Base.metadata.create_all(self._engine)
+        self.Base.metadata.create_all(self.engine)
+        self._tables_ensured = True
         logger.info("All database tables created")
 
+    def ensure_tables(self):
+        """Create missing tables once per process, called before the first write instead of at import"""
+        if not self._tables_ensured:
+            self.create_all_tables()
+
     def drop_all_tables(self):
         """Drop all tables defined in the models"""
-        self.Base.metadata.drop_all(self._engine)
+        self.Base.metadata.drop_all(self.engine)
         logger.info("All database tables dropped") 
\ No newline at end of file
@@ -4,12 +4,25 @@ from utils.logging.log_util import get_logger
 import pandas as pd
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 import re
+import threading
 
 logger = get_logger(__name__)
 
 # Get the database pool instance
 db_pool = DatabasePool()
 
+# Bumped on every instrument write so in-memory indexes know when to reload
+_instrument_version = 0
+_version_lock = threading.Lock()
+
+def get_instrument_version():
+    return _instrument_version
+
+def _bump_instrument_version():
+    global _instrument_version
+    with _version_lock:
+        _instrument_version += 1
+
 class Instrument(db_pool.Base):
     __tablename__ = 'instrument'
 
@@ -48,11 +61,14 @@ def save_instrument(instrument_data):
                 session.add(instrument)
                 logger.info("Created new instrument")
 
-            return instrument.to_dict()
+            saved_instrument = instrument.to_dict()
         except SQLAlchemyError as e:
             logger.exception(f"A database error occurred while saving instrument: {e}")
             raise Exception(f"A database error occurred: {str(e)}")
 
+    _bump_instrument_version()
+    return saved_instrument
+
 def get_instrument_by_ticker(ticker):
     with db_pool.get_session() as session:
         try:
@@ -96,6 +112,14 @@ def get_instrument_by_company_name(company_name):
             logger.error(f"A database error occurred while querying for {company_name}: {str(e)}")
             return None
 
+def get_instrument_records():
+    """Get the id, issuer, ticker, yf_ticker and url of every instrument with an issuer, ordered by id"""
+    with db_pool.get_session() as session:
+        query = select(Instrument.id, Instrument.issuer, Instrument.ticker, Instrument.yf_ticker, Instrument.url) \
+            .where(Instrument.issuer.isnot(None)) \
+            .order_by(Instrument.id)
+        return [dict(row._mapping) for row in session.execute(query)]
+
 def get_all_instruments():
     with db_pool.get_session() as session:
         try:
@@ -114,6 +138,7 @@ def delete_instruments(ids):
             delete_stmt = delete(Instrument).where(Instrument.id.in_(ids))
             session.execute(delete_stmt)
             session.commit()
+            _bump_instrument_version()
             logger.info(f"Successfully deleted {len(ids)} instruments")
         except Exception as e:
             session.rollback()
@@ -131,6 +156,7 @@ def insert_instrument(instrument_data):
             instrument = Instrument(**instrument_data)
             session.add(instrument)
             session.commit()
+            _bump_instrument_version()
             logger.info(f"Inserted new instrument with ID: {instrument.id}")
             return instrument.to_dict(), "Instrument inserted successfully."
         except IntegrityError as e:
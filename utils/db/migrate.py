@@ -0,0 +1,93 @@
+import os
+import argparse
+from sqlalchemy import text
+from utils.db.db_pool import DatabasePool
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'sql', 'migrations')
+
+# Comment line marking a migration that has to run outside a transaction, e.g. CREATE INDEX CONCURRENTLY
+NO_TRANSACTION_DIRECTIVE = '-- migrate: no-transaction'
+
+def list_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Get the migration files in the order they are applied"""
+    return sorted(name for name in os.listdir(migrations_dir) if name.endswith('.sql'))
+
+def get_applied_migrations(connection):
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version VARCHAR(255) PRIMARY KEY, "
+        "applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    return {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+def get_pending_migrations(migrations_dir=MIGRATIONS_DIR):
+    """Get the migration files not recorded in schema_migrations yet"""
+    with DatabasePool().engine.begin() as connection:
+        applied = get_applied_migrations(connection)
+    return [name for name in list_migrations(migrations_dir) if name not in applied]
+
+def split_statements(sql):
+    """
+    Split a migration into its statements, leaving out comment lines.
+
+    Statements are split on semicolons, so migrations must not use them inside literals.
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+def run_migration(engine, name, sql):
+    """Run one migration and record it in schema_migrations"""
+    record = text("INSERT INTO schema_migrations (version) VALUES (:version)")
+    if NO_TRANSACTION_DIRECTIVE not in sql:
+        with engine.begin() as connection:
+            connection.exec_driver_sql(sql)
+            connection.execute(record, {'version': name})
+        return
+
+    # CREATE INDEX CONCURRENTLY refuses to run in a transaction, including the implicit
+    # one around a multi-statement query, so each statement is sent on its own
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+        for statement in split_statements(sql):
+            connection.exec_driver_sql(statement)
+        connection.execute(record, {'version': name})
+
+def apply_migrations(migrations_dir=MIGRATIONS_DIR):
+    """
+    Apply pending migrations, each in its own transaction.
+
+    Migrations containing NO_TRANSACTION_DIRECTIVE run statement by statement in autocommit mode
+    and are only recorded once every statement succeeded, so they must be safe to rerun.
+
+    Returns:
+        list: names of the migrations applied
+    """
+    engine = DatabasePool().engine
+    applied = []
+    for name in get_pending_migrations(migrations_dir):
+        with open(os.path.join(migrations_dir, name)) as f:
+            sql = f.read()
+
+        logger.info(f"Applying migration {name}")
+        try:
+            run_migration(engine, name, sql)
+        except Exception as e:
+            logger.error(f"Error applying migration {name}: {e}")
+            raise
+        applied.append(name)
+
+    logger.info(f"Applied {len(applied)} migrations")
+    return applied
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Apply the SQL migrations in sql/migrations.")
+    parser.add_argument("--list", action="store_true", help="Only list pending migrations")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in get_pending_migrations():
+            print(name)
+    else:
+        apply_migrations()
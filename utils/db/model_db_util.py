@@ -1,11 +1,14 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import Column, Integer, String, Float, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, func, select
+from sqlalchemy.dialects.postgresql import insert
 from utils.db.db_pool import DatabasePool
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
+import time
+import threading
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
 import logging
 
 # Load environment variables
@@ -46,10 +49,31 @@ class ModelResultsRegression(db_pool.Base):
     training_sample = Column(Integer, nullable=False)
     total_sample = Column(Integer, nullable=False)
 
+class ModelTrainingManifest(db_pool.Base):
+    __tablename__ = 'eq_model_training_manifest'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    event = Column(String(255), nullable=False)
+    model_type = Column(String(50), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    data_hash = Column(String(64), nullable=False)
+    trained_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('uq_model_training_manifest_event_type', 'event', 'model_type', unique=True),
+    )
+
+# Seconds the latest accuracies are reused before being reloaded
+ACCURACY_CACHE_TTL = int(os.getenv('ACCURACY_CACHE_TTL', 600))
+
+_accuracy_cache = {'loaded_at': None, 'accuracies': None}
+_accuracy_cache_lock = threading.Lock()
+
 def create_tables():
     db_pool.create_all_tables()
 
 def save_results(results_df):
+    db_pool.ensure_tables()
     with db_pool.get_session() as session:
         try:
             for _, row in results_df.iterrows():
@@ -65,13 +89,17 @@ def save_results(results_df):
                     total_sample=row['total_sample']
                 )
                 session.add(result)
-            logging.info(f'Successfully saved results to database')
-            return True
         except Exception as e:
             logging.error(f'An error occurred while saving model results: {str(e)}')
             return False
 
+    # The new run is committed, so cached accuracies are stale
+    invalidate_accuracy_cache()
+    logging.info(f'Successfully saved results to database')
+    return True
+
 def save_regression_results(results_df):
+    db_pool.ensure_tables()
     with db_pool.get_session() as session:
         try:
             for _, row in results_df.iterrows():
@@ -92,25 +120,20 @@ def save_regression_results(results_df):
             logging.error(f'An error occurred while saving regression model results: {str(e)}')
             return False
 
+BINARY_RESULT_COLUMNS = ['timestamp', 'event', 'accuracy', 'precision', 'recall', 'f1_score', 'auc_roc',
+                         'test_sample', 'training_sample', 'total_sample']
+
+def results_query(timestamp: str = None):
+    """Query for the binary model results of get_results, shared with the async reads"""
+    query = select(*[getattr(ModelResultsBinary, column) for column in BINARY_RESULT_COLUMNS])
+    if timestamp:
+        query = query.where(ModelResultsBinary.timestamp == timestamp)
+    return query
+
 def get_results(timestamp: str = None) -> pd.DataFrame:
     with db_pool.get_session() as session:
-        query = session.query(ModelResultsBinary)
-        if timestamp:
-            query = query.filter(ModelResultsBinary.timestamp == timestamp)
-        results = query.all()
-        data = [{
-            'timestamp': result.timestamp,
-            'event': result.event,
-            'accuracy': result.accuracy,
-            'precision': result.precision,
-            'recall': result.recall,
-            'f1_score': result.f1_score,
-            'auc_roc': result.auc_roc,
-            'test_sample': result.test_sample,
-            'training_sample': result.training_sample,
-            'total_sample': result.total_sample
-        } for result in results]
-        return pd.DataFrame(data)
+        rows = session.execute(results_query(timestamp)).fetchall()
+        return pd.DataFrame(rows, columns=BINARY_RESULT_COLUMNS)
 
 def get_regression_results(timestamp: str = None) -> pd.DataFrame:
     with db_pool.get_session() as session:
@@ -131,11 +154,109 @@ def get_regression_results(timestamp: str = None) -> pd.DataFrame:
         } for result in results]
         return pd.DataFrame(data)
 
+def latest_accuracy_query():
+    """Query for the accuracy of the most recent binary model run of each event"""
+    # A row_number window rather than DISTINCT ON so the query also runs on SQLite
+    run_number = func.row_number().over(
+        partition_by=ModelResultsBinary.event,
+        order_by=(ModelResultsBinary.timestamp.desc(), ModelResultsBinary.id.desc())
+    ).label('run_number')
+    runs = select(ModelResultsBinary.event, ModelResultsBinary.accuracy, run_number).subquery()
+    return select(runs.c.event, runs.c.accuracy).where(runs.c.run_number == 1)
+
+def invalidate_accuracy_cache():
+    """Drop the cached accuracies so the next lookup reads the latest run"""
+    with _accuracy_cache_lock:
+        _accuracy_cache['loaded_at'] = None
+        _accuracy_cache['accuracies'] = None
+
+def get_cached_accuracies(ttl: int = ACCURACY_CACHE_TTL) -> Optional[Dict[str, float]]:
+    """Get the cached accuracies, None if they are missing or older than ttl seconds"""
+    with _accuracy_cache_lock:
+        loaded_at = _accuracy_cache['loaded_at']
+        if loaded_at is not None and time.monotonic() - loaded_at < ttl:
+            return _accuracy_cache['accuracies']
+    return None
+
+def cache_accuracies(accuracies: Dict[str, float]):
+    with _accuracy_cache_lock:
+        _accuracy_cache['loaded_at'] = time.monotonic()
+        _accuracy_cache['accuracies'] = accuracies
+
+def get_latest_accuracies(ttl: int = ACCURACY_CACHE_TTL) -> Dict[str, float]:
+    """
+    Get the latest binary model accuracy of every event with one grouped query.
+
+    Results are cached in process for ttl seconds and invalidated by save_results.
+
+    Returns:
+        dict: event -> accuracy
+    """
+    accuracies = get_cached_accuracies(ttl)
+    if accuracies is not None:
+        return accuracies
+
+    try:
+        with db_pool.get_session() as session:
+            accuracies = {event: accuracy for event, accuracy in session.execute(latest_accuracy_query())}
+    except Exception as e:
+        logging.error(f'An error occurred while fetching latest accuracies: {str(e)}')
+        return {}
+
+    cache_accuracies(accuracies)
+    return accuracies
+
+def accuracy_query(event: str):
+    return select(ModelResultsBinary.accuracy).where(ModelResultsBinary.event == event).limit(1)
+
 def get_accuracy(event: str) -> float:
     with db_pool.get_session() as session:
         try:
-            result = session.query(ModelResultsBinary.accuracy).filter(ModelResultsBinary.event == event).first()
+            result = session.execute(accuracy_query(event)).first()
             return result[0] if result else None
         except Exception as e:
             logging.error(f'An error occurred while fetching accuracy for event {event}: {str(e)}')
             return None
+
+
+TRAINING_MANIFEST_COLUMNS = ['event', 'row_count', 'data_hash', 'trained_at']
+
+def training_manifest_query(model_type: str):
+    return select(*[getattr(ModelTrainingManifest, column) for column in TRAINING_MANIFEST_COLUMNS]) \
+        .where(ModelTrainingManifest.model_type == model_type)
+
+def get_training_manifest(model_type: str) -> pd.DataFrame:
+    """Get the row count, data hash and last fit time of each event trained for a model type"""
+    # The first incremental run reads the manifest before anything was trained or saved
+    db_pool.ensure_tables()
+    with db_pool.get_session() as session:
+        rows = session.execute(training_manifest_query(model_type)).fetchall()
+        return pd.DataFrame(rows, columns=TRAINING_MANIFEST_COLUMNS)
+
+def save_training_manifest(model_type: str, fingerprints_df: pd.DataFrame) -> bool:
+    """Record the training data of freshly fitted events, replacing their previous entries"""
+    if fingerprints_df.empty:
+        return True
+    db_pool.ensure_tables()
+
+    records = [{
+        'event': row['event'],
+        'model_type': model_type,
+        'row_count': int(row['row_count']),
+        'data_hash': row['data_hash'],
+        'trained_at': func.now()
+    } for _, row in fingerprints_df.iterrows()]
+
+    stmt = insert(ModelTrainingManifest).values(records)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['event', 'model_type'],
+        set_={column: stmt.excluded[column] for column in ['row_count', 'data_hash', 'trained_at']}
+    )
+    try:
+        with db_pool.get_session() as session:
+            session.execute(stmt)
+        logging.info(f'Saved training manifest for {len(records)} {model_type} events')
+        return True
+    except Exception as e:
+        logging.error(f'An error occurred while saving the training manifest: {str(e)}')
+        return False
@@ -1,29 +1,20 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, func, and_, select, update
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.dialects.postgresql import TIMESTAMP
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, func, and_, select, update, bindparam
+from sqlalchemy.dialects.postgresql import TIMESTAMP, insert
 from datetime import datetime
+import time
 import pandas as pd
-import streamlit as st
 from sqlalchemy import exists
 from utils.logging.log_util import get_logger
 from utils.db.db_pool import DatabasePool
+from utils.db.model_db_util import latest_accuracy_query
 
 logger = get_logger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Get DATABASE_URL from environment variables
-DATABASE_URL = os.getenv('DATABASE_URL')
-
-# Create SQLAlchemy engine and session
-engine = create_engine(DATABASE_URL)
-Session = sessionmaker(bind=engine)
-Base = declarative_base()
-
-# Get database pool instance
+# Get database pool instance, its engine is created on first use
 db_pool = DatabasePool()
 
 class News(db_pool.Base):
@@ -52,29 +43,91 @@ class News(db_pool.Base):
     predicted_side = Column(String(10))
     predicted_move = Column(Float)
 
-def add_news_items(news_items, check_uniqueness=True):
-    logger.info(f"Adding {len(news_items)} news items to the database")
-    added_count = 0
-    duplicate_count = 0
+    __table_args__ = (
+        Index('uq_news_link_publisher', 'link', 'publisher', unique=True),
+    )
 
-    with db_pool.get_session() as session:
-        for item in news_items:
-            if check_uniqueness:
-                existing_item = session.query(News).filter(
-                    News.link == item.link,
-                    News.publisher == item.publisher
-                ).first()
+# Number of rows per multi-row INSERT statement
+NEWS_INSERT_BATCH_SIZE = 1000
+
+# Column defaults used when mapping a DataFrame to news rows
+NEWS_COLUMN_DEFAULTS = {
+    'title': '',
+    'link': '',
+    'company': '',
+    'published_date': None,
+    'content': '',
+    'reason': '',
+    'industry': '',
+    'publisher_topic': '',
+    'event': '',
+    'publisher': None,
+    'status': 'raw',
+    'instrument_id': None,
+    'yf_ticker': '',
+    'ticker': '',
+    'published_date_gmt': None,
+    'timezone': '',
+    'publisher_summary': '',
+    'ticker_url': '',
+    'predicted_side': None,
+    'predicted_move': None
+}
+
+def add_news_records(records, batch_size=NEWS_INSERT_BATCH_SIZE):
+    """
+    Insert news rows in batches, skipping rows whose (link, publisher) already exists.
 
-                if existing_item:
-                    duplicate_count += 1
-                    continue
+    Each batch is committed in its own transaction, so a failing batch keeps the batches before it.
 
-            session.add(item)
-            added_count += 1
+    Args:
+        records: List of dicts with the NEWS_COLUMN_DEFAULTS keys and downloaded_at
+        batch_size: Number of rows per INSERT statement
+
+    Returns:
+        tuple: (added_count, duplicate_count)
+    """
+    logger.info(f"Bulk inserting {len(records)} news items in batches of {batch_size}")
+    added_count = 0
 
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        stmt = insert(News).values(batch).on_conflict_do_nothing(
+            index_elements=['link', 'publisher']
+        ).returning(News.id)
+
+        try:
+            with db_pool.get_session() as session:
+                added_count += len(session.execute(stmt).fetchall())
+        except Exception as e:
+            logger.error(f"Error inserting news items {start}-{start + len(batch)}: {str(e)}")
+            raise
+
+    duplicate_count = len(records) - added_count
     logger.info(f"Added {added_count} news items to the database, {duplicate_count} duplicates skipped")
     return added_count, duplicate_count
 
+def add_news_items(news_items, check_uniqueness=True):
+    logger.info(f"Adding {len(news_items)} news items to the database")
+
+    if check_uniqueness:
+        records = [{column: getattr(item, column) for column in list(NEWS_COLUMN_DEFAULTS) + ['downloaded_at']}
+                   for item in news_items]
+        for record in records:
+            if record['downloaded_at'] is None:
+                record['downloaded_at'] = datetime.utcnow()
+        return add_news_records(records)
+
+    with db_pool.get_session() as session:
+        session.add_all(news_items)
+
+    logger.info(f"Added {len(news_items)} news items to the database, 0 duplicates skipped")
+    return len(news_items), 0
+
+def add_news_df(df, source, batch_size=NEWS_INSERT_BATCH_SIZE):
+    """Bulk insert a news DataFrame, returning (added_count, duplicate_count)"""
+    return add_news_records(map_to_records(df, source), batch_size)
+
 def remove_duplicates(session, news_items):
     unique_items = []
     duplicate_count = 0
@@ -92,42 +145,30 @@ def remove_duplicates(session, news_items):
     
     return unique_items, duplicate_count
 
+def map_to_records(df, source):
+    """Map a news DataFrame to a list of column dicts, column by column"""
+    logger.info(f"Mapping dataframe to news records for source: {source}")
+
+    records_df = pd.DataFrame(index=df.index)
+    for column, default in NEWS_COLUMN_DEFAULTS.items():
+        records_df[column] = df[column] if column in df.columns else default
+    records_df['publisher'] = records_df['publisher'].fillna(source)
+    records_df['downloaded_at'] = datetime.utcnow()
+
+    # Missing values go to the database as NULL
+    records_df = records_df.astype(object).where(records_df.notna(), None)
+    return records_df.to_dict('records')
+
 def map_to_db(df, source):
     logger.info(f"Mapping dataframe to News objects for source: {source}")
     
-    news_items = []
-    for _, row in df.iterrows():
-        news_item = News(
-            title=row.get('title', ''),
-            link=row.get('link', ''),
-            company=row.get('company', ''),
-            published_date=row.get('published_date'),
-            content=row.get('content', ''),
-            reason=row.get('reason', ''),
-            industry=row.get('industry', ''),
-            publisher_topic=row.get('publisher_topic', ''),
-            event=row.get('event', ''),
-            publisher=row.get('publisher', source),
-            downloaded_at=datetime.utcnow(),
-            status=row.get('status', 'raw'),
-            instrument_id=row.get('instrument_id'),
-            yf_ticker=row.get('yf_ticker', ''),
-            ticker=row.get('ticker', ''),
-            published_date_gmt=row.get('published_date_gmt'),
-            timezone=row.get('timezone', ''),
-            publisher_summary=row.get('publisher_summary', ''),
-            ticker_url=row.get('ticker_url', ''),
-            predicted_side=row.get('predicted_side', None),
-            predicted_move=row.get('predicted_move', None)
-        )
-        news_items.append(news_item)
-    
-        logger.info(f"Created {len(news_items)} News objects")
+    news_items = [News(**record) for record in map_to_records(df, source)]
+    logger.info(f"Created {len(news_items)} News objects")
     
     return news_items
 
 def remove_duplicate_news():
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         subquery = session.query(News.link, func.min(News.downloaded_at).label('min_downloaded_at')) \
                           .group_by(News.link) \
@@ -153,48 +194,66 @@ def remove_duplicate_news():
     finally:
         session.close()
 
-def get_news_df_date_range(publishers, start_date, end_date):
-    session = Session()
-    try:
-        query = select(News).where(
-            News.publisher.in_(publishers),
-            News.published_date >= start_date,
-            News.published_date <= end_date
-        ).order_by(News.published_date.desc())
-        
-        result = session.execute(query)
-        news_items = result.scalars().all()
-        
-        data = [{
-            'news_id': item.id,
-            'ticker': item.ticker,
-            'ticker_url': item.ticker_url,
-            'title': item.title,
-            'link': item.link,
-            'published_date': item.published_date,
-            'company': item.company,
-            'event': item.event,
-            'reason': item.reason,
-            'publisher': item.publisher,
-            'industry': item.industry,
-            'publisher_topic': item.publisher_topic,
-            'instrument_id': item.instrument_id,
-            'yf_ticker': item.yf_ticker,
-            'published_date_gmt': item.published_date_gmt,
-            'timezone': item.timezone,
-            'publisher_summary': item.publisher_summary,
-            'predicted_side': item.predicted_side,
-            'predicted_move': item.predicted_move,
-            'event': item.event
-        } for item in news_items]
-        
-        return pd.DataFrame(data)
-    finally:
-        session.close()
+def get_news_df_date_range(publishers, start_date, end_date, columns=None, compact=False):
+    """Get news of the given publishers within a date range, most recent first and without content by default"""
+    return read_news_df(columns, compact=compact, publishers=publishers, start_date=start_date,
+                        end_date=end_date, ascending=False)
+
+# Number of rows per executemany UPDATE chunk
+NEWS_UPDATE_CHUNK_SIZE = 1000
+
+def to_update_rows(df, columns):
+    """Convert a DataFrame to update rows with native Python values and None for nulls"""
+    rows_df = df[['news_id'] + list(columns)].astype(object)
+    return rows_df.where(rows_df.notna(), None).to_dict('records')
+
+def bulk_update_news(rows, columns, chunk_size=NEWS_UPDATE_CHUNK_SIZE):
+    """
+    Update news rows by id with one executemany UPDATE per chunk.
+
+    None values keep the current column value. Each chunk commits in its own transaction,
+    so the ids of a failed chunk can be retried without redoing the others.
+
+    Args:
+        rows: List of dicts with 'news_id' and a value for each column
+        columns: Columns to update
+        chunk_size: Number of rows per UPDATE statement
+
+    Returns:
+        tuple: (updated_count, failed_ids)
+    """
+    table = News.__table__
+    stmt = update(table).where(table.c.id == bindparam('b_news_id')).values({
+        column: func.coalesce(bindparam(f'b_{column}', type_=table.c[column].type), table.c[column])
+        for column in columns
+    })
+
+    updated_count = 0
+    failed_ids = []
+    start_time = time.perf_counter()
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        params = [{'b_news_id': row['news_id'], **{f'b_{column}': row.get(column) for column in columns}}
+                  for row in chunk]
+        try:
+            with db_pool.get_session() as session:
+                result = session.execute(stmt, params)
+                updated_count += result.rowcount if result.rowcount >= 0 else len(chunk)
+        except Exception as e:
+            logger.error(f"Error updating news rows {start}-{start + len(chunk)}: {str(e)}")
+            failed_ids.extend(row['news_id'] for row in chunk)
+        logger.info(f"Updated {min(start + chunk_size, len(rows))}/{len(rows)} rows")
+
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"Updated {updated_count} news rows ({', '.join(columns)}) in {elapsed:.2f}s")
+    if failed_ids:
+        logger.error(f"{len(failed_ids)} news rows failed to update and can be retried: {failed_ids[:20]}")
+    return updated_count, failed_ids
 
 def get_news_without_tickers():
     logger.info("Retrieving news items without tickers from database")
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         query = select(News).where(News.ticker.is_(None))
         result = session.execute(query)
@@ -206,44 +265,29 @@ def get_news_without_tickers():
     finally:
         session.close()
 
-def update_news_tickers(news_items_with_data):
+def update_news_tickers(news_items_with_data, chunk_size=NEWS_UPDATE_CHUNK_SIZE):
+    """Update the tickers of news rows, returning (updated_count, failed_ids) like bulk_update_news"""
     logger.info("Updating database with extracted tickers, yf_tickers, and instrument IDs")
-    
-    session = Session()
-    try:
-        updated_count = 0
-        total_items = len(news_items_with_data)
-        for index, (news_id, ticker, yf_ticker, instrument_id, ticker_url) in enumerate(news_items_with_data):
-            update_values = {}
-            if ticker:
-                update_values['ticker'] = ticker
-            if yf_ticker:
-                update_values['yf_ticker'] = yf_ticker
-            if instrument_id:
-                update_values['instrument_id'] = instrument_id
-            if ticker_url:
-                update_values['ticker_url'] = ticker_url
-            
-            if update_values:
-                stmt = update(News).where(News.id == news_id).values(**update_values)
-                session.execute(stmt)
-                updated_count += 1
-            
-            if (index + 1) % 10 == 0 or index == total_items - 1:
-                session.commit()
-                logger.info(f"Processed {index + 1}/{total_items} items")
-        
-        logger.info(f"Successfully updated {updated_count} news items with tickers, yf_tickers, and instrument IDs")
-    except Exception as e:
-        logger.error(f"Error updating news items: {str(e)}")
-        session.rollback()
-    finally:
-        session.close()
+
+    rows = []
+    for news_id, ticker, yf_ticker, instrument_id, ticker_url in news_items_with_data:
+        if ticker or yf_ticker or instrument_id or ticker_url:
+            rows.append({
+                'news_id': news_id,
+                'ticker': ticker or None,
+                'yf_ticker': yf_ticker or None,
+                'instrument_id': instrument_id or None,
+                'ticker_url': ticker_url or None
+            })
+
+    updated_count, failed_ids = bulk_update_news(rows, ['ticker', 'yf_ticker', 'instrument_id', 'ticker_url'], chunk_size)
+    logger.info(f"Successfully updated {updated_count} news items with tickers, yf_tickers, and instrument IDs")
+    return updated_count, failed_ids
 
 def update_news_status(news_ids, new_status):
     logger.info(f"Updating status to '{new_status}' for {len(news_ids)} news items")
     
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         updated_count = session.query(News).filter(News.id.in_(news_ids)).update({News.status: new_status}, synchronize_session='fetch')
         session.commit()
@@ -260,7 +304,7 @@ def update_news_status(news_ids, new_status):
 def get_news_without_company(publisher):
     logger.info(f"Retrieving news items without company names for publisher: {publisher}")
     
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         query = select(News).where(
             News.company.is_(None), 
@@ -275,34 +319,25 @@ def get_news_without_company(publisher):
     finally:
         session.close()
 
-def update_companies(enriched_df):
+def update_companies(enriched_df, chunk_size=NEWS_UPDATE_CHUNK_SIZE):
+    """Update the company names of news rows, returning (updated_count, failed_ids) like bulk_update_news"""
     logger.info("Updating database with enriched company names")
 
-    session = Session()
-    try:
-        updated_count = 0
-        total_items = len(enriched_df)
-        for index, row in enriched_df.iterrows():
-            news_item = session.get(News, row['id'])
-            if news_item and 'company' in row and row['company']:
-                news_item.company = row['company']
-                updated_count += 1
-            
-            if (index + 1) % 10 == 0 or index == total_items - 1:
-                logger.info(f"Updated {index + 1}/{total_items} items")
-        
-        session.commit()
-        logger.info(f"Successfully updated {updated_count} news items with company names")
-    except Exception as e:
-        logger.error(f"Error updating company names: {str(e)}")
-        session.rollback()
-    finally:
-        session.close()
+    if 'company' not in enriched_df.columns:
+        logger.warning("No company column to update")
+        return 0, []
+
+    companies = enriched_df[enriched_df['company'].notna() & (enriched_df['company'] != '')]
+    rows = to_update_rows(companies.rename(columns={'id': 'news_id'}), ['company'])
+
+    updated_count, failed_ids = bulk_update_news(rows, ['company'], chunk_size)
+    logger.info(f"Successfully updated {updated_count} news items with company names")
+    return updated_count, failed_ids
 
 def get_news_by_id(news_id):
     logger.info(f"Retrieving news item with id: {news_id}")
     
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         query = select(News).where(News.id == news_id)
         result = session.execute(query)
@@ -337,52 +372,183 @@ def get_news_by_id(news_id):
     finally:
         session.close()
 
-def get_news_df(publisher=None):
+# Columns returned by the news DataFrame functions, in order
+NEWS_DF_COLUMNS = {
+    'news_id': News.id,
+    'ticker': News.ticker,
+    'ticker_url': News.ticker_url,
+    'title': News.title,
+    'link': News.link,
+    'published_date': News.published_date,
+    'company': News.company,
+    'event': News.event,
+    'reason': News.reason,
+    'publisher': News.publisher,
+    'industry': News.industry,
+    'publisher_topic': News.publisher_topic,
+    'instrument_id': News.instrument_id,
+    'yf_ticker': News.yf_ticker,
+    'published_date_gmt': News.published_date_gmt,
+    'timezone': News.timezone,
+    'publisher_summary': News.publisher_summary,
+    'predicted_side': News.predicted_side,
+    'predicted_move': News.predicted_move,
+    'content': News.content
+}
+
+# Everything but the article bodies
+NEWS_SUMMARY_COLUMNS = [column for column in NEWS_DF_COLUMNS if column != 'content']
+
+# Rows fetched per round trip when streaming news
+NEWS_STREAM_CHUNK_SIZE = 10000
+
+def compact_news_df(df):
+    """Use categoricals for low cardinality text columns and float32 for predictions"""
+    for column in ('publisher', 'event'):
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    if 'predicted_move' in df.columns:
+        df['predicted_move'] = df['predicted_move'].astype('float32')
+    return df
+
+def news_df_query(columns, publishers=None, start_date=None, end_date=None, ascending=True):
+    """Query for the news rows of iter_news_df, shared with the async reads"""
+    query = select(*[NEWS_DF_COLUMNS[column].label(column) for column in columns])
+
+    if publishers:
+        query = query.where(News.publisher.in_(publishers))
+    if start_date:
+        query = query.where(News.published_date >= start_date)
+    if end_date:
+        query = query.where(News.published_date <= end_date)
+    return query.order_by(News.published_date.asc() if ascending else News.published_date.desc())
+
+def iter_news_df(columns=None, publishers=None, start_date=None, end_date=None, ascending=True,
+                 chunk_size=NEWS_STREAM_CHUNK_SIZE, compact=True):
+    """
+    Stream news rows as DataFrame chunks over a server-side cursor.
+
+    Args:
+        columns: names from NEWS_DF_COLUMNS to select, all but content by default
+        publishers: only include these publishers
+        start_date: only include news published on or after this date
+        end_date: only include news published on or before this date
+        ascending: order by published date ascending, descending otherwise
+        chunk_size: number of rows per chunk
+        compact: convert each chunk with compact_news_df
+
+    Yields:
+        DataFrame: up to chunk_size rows with the selected columns
+    """
+    columns = list(columns or NEWS_SUMMARY_COLUMNS)
+    query = news_df_query(columns, publishers, start_date, end_date, ascending)
+
+    with db_pool.get_read_session() as session:
+        result = session.execute(query.execution_options(yield_per=chunk_size))
+        for rows in result.partitions():
+            df = pd.DataFrame(rows, columns=columns)
+            yield compact_news_df(df) if compact else df
+
+def read_news_df(columns=None, compact=False, **filters):
+    """Collect the chunks of iter_news_df into a single DataFrame"""
+    columns = list(columns or NEWS_SUMMARY_COLUMNS)
+    chunks = list(iter_news_df(columns, compact=compact, **filters))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat(chunks, ignore_index=True)
+    # Categories differ between chunks, so they are rebuilt once over the whole frame
+    return compact_news_df(df) if compact else df
+
+def get_news_df(publisher=None, columns=None, compact=False):
+    """
+    Get news ordered by published date.
+
+    Args:
+        publisher: only include this publisher
+        columns: names from NEWS_DF_COLUMNS to select, all including content by default
+        compact: use categoricals and float32 columns
+    """
     logger.info(f"Retrieving all news items ordered by published date{' for publisher: ' + publisher if publisher else ''}")
-    
-    session = Session()
-    try:
-        query = select(News).order_by(News.published_date.asc())
-        
-        if publisher:
-            query = query.filter(News.publisher == publisher)
-        
-        result = session.execute(query)
-        news_items = result.scalars().all()
-        
-        data = [{
-            'news_id': item.id,
-            'ticker': item.ticker,
-            'ticker_url': item.ticker_url,
-            'title': item.title,
-            'link': item.link,
-            'published_date': item.published_date,
-            'company': item.company,
-            'event': item.event,
-            'reason': item.reason,  # Make sure 'reason' is included here
-            'publisher': item.publisher,
-            'industry': item.industry,
-            'publisher_topic': item.publisher_topic,
-            'instrument_id': item.instrument_id,
-            'yf_ticker': item.yf_ticker,
-            'published_date_gmt': item.published_date_gmt,
-            'timezone': item.timezone,
-            'publisher_summary': item.publisher_summary,
-            'predicted_side': item.predicted_side,
-            'predicted_move': item.predicted_move,
-            'content': item.content  # Include 'content' as it's used in enrich_reason
-        } for item in news_items]
-        
-        df = pd.DataFrame(data)
-        logger.info(f"Retrieved {len(df)} news items")
-        return df
-    finally:
-        session.close()
+    df = read_news_df(columns or list(NEWS_DF_COLUMNS), compact=compact,
+                      publishers=[publisher] if publisher else None)
+    logger.info(f"Retrieved {len(df)} news items")
+    return df
+
+# Sort keys accepted by get_news_page besides the NEWS_DF_COLUMNS names
+NEWS_PAGE_SORT_ACCURACY = 'accuracy'
+
+def _news_page_filters(publisher, start_date=None, end_date=None, ticker_filter=None, event_filter=None):
+    filters = [News.publisher == publisher]
+    if start_date:
+        filters.append(News.published_date >= start_date)
+    if end_date:
+        filters.append(News.published_date <= end_date)
+    if ticker_filter:
+        # autoescape matches % and _ in the filter literally
+        filters.append(News.ticker.icontains(ticker_filter, autoescape=True))
+    if event_filter == 'Unclassified':
+        filters.append(News.event.is_(None))
+    elif event_filter:
+        filters.append(News.event == event_filter)
+    return filters
+
+def news_page_query(publisher, page, items_per_page, start_date, end_date, ticker_filter, event_filter,
+                    sort_by, ascending, columns):
+    """Queries for one page of get_news_page and its total count, shared with the async reads"""
+    filters = _news_page_filters(publisher, start_date, end_date, ticker_filter, event_filter)
+
+    query = select(*[NEWS_DF_COLUMNS[column].label(column) for column in columns]).where(*filters)
+    if sort_by == NEWS_PAGE_SORT_ACCURACY:
+        accuracy = latest_accuracy_query().subquery()
+        query = query.outerjoin(accuracy, accuracy.c.event == News.event)
+        sort_expression = accuracy.c.accuracy
+    else:
+        sort_expression = NEWS_DF_COLUMNS[sort_by]
+
+    # The id keeps the order stable between pages when sort values repeat
+    if ascending:
+        query = query.order_by(sort_expression.asc().nullslast(), News.id.asc())
+    else:
+        query = query.order_by(sort_expression.desc().nullslast(), News.id.desc())
+    query = query.limit(items_per_page).offset((max(page, 1) - 1) * items_per_page)
+
+    count_query = select(func.count()).select_from(News).where(*filters)
+    return query, count_query
+
+def get_news_page(publisher, page=1, items_per_page=25, start_date=None, end_date=None, ticker_filter=None,
+                  event_filter=None, sort_by='published_date', ascending=False, columns=None):
+    """
+    Get one page of a publisher's news, filtered and sorted in the database.
+
+    Args:
+        publisher: publisher to list
+        page: 1-based page number
+        items_per_page: rows per page
+        start_date: only include news published on or after this date
+        end_date: only include news published on or before this date
+        ticker_filter: case-insensitive substring of the ticker
+        event_filter: event to include, 'Unclassified' for news without an event
+        sort_by: a NEWS_DF_COLUMNS name, or NEWS_PAGE_SORT_ACCURACY for the latest model accuracy of the event
+        ascending: sort direction, nulls always last
+        columns: names from NEWS_DF_COLUMNS to select, all but content by default
+
+    Returns:
+        tuple: (DataFrame of the page, total number of matching rows)
+    """
+    columns = list(columns or NEWS_SUMMARY_COLUMNS)
+    query, count_query = news_page_query(publisher, page, items_per_page, start_date, end_date, ticker_filter,
+                                         event_filter, sort_by, ascending, columns)
+
+    with db_pool.get_read_session() as session:
+        total_count = session.execute(count_query).scalar()
+        rows = session.execute(query).fetchall() if total_count else []
+
+    return pd.DataFrame(rows, columns=columns), total_count
 
 def get_news_latest_df(publisher=None):
     logger.info(f"Retrieving latest 1000 news items ordered by published date{' for publisher: ' + publisher if publisher else ''}")
     
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         query = select(News).order_by(News.published_date.asc())
         
@@ -423,81 +589,36 @@ def get_news_latest_df(publisher=None):
     finally:
         session.close()
 
-def update_news_predictions(df):
+def update_news_predictions(df, chunk_size=NEWS_UPDATE_CHUNK_SIZE):
+    """Update the predictions of news rows, returning (updated_count, failed_ids) like bulk_update_news"""
     logger.info("Updating news table with predictions")
-    
-    session = Session()
-    try:
-        updated_count = 0
-        total_items = len(df)
-        for index, row in df.iterrows():
-            news_item = session.get(News, row['news_id'])
-            if news_item:
-                if pd.notnull(row['predicted_side']):
-                    news_item.predicted_side = row['predicted_side']
-                    logger.info(f"Updating predicted_side for news_id {row['news_id']}: {row['predicted_side']}")
-                else:
-                    logger.warning(f"Null predicted_side for news_id {row['news_id']}")
-                if pd.notnull(row['predicted_move']):
-                    news_item.predicted_move = row['predicted_move']
-                    logger.info(f"Updating predicted_move for news_id {row['news_id']}: {row['predicted_move']}")
-                else:
-                    logger.warning(f"Null predicted_move for news_id {row['news_id']}")
-                updated_count += 1
-            else:
-                logger.warning(f"No news item found for news_id {row['news_id']}")
-            
-            if (index + 1) % 100 == 0 or index == total_items - 1:
-                session.commit()
-                logger.info(f"Updated {index + 1}/{total_items} items")
-        
-        logger.info(f"Successfully updated {updated_count} news items with predictions")
-    except Exception as e:
-        logger.error(f"Error updating news predictions: {str(e)}")
-        session.rollback()
-    finally:
-        session.close()
 
-def update_records(df):
+    null_sides = df['predicted_side'].isna().sum()
+    null_moves = df['predicted_move'].isna().sum()
+    if null_sides or null_moves:
+        logger.warning(f"Null predicted_side for {null_sides} and null predicted_move for {null_moves} news items")
+
+    rows = to_update_rows(df, ['predicted_side', 'predicted_move'])
+    updated_count, failed_ids = bulk_update_news(rows, ['predicted_side', 'predicted_move'], chunk_size)
+    logger.info(f"Successfully updated {updated_count} news items with predictions")
+    return updated_count, failed_ids
+
+def update_records(df, chunk_size=NEWS_UPDATE_CHUNK_SIZE):
+    """Update news rows from a DataFrame with news_id, returning (updated_count, failed_ids) like bulk_update_news"""
     logger.info(f"Updating {len(df)} records in the database")
-    
-    session = Session()
-    try:
-        updated_count = 0
-        for index, row in df.iterrows():
-            stmt = update(News).where(News.id == row['news_id'])
-            update_values = {}
-            for column in row.index:
-                if column != 'news_id':
-                    value = row[column]
-                    if pd.notnull(value):
-                        if isinstance(value, pd.Timestamp):
-                            value = value.to_pydatetime()
-                        update_values[column] = value
-            
-            if update_values:
-                stmt = stmt.values(**update_values)
-                result = session.execute(stmt)
-                if result.rowcount > 0:
-                    updated_count += 1
-            
-            if (index + 1) % 100 == 0 or index == len(df) - 1:
-                session.commit()
-                logger.info(f"Updated {updated_count}/{index + 1} records")
-        
-        logger.info(f"Successfully updated {updated_count} records")
-        return updated_count
-    except Exception as e:
-        logger.error(f"Error updating records: {str(e)}")
-        session.rollback()
-        return 0
-    finally:
-        session.close()
+
+    columns = [column for column in df.columns if column != 'news_id']
+    # Rows without any value to set are left untouched
+    df = df[df[columns].notna().any(axis=1)]
+
+    updated_count, failed_ids = bulk_update_news(to_update_rows(df, columns), columns, chunk_size)
+    logger.info(f"Successfully updated {updated_count} records")
+    return updated_count, failed_ids
 
 def get_news_by_event(event):
     logger.info(f"Retrieving news items for event: {event}")
     
-    session = Session()
+    session = db_pool.SessionFactory()
     try:
         query = select(News).where(News.event == event).limit(100)
         result = session.execute(query)
@@ -515,6 +636,20 @@ def get_news_by_event(event):
     finally:
         session.close()
 
+def top_events_query(limit):
+    return (
+        select(News.event, func.count(News.id).label('count'))
+        .where(News.event.isnot(None))
+        .group_by(News.event)
+        .order_by(func.count(News.id).desc())
+        .limit(limit)
+    )
+
+def get_top_events(limit=20):
+    """Get the most frequent events in the news table, most frequent first"""
+    with db_pool.get_session() as session:
+        return [row.event for row in session.execute(top_events_query(limit))]
+
 def remove_duplicates(news_items):
     # Example implementation: remove duplicates based on 'link'
     unique_items = []
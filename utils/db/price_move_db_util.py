@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, text, select, join
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index, text, select, join, literal_column
+from sqlalchemy.dialects.postgresql import insert
 from utils.db.db_pool import DatabasePool
 from datetime import datetime, time
 from utils.logging.log_util import get_logger
@@ -32,6 +33,10 @@ class PriceMove(db_pool.Base):
     predicted_side = Column(String(10))
     predicted_move = Column(Float)
 
+    __table_args__ = (
+        Index('uq_price_moves_news_id', 'news_id', unique=True),
+    )
+
     def __init__(self, news_id, ticker, published_date, begin_price, end_price, index_begin_price, index_end_price,
                  volume, market, price_change, price_change_percentage, index_price_change, index_price_change_percentage,
                  daily_alpha, actual_side, predicted_side=None, predicted_move=None):
@@ -54,6 +59,7 @@ class PriceMove(db_pool.Base):
         self.predicted_move = predicted_move
 
 def store_price_move(price_move):
+    db_pool.ensure_tables()
     try:
         with db_pool.get_session() as session:
             existing_price_move = session.query(PriceMove).filter_by(news_id=str(price_move.news_id)).first()
@@ -83,19 +89,80 @@ def store_price_move(price_move):
     except Exception as e:
         logger.error(f"Error verifying price move storage: {str(e)}")
 
+# Number of rows per upsert statement
+PRICE_MOVE_CHUNK_SIZE = 1000
+
+PRICE_MOVE_COLUMNS = [
+    'news_id', 'ticker', 'published_date', 'begin_price', 'end_price', 'index_begin_price',
+    'index_end_price', 'volume', 'market', 'price_change', 'price_change_percentage',
+    'index_price_change', 'index_price_change_percentage', 'daily_alpha', 'actual_side',
+    'predicted_side', 'predicted_move'
+]
+
+def store_price_moves(df, chunk_size=PRICE_MOVE_CHUNK_SIZE):
+    """
+    Upsert price moves with INSERT ... ON CONFLICT (news_id) DO UPDATE, one transaction per chunk.
+
+    Args:
+        df: DataFrame with the PRICE_MOVE_COLUMNS columns (predicted_* are optional)
+        chunk_size: Number of rows per statement
+
+    Returns:
+        tuple: (inserted_count, updated_count)
+    """
+    logger.info(f"Storing {len(df)} price moves in chunks of {chunk_size}")
+    db_pool.ensure_tables()
+    # ON CONFLICT DO UPDATE cannot touch one row twice in a statement, the last move of a news wins
+    duplicates = df['news_id'].astype(str).duplicated(keep='last')
+    if duplicates.any():
+        logger.warning(f"Dropping {duplicates.sum()} price moves with a duplicated news_id, keeping the last one")
+        df = df[~duplicates]
+    records_df = df.reindex(columns=PRICE_MOVE_COLUMNS).astype(object)
+    records = records_df.where(records_df.notna(), None).to_dict('records')
+    # Converted per record, Series.map would infer a float dtype again and bring back NaN
+    for record in records:
+        record['news_id'] = str(record['news_id'])
+        if record['volume'] is not None:
+            record['volume'] = int(record['volume'])
+
+    inserted_count = 0
+    updated_count = 0
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        stmt = insert(PriceMove).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['news_id'],
+            set_={column: stmt.excluded[column] for column in PRICE_MOVE_COLUMNS if column != 'news_id'}
+        ).returning(literal_column('(xmax = 0)'))
+
+        try:
+            with db_pool.get_session() as session:
+                inserted = [row[0] for row in session.execute(stmt)]
+        except Exception as e:
+            logger.error(f"Error storing price moves {start}-{start + len(chunk)}: {str(e)}")
+            raise
+
+        inserted_count += sum(inserted)
+        updated_count += len(inserted) - sum(inserted)
+
+    logger.info(f"Stored price moves: {inserted_count} inserted, {updated_count} updated")
+    return inserted_count, updated_count
+
+NEWS_PRICE_MOVE_COLUMNS = ['id', 'content', 'title', 'event', 'price_change_percentage', 'daily_alpha', 'actual_side']
+
+def news_price_moves_query():
+    """Query for the news joined with their price moves, shared with the async reads"""
+    return select(News.id, News.content, News.title, News.event, 
+                  PriceMove.price_change_percentage, PriceMove.daily_alpha, 
+                  PriceMove.actual_side).select_from(
+        join(News, PriceMove, News.id == PriceMove.news_id)
+    ).order_by(News.id)
+
 def get_news_price_moves():
     try:
         with db_pool.get_session() as session:
-            query = select(News.id, News.content, News.title, News.event, 
-                           PriceMove.price_change_percentage, PriceMove.daily_alpha, 
-                           PriceMove.actual_side).select_from(
-                join(News, PriceMove, News.id == PriceMove.news_id)
-            )
-            
-            result = session.execute(query)
-            df = pd.DataFrame(result.fetchall(), columns=['id', 'content', 'title', 'event', 
-                                                          'price_change_percentage', 'daily_alpha', 
-                                                          'actual_side'])
+            result = session.execute(news_price_moves_query())
+            df = pd.DataFrame(result.fetchall(), columns=NEWS_PRICE_MOVE_COLUMNS)
             
             logger.info(f"Retrieved {len(df)} rows from news and price_moves tables")
             return df
@@ -103,9 +170,6 @@ def get_news_price_moves():
         logger.error(f"Error retrieving news and price moves: {str(e)}")
         return pd.DataFrame()
 
-# Create tables
-db_pool.create_all_tables()
-
 def add_market_column():
     with db_pool.get_session() as session:
         connection = session.connection()
@@ -1,16 +1,11 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from utils.db.news_db_util import get_news_df, get_news_df_date_range
+from utils.db.news_db_util import get_news_page, NEWS_PAGE_SORT_ACCURACY
 from utils.display.display_util import make_clickable
-from datetime import timedelta
-from utils.db.model_db_util import get_accuracy
+from utils.db.model_db_util import get_latest_accuracies
 import pytz
 
-@st.cache_data(ttl=timedelta(hours=1))
-def cached_get_news_df(publisher):
-    return get_news_df(publisher)
-
 def format_percentage(value):
     if pd.isna(value):
         return ""
@@ -38,37 +33,45 @@ def format_date_with_timezone(date_str, publisher):
     # Format to minute precision and add timezone abbreviation
     return f"{dt.strftime('%Y-%m-%d %H:%M')} {tz_abbrev}"
 
+# Display column -> get_news_page sort key
+SORT_KEYS = {
+    'Ticker': 'ticker',
+    'Title': 'title',
+    'Company': 'company',
+    'Expected Move (%)': 'predicted_move',
+    'Probability % (Direction)': NEWS_PAGE_SORT_ACCURACY,
+    'Event': 'event',
+    'Reason': 'reason',
+    'Published Date': 'published_date'
+}
+
 def display_publisher(publisher, page, items_per_page, start_date=None, end_date=None, 
                      ticker_filter=None, sort_column=None, sort_ascending=True, event_filter=None):
-    # Get the cached dataframe for the specific publisher
+    # Filter, sort and paginate in the database so only the visible page is loaded
     try:
-        if start_date and end_date:
-            df = get_news_df_date_range([publisher], start_date, end_date)
+        if sort_column:
+            sort_by, ascending = SORT_KEYS.get(sort_column, 'published_date'), sort_ascending
         else:
-            df = cached_get_news_df(publisher)
+            sort_by, ascending = 'published_date', False
+
+        df, total_count = get_news_page(
+            publisher, page, items_per_page, start_date, end_date,
+            ticker_filter=ticker_filter, event_filter=event_filter,
+            sort_by=sort_by, ascending=ascending,
+            columns=['news_id', 'ticker', 'ticker_url', 'title', 'link', 'company', 'event',
+                     'reason', 'published_date', 'predicted_move']
+        )
 
-        # Return early if dataframe is empty
-        if df is None or df.empty:
+        # Return early if there is nothing to show
+        if total_count == 0 or df.empty:
             return 0, None
 
-        # Handle event filter
-        if event_filter == 'Unclassified':
-            df = df[df['event'].isna()]
-        elif event_filter:
-            df = df[df['event'] == event_filter]
-
-        # Apply ticker filter if provided
-        if ticker_filter:
-            df = df[df['ticker'].str.contains(ticker_filter, case=False, na=False)]
-            if df.empty:
-                return 0, None
-
         # Create clickable links for ticker and title
-        df['Ticker'] = df.apply(lambda row: make_clickable(row['ticker'], row['ticker_url']), axis=1)
-        df['Title'] = df.apply(lambda row: make_clickable(row['title'], row['link']), axis=1)
+        df['Ticker'] = [make_clickable(ticker, url) for ticker, url in zip(df['ticker'], df['ticker_url'])]
+        df['Title'] = [make_clickable(title, link) for title, link in zip(df['title'], df['link'])]
 
         # Format the event column: remove underscores and capitalize the first word
-        df['Probability % (Direction)'] = df['event'].apply(lambda x: get_accuracy(x))
+        df['Probability % (Direction)'] = df['event'].map(get_latest_accuracies())
         df['Probability % (Direction)'] = df['Probability % (Direction)'].apply(
             lambda x: f'{x*100:.2f}%' if pd.notnull(x) and not np.isnan(x) else ''
         )
@@ -90,24 +93,8 @@ def display_publisher(publisher, page, items_per_page, start_date=None, end_date
         # Rename columns to start with capital letter and replace underscore with space
         df_display.columns = [col.replace('_', ' ').title() for col in df_display.columns]
 
-        # Sort if column specified
-        if sort_column:
-            if sort_column == 'Expected Move (%)':
-                # Sort by the numerical predicted_move column instead of the formatted string
-                df_display = df_display.sort_values(
-                    by='Expected Move (%)', 
-                    ascending=sort_ascending, 
-                    key=lambda x: pd.to_numeric(x.str.extract(r'([-\d.]+)', expand=False), errors='coerce')
-                )
-            else:
-                df_display = df_display.sort_values(by=sort_column, ascending=sort_ascending)
-
-        # Calculate start and end indices for the current page
-        start_idx = (page - 1) * items_per_page
-        end_idx = start_idx + items_per_page
-
         # Create a styled DataFrame with left-aligned headers
-        styled_df = df_display.iloc[start_idx:end_idx].style.set_table_styles([
+        styled_df = df_display.style.set_table_styles([
             {'selector': 'th', 'props': [('text-align', 'left')]}
         ])
 
@@ -115,7 +102,7 @@ def display_publisher(publisher, page, items_per_page, start_date=None, end_date
         st.write(styled_df.hide(axis="index").to_html(escape=False), unsafe_allow_html=True)
 
         # Calculate total pages
-        total_pages = len(df_display) // items_per_page + (1 if len(df_display) % items_per_page > 0 else 0)
+        total_pages = total_count // items_per_page + (1 if total_count % items_per_page > 0 else 0)
 
         return total_pages, df_display
 
@@ -1,14 +1,14 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-from utils.db.news_db_util import get_news_df
+from utils.db.news_db_util import get_news_df, NEWS_SUMMARY_COLUMNS
 import re
 from utils.db.instrument_db_util import get_instrument_by_company_name
 import logging
 
 @st.cache_data(ttl=3600)
 def get_cached_dataframe(publisher):
-    return get_news_df(publisher)
+    return get_news_df(publisher, columns=NEWS_SUMMARY_COLUMNS)
 
 def make_clickable(text, link):
     return f'<a target="_blank" href="{link}">{text}</a>'
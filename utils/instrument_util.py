@@ -1,31 +1,14 @@
 import pandas as pd
-from utils.db.instrument_db_util import get_instrument_by_company_name
+from utils import ticker_util
 from utils.logging.log_util import get_logger
 
 logger = get_logger(__name__)
 
-def get_ticker(df):
+def get_ticker(df, fuzzy=False):
     """
-    Get tickers for a dataframe of news items.
-    
-    Args:
-    df (pd.DataFrame): Dataframe containing news items with 'company' column.
-    
-    Returns:
-    pd.DataFrame: Updated dataframe with 'ticker', 'yf_ticker', 'instrument_id', and 'ticker_url' columns.
+    Get tickers for a dataframe of news items, see ticker_util.get_ticker.
     """
-    logger.info(f"Getting tickers for {len(df)} news items")
-    
-    for index, row in df.iterrows():
-        instrument = get_instrument_by_company_name(row['company'])
-        if instrument:
-            df.at[index, 'ticker'] = instrument.ticker if instrument.ticker and (not row.get('ticker') or row.get('ticker') == 'N/A') else row.get('ticker')
-            df.at[index, 'yf_ticker'] = instrument.yf_ticker if instrument.yf_ticker and (not row.get('yf_ticker') or row.get('yf_ticker') == 'N/A') else row.get('yf_ticker')
-            df.at[index, 'instrument_id'] = instrument.id if not row.get('instrument_id') else row.get('instrument_id')
-            df.at[index, 'ticker_url'] = instrument.url if instrument.url and not row.get('ticker_url') else row.get('ticker_url')
-    
-    logger.info(f"Finished getting tickers for {len(df)} news items")
-    return df
+    return ticker_util.get_ticker(df, fuzzy)
 
 def main():
     # Sample news dataframe for testing
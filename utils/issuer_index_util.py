@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+from utils.db import instrument_db_util
+from utils.db.instrument_db_util import format_search_term
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds before the index is reloaded to pick up instrument changes made by other processes
+ISSUER_INDEX_TTL = int(os.getenv('ISSUER_INDEX_TTL', 900))
+
+# Minimum trigram similarity for fuzzy matches
+FUZZY_MIN_SIMILARITY = 0.6
+
+def trigrams(key):
+    return {key[i:i + 3] for i in range(len(key) - 2)}
+
+class IssuerIndex:
+    """
+    Normalized issuer names of all instruments with exact and substring lookups.
+
+    Keys are normalized with format_search_term, like the database lookup in
+    get_instrument_by_company_name. Substring matches are found through a trigram
+    index instead of scanning every issuer.
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self.keys = [format_search_term(record['issuer']) for record in records]
+        self.exact = {}
+        self.trigram_index = {}
+        for position, key in enumerate(self.keys):
+            if not key:
+                continue
+            # Records are ordered by id, so the first instrument wins like in the database lookup
+            self.exact.setdefault(key, position)
+            for trigram in trigrams(key):
+                self.trigram_index.setdefault(trigram, set()).add(position)
+
+    def _candidates(self, key):
+        """Positions whose key may contain key, from the rarest of its trigrams"""
+        key_trigrams = trigrams(key)
+        if not key_trigrams:
+            return range(len(self.keys))
+        postings = sorted((self.trigram_index.get(trigram, set()) for trigram in key_trigrams), key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates &= posting
+            if not candidates:
+                break
+        return candidates
+
+    def match(self, company_name, fuzzy=False):
+        """
+        Find the instrument of a company name.
+
+        Args:
+            company_name: issuer name as found in the news
+            fuzzy: fall back to the most similar issuer by trigram overlap
+
+        Returns:
+            dict: instrument record, or None if nothing matches
+        """
+        if not isinstance(company_name, str):
+            return None
+        key = format_search_term(company_name)
+        if not key:
+            return None
+
+        position = self.exact.get(key)
+        if position is not None:
+            return self.records[position]
+
+        matches = [position for position in self._candidates(key) if key in self.keys[position]]
+        if matches:
+            return self.records[min(matches)]
+
+        if fuzzy:
+            return self._fuzzy_match(key)
+        return None
+
+    def _fuzzy_match(self, key):
+        key_trigrams = trigrams(key)
+        if not key_trigrams:
+            return None
+        overlap = {}
+        for trigram in key_trigrams:
+            for position in self.trigram_index.get(trigram, ()):
+                overlap[position] = overlap.get(position, 0) + 1
+
+        # Ties go to the lowest id
+        best_position, best_similarity = None, 0
+        for position, shared in sorted(overlap.items()):
+            similarity = shared / len(key_trigrams | trigrams(self.keys[position]))
+            if similarity > best_similarity:
+                best_position, best_similarity = position, similarity
+        if best_similarity < FUZZY_MIN_SIMILARITY:
+            return None
+        return self.records[best_position]
+
+_index = None
+_index_version = None
+_index_loaded_at = None
+_index_lock = threading.Lock()
+
+def get_issuer_index(ttl=ISSUER_INDEX_TTL):
+    """Get the process-wide issuer index, rebuilding it after instrument writes or when it expires"""
+    global _index, _index_version, _index_loaded_at
+    with _index_lock:
+        version = instrument_db_util.get_instrument_version()
+        expired = _index_loaded_at is None or time.monotonic() - _index_loaded_at >= ttl
+        if _index is None or version != _index_version or expired:
+            records = instrument_db_util.get_instrument_records()
+            _index = IssuerIndex(records)
+            _index_version = version
+            _index_loaded_at = time.monotonic()
+            logger.info(f"Built issuer index for {len(records)} instruments")
+        return _index
+
+def match_issuer(company_name, fuzzy=False):
+    """Find the instrument record of a company name in the issuer index"""
+    return get_issuer_index().match(company_name, fuzzy)
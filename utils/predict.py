@@ -1,6 +1,6 @@
 import pandas as pd
-import joblib
 from utils.db import news_db_util
+from utils.ai.model_registry import model_registry, preload_models
 import os
 import logging
 
@@ -8,17 +8,14 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+MODEL_TYPES = ['regression', 'classifier_binary']
+
 def load_models(event, model_type):
     model_filename = f'models/{event}_{model_type}.joblib'
     vectorizer_filename = f'models/{event}_tfidf_vectorizer_{model_type}.joblib'
     
-    logger.info(f"Looking for model file: {model_filename}")
-    logger.info(f"Looking for vectorizer file: {vectorizer_filename}")
-    
-    if os.path.exists(model_filename) and os.path.exists(vectorizer_filename):
-        logger.info(f"Loading model and vectorizer for event: {event}")
-        model = joblib.load(model_filename)
-        vectorizer = joblib.load(vectorizer_filename)
+    model, vectorizer = model_registry.get(event, model_type, model_filename, vectorizer_filename)
+    if model is not None:
         return model, vectorizer
     else:
         logger.warning(f"Model or vectorizer not found for event: {event}")
@@ -68,6 +65,9 @@ def predict(df):
     return df
 
 def main():
+    # Warm the model registry with the most common events
+    preload_models(load_models, MODEL_TYPES)
+    
     # Get all news
     logger.info("Fetching all news data")
     news_df = news_db_util.get_news_df()
@@ -76,9 +76,14 @@ def main():
     logger.info("Starting predictions")
     pred_df = predict(news_df)
     
-    # Update the news table with predictions
+    # Update the news table with predictions, retrying the rows of failed chunks once
     logger.info("Updating news table with predictions")
-    news_db_util.update_news_predictions(pred_df)
+    updated_count, failed_ids = news_db_util.update_news_predictions(pred_df)
+    if failed_ids:
+        logger.warning(f"Retrying the predictions of {len(failed_ids)} news items")
+        _, failed_ids = news_db_util.update_news_predictions(pred_df[pred_df['news_id'].isin(failed_ids)])
+        if failed_ids:
+            logger.error(f"Predictions of {len(failed_ids)} news items could not be stored: {failed_ids}")
     
     logger.info("Predictions completed and news table updated.")
 
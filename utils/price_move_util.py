@@ -2,10 +2,11 @@ import pandas as pd
 import yfinance as yf
 import logging
 import os
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 import numpy as np
-from utils.db.price_move_db_util import store_price_move, PriceMove
+from utils.db.price_move_db_util import store_price_moves, PriceMove
 from utils.date.date_adjuster import get_previous_trading_day, get_next_trading_day
+from utils.bar_store_util import get_bars, get_bars_multi
 import sys
 
 # Create logs directory if it doesn't exist
@@ -24,6 +25,8 @@ logger = logging.getLogger(__name__)
 
 index_symbol = 'SPY'
 EXCHANGE = 'NASDAQ'
+# Maximum number of tickers per multi-ticker bar request
+BATCH_DOWNLOAD_SIZE = 100
 
 def get_price_data(ticker, published_date):
     logger.info(f"Getting price data for {ticker} on {published_date}")
@@ -34,6 +37,31 @@ def get_price_data(ticker, published_date):
         logger.warning(f"Unable to get price data for {ticker} on {published_date}")
         return None
 
+def parse_published_date(published_date):
+    if isinstance(published_date, pd.Timestamp):
+        return published_date.to_pydatetime()
+    return datetime.strptime(published_date, '%Y-%m-%d %H:%M:%S%z')
+
+def get_market_period(pub_time):
+    """Determine the market period from the publication time"""
+    if time(9, 30) <= pub_time < time(16, 0):
+        return 'regular_market'
+    elif time(16, 0) <= pub_time:
+        return 'after_market'
+    return 'pre_market'
+
+def get_price_window(published_date):
+    """
+    Get the market period and the trading days needed to price a news item.
+
+    Returns:
+        tuple: (market, previous_trading_day, today, next_trading_day)
+    """
+    today_date = parse_published_date(published_date)
+    market = get_market_period(today_date.time())
+    today_date_only = today_date.date()
+    return market, get_previous_trading_day(today_date_only), today_date_only, get_next_trading_day(today_date_only)
+
 def set_prices(row):
     # Convert the input row to a copy to avoid SettingWithCopyWarning
     row = row.copy()
@@ -45,33 +73,19 @@ def set_prices(row):
         logger.warning(f"No ticker symbol found for news_id {row.get('news_id')}")
         return row
 
-    if isinstance(row['published_date'], pd.Timestamp):
-        today_date = row['published_date'].to_pydatetime()
-    else:
-        today_date = datetime.strptime(row['published_date'], '%Y-%m-%d %H:%M:%S%z')
-    
-    # Determine market based on publication time
-    pub_time = today_date.time()
-    if time(9, 30) <= pub_time < time(16, 0):
-        market = 'regular_market'
-    elif time(16, 0) <= pub_time:
-        market = 'after_market'
-    elif time(0, 0) <= pub_time < time(9, 30):
-        market = 'pre_market'
-    
-    # Find the previous and next trading days
-    today_date_only = today_date.date()
-    previous_trading_day = get_previous_trading_day(today_date_only)
-    next_trading_day = get_next_trading_day(today_date_only)
+    # Determine market and the surrounding trading days
+    market, previous_trading_day, today_date_only, next_trading_day = get_price_window(row['published_date'])
     
     yf_previous_date = previous_trading_day.strftime('%Y-%m-%d')
     yf_today_date = today_date_only.strftime('%Y-%m-%d')
     yf_next_date = next_trading_day.strftime('%Y-%m-%d')
+    # yfinance treats the end date as exclusive, so request one day past the next trading day
+    yf_end_date = (next_trading_day + timedelta(days=1)).strftime('%Y-%m-%d')
 
     try:
         # Download data
-        data = yf.download(symbol, yf_previous_date, yf_next_date, progress=False)
-        index_data = yf.download(index_symbol, yf_previous_date, yf_next_date, progress=False)
+        data = get_bars(symbol, yf_previous_date, yf_end_date, interval='1d')
+        index_data = get_bars(index_symbol, yf_previous_date, yf_end_date, interval='1d')
         
         if data.empty or index_data.empty:
             logger.warning(f"No data available for {symbol} or {index_symbol}")
@@ -123,22 +137,155 @@ def set_prices(row):
         
     return row
 
-def create_price_moves(news_df):
-    logger.info(f"Starting to create price moves for {len(news_df)} news items")
-    news_df = news_df.reset_index(drop=True)
-    processed_rows = []
+def stack_daily_prices(prices):
+    """Stack per-symbol daily bars into one frame indexed by (symbol, date string)"""
+    frames = []
+    for symbol, data in prices.items():
+        frame = data[['Open', 'Close', 'Volume']].copy()
+        frame.index = pd.MultiIndex.from_arrays(
+            [[symbol] * len(frame), pd.to_datetime(frame.index).strftime('%Y-%m-%d')],
+            names=['symbol', 'date']
+        )
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=['Open', 'Close', 'Volume'],
+                            index=pd.MultiIndex.from_arrays([[], []], names=['symbol', 'date']))
+
+    stacked = pd.concat(frames)
+    return stacked[~stacked.index.duplicated(keep='last')]
+
+def lookup_prices(stacked, symbols, dates, column):
+    """Vectorized lookup of one price column for arrays of symbols and date strings"""
+    keys = pd.MultiIndex.from_arrays([symbols, dates])
+    return stacked[column].reindex(keys).to_numpy(dtype=float)
+
+def set_prices_batch(news_df):
+    """
+    Batched version of set_prices for a whole news frame.
+
+    Daily bars are read through the bar store once per chunk of distinct tickers over the
+    union of the dates their rows need, and the index once for the whole run. Begin, end and index
+    prices are then looked up for all rows at once.
+    """
+    df = news_df.copy()
+    logger.info(f"Batch pricing {len(df)} news items")
+
+    markets, previous_dates, today_dates, next_dates = [], [], [], []
+    for published_date in df['published_date']:
+        try:
+            market, previous_day, today, next_day = get_price_window(published_date)
+        except Exception as e:
+            logger.warning(f"Unable to parse published_date {published_date}: {e}")
+            market, previous_day, today, next_day = None, None, None, None
+        markets.append(market)
+        previous_dates.append(previous_day)
+        today_dates.append(today)
+        next_dates.append(next_day)
+
+    windows = pd.DataFrame({
+        'symbol': df['yf_ticker'].where(df['yf_ticker'].notna() & (df['yf_ticker'] != ''), None),
+        'market': markets,
+        'previous_date': pd.to_datetime(previous_dates),
+        'today': pd.to_datetime(today_dates),
+        'next_date': pd.to_datetime(next_dates)
+    }, index=df.index)
+    priced = windows['symbol'].notna() & windows['market'].notna()
+
+    if not priced.any():
+        logger.warning("No rows with a ticker symbol and a valid published date")
+        return df
 
-    for index, row in news_df.iterrows():
+    # One window per distinct ticker covering all of its rows
+    ticker_windows = windows[priced].groupby('symbol').agg(start=('previous_date', 'min'), end=('next_date', 'max'))
+    ticker_windows = ticker_windows.sort_values('start')
+    logger.info(f"Downloading daily prices for {len(ticker_windows)} distinct tickers")
+
+    prices = {}
+    for chunk_start in range(0, len(ticker_windows), BATCH_DOWNLOAD_SIZE):
+        chunk = ticker_windows.iloc[chunk_start:chunk_start + BATCH_DOWNLOAD_SIZE]
+        start_date = chunk['start'].min().strftime('%Y-%m-%d')
+        # yfinance treats the end date as exclusive
+        end_date = (chunk['end'].max() + timedelta(days=1)).strftime('%Y-%m-%d')
         try:
-            logger.info(f"Processing row {index} for ticker {row['yf_ticker']}")  # Changed from 'ticker' to 'yf_ticker'
-            processed_row = set_prices(row)
-            processed_rows.append(processed_row)
+            prices.update(get_bars_multi(chunk.index, start_date, end_date, interval='1d'))
         except Exception as e:
-            logger.error(f"Error processing row {index} for ticker {row['yf_ticker']}: {e}")  # Changed from 'ticker' to 'yf_ticker'
-            logger.exception("Detailed traceback:")
-            continue
+            logger.error(f"Error downloading prices for {len(chunk)} tickers: {e}")
+
+    index_start = windows.loc[priced, 'previous_date'].min().strftime('%Y-%m-%d')
+    index_end = (windows.loc[priced, 'next_date'].max() + timedelta(days=1)).strftime('%Y-%m-%d')
+    try:
+        index_prices = get_bars_multi([index_symbol], index_start, index_end, interval='1d')
+    except Exception as e:
+        logger.error(f"Error downloading prices for {index_symbol}: {e}")
+        index_prices = {}
+
+    stacked = stack_daily_prices(prices)
+    stacked_index = stack_daily_prices(index_prices)
+
+    symbols = windows['symbol'].to_numpy()
+    index_symbols = np.full(len(windows), index_symbol, dtype=object)
+    previous_keys = windows['previous_date'].dt.strftime('%Y-%m-%d').to_numpy()
+    today_keys = windows['today'].dt.strftime('%Y-%m-%d').to_numpy()
+    next_keys = windows['next_date'].dt.strftime('%Y-%m-%d').to_numpy()
+
+    is_pre = (windows['market'] == 'pre_market').to_numpy()
+    is_regular = (windows['market'] == 'regular_market').to_numpy()
+
+    def begin_end(stacked_prices, keys_symbols):
+        previous_close = lookup_prices(stacked_prices, keys_symbols, previous_keys, 'Close')
+        today_open = lookup_prices(stacked_prices, keys_symbols, today_keys, 'Open')
+        today_close = lookup_prices(stacked_prices, keys_symbols, today_keys, 'Close')
+        next_open = lookup_prices(stacked_prices, keys_symbols, next_keys, 'Open')
+        begin = np.where(is_pre, previous_close, np.where(is_regular, today_open, today_close))
+        end = np.where(is_pre, today_open, np.where(is_regular, today_close, next_open))
+        return begin, end
 
-    processed_df = pd.DataFrame(processed_rows)
+    begin_price, end_price = begin_end(stacked, symbols)
+    index_begin_price, index_end_price = begin_end(stacked_index, index_symbols)
+    volume = lookup_prices(stacked, symbols, today_keys, 'Volume')
+
+    complete = (priced.to_numpy() & ~np.isnan(begin_price) & ~np.isnan(end_price)
+                & ~np.isnan(index_begin_price) & ~np.isnan(index_end_price))
+
+    def masked(values):
+        return np.where(complete, values, np.nan)
+
+    df['begin_price'] = masked(begin_price)
+    df['end_price'] = masked(end_price)
+    df['index_begin_price'] = masked(index_begin_price)
+    df['index_end_price'] = masked(index_end_price)
+    df['price_change'] = df['end_price'] - df['begin_price']
+    df['index_price_change'] = df['index_end_price'] - df['index_begin_price']
+    df['price_change_percentage'] = (df['price_change'] / df['begin_price']) * 100
+    df['index_price_change_percentage'] = (df['index_price_change'] / df['index_begin_price']) * 100
+    df['daily_alpha'] = df['price_change_percentage'] - df['index_price_change_percentage']
+    df['actual_side'] = np.where(complete, np.where(df['price_change_percentage'] >= 0, 'UP', 'DOWN'), None)
+    df['Volume'] = masked(volume)
+    df['market'] = np.where(complete, windows['market'], df['market'] if 'market' in df.columns else None)
+
+    logger.info(f"Batch priced {int(complete.sum())} of {len(df)} news items")
+    return df
+
+def create_price_moves(news_df, batch=True):
+    logger.info(f"Starting to create price moves for {len(news_df)} news items")
+    news_df = news_df.reset_index(drop=True)
+
+    if batch:
+        processed_df = set_prices_batch(news_df)
+    else:
+        processed_rows = []
+        for index, row in news_df.iterrows():
+            try:
+                logger.info(f"Processing row {index} for ticker {row['yf_ticker']}")  # Changed from 'ticker' to 'yf_ticker'
+                processed_row = set_prices(row)
+                processed_rows.append(processed_row)
+            except Exception as e:
+                logger.error(f"Error processing row {index} for ticker {row['yf_ticker']}: {e}")  # Changed from 'ticker' to 'yf_ticker'
+                logger.exception("Detailed traceback:")
+                continue
+
+        processed_df = pd.DataFrame(processed_rows)
     logger.info(f"Processed {len(processed_df)} rows successfully")
 
     required_price_columns = ['begin_price', 'end_price', 'index_begin_price', 'index_end_price']
@@ -162,30 +309,34 @@ def create_price_moves(news_df):
     logger.info(f"Finished creating price moves. Final DataFrame has {len(processed_df)} rows")
     
     # Store price moves in the database
-    for _, row in processed_df.iterrows():
+    if not processed_df.empty:
         try:
-            price_move = create_price_move(
-                news_id=row['news_id'],
-                ticker=row['yf_ticker'],  # Changed from 'ticker' to 'yf_ticker'
-                published_date=row['published_date'],
-                begin_price=row['begin_price'],
-                end_price=row['end_price'],
-                index_begin_price=row['index_begin_price'],
-                index_end_price=row['index_end_price'],
-                volume=row.get('Volume'),
-                market=row['market'],
-                price_change=row['price_change'],
-                price_change_percentage=row['price_change_percentage'],
-                index_price_change=row['index_price_change'],
-                index_price_change_percentage=row['index_price_change_percentage'],
-                actual_side=row['actual_side']
-            )
-            store_price_move(price_move)
+            store_price_moves(to_price_move_df(processed_df))
         except Exception as e:
-            logger.error(f"Error storing price move for news_id {row['news_id']}: {e}")
+            logger.error(f"Error storing price moves: {e}")
 
     return processed_df
 
+def to_price_move_df(processed_df):
+    """Map priced news rows to the price_moves table columns"""
+    return pd.DataFrame({
+        'news_id': processed_df['news_id'],
+        'ticker': processed_df['yf_ticker'],
+        'published_date': processed_df['published_date'],
+        'begin_price': processed_df['begin_price'],
+        'end_price': processed_df['end_price'],
+        'index_begin_price': processed_df['index_begin_price'],
+        'index_end_price': processed_df['index_end_price'],
+        'volume': processed_df['Volume'] if 'Volume' in processed_df.columns else None,
+        'market': processed_df['market'],
+        'price_change': processed_df['price_change'],
+        'price_change_percentage': processed_df['price_change_percentage'],
+        'index_price_change': processed_df['index_price_change'],
+        'index_price_change_percentage': processed_df['index_price_change_percentage'],
+        'daily_alpha': processed_df['price_change_percentage'] - processed_df['index_price_change_percentage'],
+        'actual_side': processed_df['actual_side']
+    })
+
 def create_price_move(news_id, ticker, published_date, begin_price, end_price, index_begin_price, index_end_price, volume, market, price_change, price_change_percentage, index_price_change, index_price_change_percentage, actual_side, predicted_side=None):
     daily_alpha = price_change_percentage - index_price_change_percentage
     return PriceMove(
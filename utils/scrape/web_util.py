@@ -1,15 +1,133 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
+from utils.logging.log_util import get_logger
+
+logger = get_logger(__name__)
+
+FAILED_CONTENT = "Failed to fetch content"
+
+# (connect, read) timeout in seconds
+FETCH_TIMEOUT = (5, 20)
+FETCH_MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', 16))
+FETCH_PER_HOST_LIMIT = int(os.getenv('FETCH_PER_HOST_LIMIT', 4))
+FETCH_RETRIES = 3
+FETCH_BACKOFF_FACTOR = 0.5
+FETCH_CACHE_SIZE = int(os.getenv('FETCH_CACHE_SIZE', 10000))
+
+def extract_text(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    # Extract text from paragraphs, removing any scripts or styles
+    for script in soup(["script", "style"]):
+        script.decompose()
+    text = ' '.join([p.get_text() for p in soup.find_all('p')])
+    return text[:1000]  # Return first 1000 characters
+
+class ContentFetcher:
+    """
+    Fetches article text over a pooled keep-alive session.
+
+    Requests are retried with exponential backoff, limited per host, and the extracted
+    text is cached by URL so each article is downloaded once across enrichment stages.
+    """
+
+    def __init__(self, max_workers=FETCH_MAX_WORKERS, per_host_limit=FETCH_PER_HOST_LIMIT,
+                 timeout=FETCH_TIMEOUT, retries=FETCH_RETRIES, backoff_factor=FETCH_BACKOFF_FACTOR,
+                 cache_size=FETCH_CACHE_SIZE):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        retry = Retry(total=retries, backoff_factor=backoff_factor,
+                      status_forcelist=[429, 500, 502, 503, 504], allowed_methods=['GET'])
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._cache = OrderedDict()
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_limits[host]
+
+    def _get_cached(self, url):
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+        return None
+
+    def _set_cached(self, url, content):
+        with self._lock:
+            self._cache[url] = content
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def fetch(self, url):
+        """Get the text of one article, FAILED_CONTENT if it cannot be downloaded"""
+        content = self._get_cached(url)
+        if content is not None:
+            return content
+
+        try:
+            with self._host_limit(url):
+                response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+            content = extract_text(response.content)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {str(e)}")
+            # Failures are not cached so a later stage can try again
+            return FAILED_CONTENT
+
+        self._set_cached(url, content)
+        return content
+
+    def fetch_many(self, urls):
+        """
+        Fetch several articles concurrently, each distinct URL once.
+
+        Returns:
+            dict: url -> article text
+        """
+        distinct_urls = [url for url in dict.fromkeys(urls) if isinstance(url, str) and url]
+        if not distinct_urls:
+            return {}
+        logger.info(f"Fetching {len(distinct_urls)} distinct URLs with {self.max_workers} workers")
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(distinct_urls))) as executor:
+            return dict(zip(distinct_urls, executor.map(self.fetch, distinct_urls)))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+def get_fetcher():
+    """Get the process-wide fetcher shared by all enrichment stages"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = ContentFetcher()
+        return _fetcher
 
 def fetch_url_content(url):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        # Extract text from paragraphs, removing any scripts or styles
-        for script in soup(["script", "style"]):
-            script.decompose()
-        text = ' '.join([p.get_text() for p in soup.find_all('p')])
-        return text[:1000]  # Return first 1000 characters
-    except requests.RequestException:
-        return "Failed to fetch content"
\ No newline at end of file
+    return get_fetcher().fetch(url)
+
+def fetch_urls_content(urls):
+    """Fetch several URLs concurrently, returning a dict of url -> article text"""
+    return get_fetcher().fetch_many(urls)
@@ -1,28 +1,65 @@
 import pandas as pd
-from utils.db.instrument_db_util import get_instrument_by_company_name
+from utils.issuer_index_util import get_issuer_index
 from utils.logging.log_util import get_logger
 
 logger = get_logger(__name__)
 
-def get_ticker(df):
+# Instrument field -> news column it fills
+INSTRUMENT_COLUMNS = {
+    'ticker': 'ticker',
+    'yf_ticker': 'yf_ticker',
+    'id': 'instrument_id',
+    'url': 'ticker_url'
+}
+
+def resolve_instruments(company_names, fuzzy=False):
+    """
+    Resolve each distinct company name once against the issuer index.
+
+    Returns:
+        DataFrame: instrument id, ticker, yf_ticker and url indexed by the company names that matched
+    """
+    index = get_issuer_index()
+    names = pd.Series(company_names).dropna().unique()
+    matches = {name: index.match(name, fuzzy) for name in names}
+    matches = {name: instrument for name, instrument in matches.items() if instrument}
+    logger.info(f"Resolved {len(matches)} of {len(names)} distinct company names")
+    return pd.DataFrame.from_dict(matches, orient='index', columns=list(INSTRUMENT_COLUMNS))
+
+def _is_missing(series):
+    return series.isna() | (series == '')
+
+def get_ticker(df, fuzzy=False):
     """
     Get tickers for a dataframe of news items.
     
+    Existing tickers are kept unless they are missing or 'N/A', and existing
+    instrument ids and ticker urls are only filled when missing.
+    
     Args:
     df (pd.DataFrame): Dataframe containing news items with 'company' column.
+    fuzzy (bool): Fall back to fuzzy issuer matching for names without a substring match.
     
     Returns:
     pd.DataFrame: Updated dataframe with 'ticker', 'yf_ticker', 'instrument_id', and 'ticker_url' columns.
     """
     logger.info(f"Getting tickers for {len(df)} news items")
     
-    for index, row in df.iterrows():
-        instrument = get_instrument_by_company_name(row['company'])
-        if instrument:
-            df.at[index, 'ticker'] = instrument.ticker if instrument.ticker and (not row.get('ticker') or row.get('ticker') == 'N/A') else row.get('ticker')
-            df.at[index, 'yf_ticker'] = instrument.yf_ticker if instrument.yf_ticker and (not row.get('yf_ticker') or row.get('yf_ticker') == 'N/A') else row.get('yf_ticker')
-            df.at[index, 'instrument_id'] = instrument.id if not row.get('instrument_id') else row.get('instrument_id')
-            df.at[index, 'ticker_url'] = instrument.url if instrument.url and not row.get('ticker_url') else row.get('ticker_url')
+    instruments = resolve_instruments(df['company'], fuzzy)
+    matched = instruments.reindex(df['company'].tolist())
+    matched.index = df.index
+    
+    for column in INSTRUMENT_COLUMNS.values():
+        if column not in df.columns:
+            df[column] = None
+    
+    found = matched['id'].notna()
+    for field, column in INSTRUMENT_COLUMNS.items():
+        replaceable = _is_missing(df[column])
+        if field in ('ticker', 'yf_ticker'):
+            replaceable |= df[column] == 'N/A'
+        replace = found & ~_is_missing(matched[field]) & replaceable
+        df.loc[replace, column] = matched.loc[replace, field]
     
     logger.info(f"Finished getting tickers for {len(df)} news items")
     return df